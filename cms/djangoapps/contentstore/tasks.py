@@ -49,6 +49,7 @@ from cms.djangoapps.contentstore.storage import course_import_export_storage
 from cms.djangoapps.contentstore.utils import initialize_permissions, reverse_usage_url, translation_language
 from cms.djangoapps.models.settings.course_metadata import CourseMetadata
 from common.djangoapps.course_action_state.models import CourseRerunState
+from common.djangoapps.static_replace import invalidate_static_url_table
 from common.djangoapps.student.auth import has_course_author_access
 from common.djangoapps.util.monitoring import monitor_import_failure
 from openedx.core.djangoapps.content.learning_sequences.api import key_supports_outlines
@@ -637,6 +638,7 @@ def import_olx(self, user_id, course_key_string, archive_path, archive_name, lan
 
         new_location = courselike_items[0].location
         LOGGER.debug('new course at %s', new_location)
+        invalidate_static_url_table(courselike_key)
 
         LOGGER.info(f'{log_prefix}: Course import successful')
         set_custom_attribute('course_import_completed', True)
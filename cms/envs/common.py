@@ -151,6 +151,11 @@ BLOCK_STRUCTURES_SETTINGS = dict(
 
     # Backend storage options
     PRUNING_ACTIVE=False,
+
+    # Limits of the in-process tier in front of the block structure
+    # cache. A LOCAL_CACHE_MAX_BYTES of 0 disables the tier.
+    LOCAL_CACHE_MAX_ENTRIES=32,
+    LOCAL_CACHE_MAX_BYTES=64 * 1024 * 1024,
 )
 
 ############################ FEATURE CONFIGURATION #############################
@@ -2075,6 +2080,20 @@ CACHES = {
     },
 }
 
+# Limits of the in-process tier in front of the 'course_structure_cache'.
+# A MAX_BYTES of 0 disables the tier.
+COURSE_STRUCTURE_LOCAL_CACHE = {
+    'MAX_ENTRIES': 32,
+    'MAX_BYTES': 64 * 1024 * 1024,
+}
+
+# Local directory where the contentserver keeps the data of course assets too large
+# for the 'course_assets' cache. A MAX_BYTES of 0 disables the tier.
+COURSE_ASSETS_DISK_CACHE = {
+    'DIRECTORY': '/tmp/edx-course-assets',
+    'MAX_BYTES': 2 * 1024 * 1024 * 1024,
+}
+
 ############################ OAUTH2 Provider ###################################
 
 
@@ -2161,6 +2180,10 @@ RECALCULATE_GRADES_ROUTING_KEY = DEFAULT_PRIORITY_QUEUE
 # Queue to use for updating grades due to grading policy change
 POLICY_CHANGE_GRADES_ROUTING_KEY = 'edx.lms.core.default'
 
+# Queue to use for recomputing batch totals after a course weight or batch change
+# in Studio; LMS workers run it so the custom report caches are invalidated.
+BATCH_SCORES_ROUTING_KEY = 'edx.lms.core.high'
+
 SOFTWARE_SECURE_VERIFICATION_ROUTING_KEY = 'edx.lms.core.default'
 
 # Rate limit for regrading tasks that a grading policy change can kick off
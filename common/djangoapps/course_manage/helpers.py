@@ -0,0 +1,133 @@
+"""
+Helpers for the Course Manage app.
+"""
+from completion.models import BlockCompletion
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+
+from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
+from xmodule.modulestore.django import modulestore
+
+COMPLETION_CHUNK_SIZE = 50
+STAFF_OUTLINE_CACHE_KEY = "course_manage.staff_outline.{course_key}"
+STAFF_OUTLINE_CACHE_TIMEOUT = 24 * 60 * 60
+# Course, chapter, sequential and vertical levels.
+STAFF_OUTLINE_DEPTH = 3
+
+
+def _uses_completion_gating(course_key):
+    """
+    Return whether subsections of the course can be gated on completion.
+    """
+    if not course_key.is_course:
+        return False
+    course = modulestore().get_course(course_key)
+    return bool(course and course.enable_subsection_gating)
+
+
+def submit_bulk_completions(course_key, user_ids, block_keys, completion=1.0, unit_key=None):
+    """
+    Store the completion of every block for every user with batched queries.
+
+    Missing completions are bulk created and lower existing ones are raised
+    in one update per chunk of users. Yields the number of users processed
+    after each chunk.
+
+    Bulk queries send no post_save, so the completion milestones the gating
+    app evaluates on each saved BlockCompletion are evaluated here instead,
+    once per user of the chunk for unit_key, the unit holding the blocks
+    (the first block when not given).
+    """
+    # Gating is not installed in Studio, which loads this module too.
+    from lms.djangoapps.gating.tasks import task_evaluate_subsection_completion_milestones
+
+    user_ids = list(user_ids)
+    block_keys = list(block_keys)
+    gated = bool(block_keys) and _uses_completion_gating(course_key)
+    gating_block_id = str(unit_key or (block_keys[0] if block_keys else ''))
+    for offset in range(0, len(user_ids), COMPLETION_CHUNK_SIZE):
+        chunk = user_ids[offset:offset + COMPLETION_CHUNK_SIZE]
+        BlockCompletion.objects.bulk_create(
+            [
+                BlockCompletion(
+                    user_id=user_id,
+                    context_key=course_key,
+                    block_key=block_key,
+                    block_type=block_key.block_type,
+                    completion=completion,
+                )
+                for user_id in chunk
+                for block_key in block_keys
+            ],
+            ignore_conflicts=True,
+        )
+        BlockCompletion.objects.filter(
+            user_id__in=chunk,
+            context_key=course_key,
+            block_key__in=block_keys,
+            completion__lt=completion,
+        ).update(completion=completion, modified=timezone.now())
+        if gated:
+            for user_id in chunk:
+                task_evaluate_subsection_completion_milestones.delay(str(course_key), gating_block_id, user_id)
+        yield offset + len(chunk)
+
+
+def _build_outline_block(block_structure, block_key, depth):
+    """
+    Return the outline dict of the block with children up to given depth.
+
+    The urls are absolute LMS urls, as the outline is cached for every request.
+    """
+    block = {
+        "id": str(block_key),
+        "block_id": block_key.block_id,
+        "lms_web_url": "{}{}".format(
+            settings.LMS_ROOT_URL,
+            reverse("jump_to", kwargs={"course_id": str(block_key.course_key), "location": str(block_key)}),
+        ),
+        "student_view_url": "{}{}".format(
+            settings.LMS_ROOT_URL,
+            reverse("render_xblock", kwargs={"usage_key_string": str(block_key)}),
+        ),
+        "type": block_key.block_type,
+        "display_name": block_structure.get_xblock_field(block_key, "display_name")
+        or block_key.block_id,
+        "graded": block_structure.get_xblock_field(block_key, "graded", False),
+        "format": block_structure.get_xblock_field(block_key, "format"),
+        "start": block_structure.get_xblock_field(block_key, "start"),
+        "due": block_structure.get_xblock_field(block_key, "due"),
+    }
+    if depth > 0:
+        block["children"] = [
+            _build_outline_block(block_structure, child_key, depth - 1)
+            for child_key in block_structure.get_children(block_key)
+        ]
+    return block
+
+
+def get_staff_course_outline(course_key):
+    """
+    Return the course outline as seen by staff, down to units.
+
+    The outline is built from the collected block structure without running
+    any per-user transformer and is cached until the course is published.
+    """
+    cache_key = STAFF_OUTLINE_CACHE_KEY.format(course_key=course_key)
+    outline = cache.get(cache_key)
+    if outline is None:
+        block_structure = get_course_in_cache(course_key)
+        outline = _build_outline_block(
+            block_structure, block_structure.root_block_usage_key, STAFF_OUTLINE_DEPTH
+        )
+        cache.set(cache_key, outline, STAFF_OUTLINE_CACHE_TIMEOUT)
+    return outline
+
+
+def invalidate_staff_course_outline(course_key):
+    """
+    Drop the cached staff outline of the course.
+    """
+    cache.delete(STAFF_OUTLINE_CACHE_KEY.format(course_key=course_key))
@@ -13,18 +13,28 @@ file and check it in at the same time as your model changes. To do that,
 import logging
 
 from model_utils.models import TimeStampedModel
-from django.db import models
+from django.db import models, transaction
 from django.utils.translation import ugettext_lazy as _
 from django.utils.translation import ugettext_noop
 from django.contrib.auth.models import User
 
-from opaque_keys.edx.django.models import CourseKeyField
+from opaque_keys.edx.django.models import CourseKeyField, UsageKeyField
 from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 from common.djangoapps.leaderboard.models import Batch
 
 log = logging.getLogger(__name__)
 
 
+def parse_weight(weight):
+    """
+    Return course weight as float, 0 when it is not set or invalid
+    """
+    try:
+        return float(weight)
+    except (TypeError, ValueError):
+        return 0.0
+
+
 def get_or_none(classmodel, **kwargs):
     """
     Return object if exist otherwise return None
@@ -46,7 +56,8 @@ class CourseManage(TimeStampedModel):
         db_index=True,
         on_delete=models.CASCADE,
     )
-    weight = models.CharField(blank=True, null=True, max_length=32)
+    # Share of the course score in the batch total, in percent.
+    weight = models.FloatField(default=0.0)
     batch = models.ForeignKey(
         Batch, on_delete=models.CASCADE, blank=True, null=True, db_index=True
     )
@@ -63,12 +74,75 @@ class CourseManage(TimeStampedModel):
         """
         Create or update Course Details.
         """
+        from common.djangoapps.leaderboard.tasks import refresh_batch_scores
+
         batch = get_or_none(Batch, id=data_dict.get("batch"))
+        weight = parse_weight(data_dict.get("weight"))
         course, created = cls.objects.get_or_create(course_id=course_id)
-        course.weight = data_dict.get("weight")
+        changed_batch_ids = set()
+        if course.weight != weight or course.batch_id != getattr(batch, "id", None):
+            changed_batch_ids = {course.batch_id, getattr(batch, "id", None)} - {None}
+        course.weight = weight
         course.batch = batch
         course.save()
+        for batch_id in changed_batch_ids:
+            transaction.on_commit(
+                lambda batch_id=batch_id: refresh_batch_scores.delay(batch_id)
+            )
 
     def __enumerable_to_display(self, enumerables, enum_value):
         """Get the human readable value from an enumerable list of key-value pairs."""
         return dict(enumerables)[enum_value]
+
+
+class ModuleAttendance(TimeStampedModel):
+    """
+    Model for store attendance of learners in course units
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    course_id = CourseKeyField(max_length=255, db_index=True)
+    unit_id = UsageKeyField(max_length=255)
+
+    class Meta:
+        verbose_name = "Module Attendance"
+        verbose_name_plural = "Module Attendance"
+        unique_together = ("course_id", "unit_id", "user")
+
+    def __str__(self):
+        return "{} {}".format(self.user_id, self.unit_id)
+
+    @classmethod
+    def create_or_update(cls, course_id, unit_id, user):
+        """
+        Mark the user as attending the unit.
+        """
+        attendance, created = cls.objects.get_or_create(
+            course_id=course_id, unit_id=unit_id, user=user
+        )
+        return attendance
+
+    @classmethod
+    def sync(cls, course_id, unit_id, user_ids):
+        """
+        Make the attendance of the unit match the given users.
+
+        Only the difference with the stored attendance is written, returns
+        (added user ids, removed user ids).
+        """
+        user_ids = set(user_ids)
+        attendance = cls.objects.filter(course_id=course_id, unit_id=unit_id)
+        existing = set(attendance.values_list("user_id", flat=True))
+        added = user_ids - existing
+        removed = existing - user_ids
+        with transaction.atomic():
+            if removed:
+                attendance.filter(user_id__in=removed).delete()
+            cls.objects.bulk_create(
+                [
+                    cls(course_id=course_id, unit_id=unit_id, user_id=user_id)
+                    for user_id in added
+                ],
+                ignore_conflicts=True,
+            )
+        return added, removed
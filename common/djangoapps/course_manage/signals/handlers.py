@@ -3,10 +3,14 @@
 """
 import logging
 
+from django.conf import settings
 from django.dispatch import receiver
+from opaque_keys.edx.locator import LibraryLocator
 from xmodule.modulestore.django import SignalHandler
 from common.djangoapps.student.models import CourseEnrollment
+from ..helpers import invalidate_staff_course_outline
 from ..models import CourseManage
+from ..tasks import expire_staff_course_outline
 
 log = logging.getLogger(__name__)
 
@@ -21,3 +25,24 @@ def _listen_for_course_delete(
     """
     CourseManage.objects.filter(course_id=course_key).delete()
     CourseEnrollment.objects.filter(course_id=course_key).delete()
+    invalidate_staff_course_outline(course_key)
+
+
+@receiver(SignalHandler.course_published)
+def _listen_for_course_publish(
+    sender, course_key, **kwargs
+):  # pylint: disable=unused-argument
+    """
+    Catches the signal that a course has been published and invalidates the
+    cached staff outline of the course.
+
+    The outline is built from the collected block structure which is only
+    updated after a delay, so the outline is dropped again once it is.
+    """
+    if isinstance(course_key, LibraryLocator):
+        return
+    invalidate_staff_course_outline(course_key)
+    expire_staff_course_outline.apply_async(
+        args=[str(course_key)],
+        countdown=2 * settings.BLOCK_STRUCTURES_SETTINGS["COURSE_PUBLISH_TASK_DELAY"],
+    )
@@ -3,7 +3,60 @@ import logging
 
 from django.contrib.auth.models import User
 from django.conf import settings
+from django.core.cache import cache
 from celery.task import task
+from opaque_keys.edx.keys import CourseKey, UsageKey
+
+from .helpers import invalidate_staff_course_outline, submit_bulk_completions
 
 
 log = logging.getLogger(__name__)
+
+ATTENDANCE_PROGRESS_KEY = "course_manage.attendance.progress.{unit_id}"
+ATTENDANCE_PROGRESS_TIMEOUT = 60 * 60
+
+
+def get_attendance_progress(unit_id):
+    """
+    Return progress of the last attendance submission of the unit, None if unknown.
+    """
+    return cache.get(ATTENDANCE_PROGRESS_KEY.format(unit_id=unit_id))
+
+
+def set_attendance_progress(unit_id, state, done, total):
+    cache.set(
+        ATTENDANCE_PROGRESS_KEY.format(unit_id=unit_id),
+        {"state": state, "done": done, "total": total},
+        ATTENDANCE_PROGRESS_TIMEOUT,
+    )
+
+
+@task(routing_key=settings.HIGH_PRIORITY_QUEUE)
+def submit_attendance_completions(course_id, unit_id, user_ids, block_ids):
+    """
+    Mark all blocks of the unit as completed for the attending users.
+    """
+    course_key = CourseKey.from_string(course_id)
+    block_keys = [UsageKey.from_string(block_id) for block_id in block_ids]
+    total = len(user_ids)
+    set_attendance_progress(unit_id, "running", 0, total)
+    try:
+        for done in submit_bulk_completions(
+            course_key, user_ids, block_keys, unit_key=UsageKey.from_string(unit_id)
+        ):
+            set_attendance_progress(unit_id, "running", done, total)
+    except Exception:
+        set_attendance_progress(unit_id, "failed", 0, total)
+        raise
+    set_attendance_progress(unit_id, "done", total, total)
+    log.info(
+        "Submitted completions of %d blocks for %d users in %s", len(block_keys), total, unit_id
+    )
+
+
+@task(routing_key=settings.HIGH_PRIORITY_QUEUE)
+def expire_staff_course_outline(course_id):
+    """
+    Drop the staff outline once the block structure of the course is updated.
+    """
+    invalidate_staff_course_outline(CourseKey.from_string(course_id))
@@ -0,0 +1,50 @@
+"""
+Tests for the Course Manage helpers.
+"""
+from unittest.mock import call, patch
+
+from completion.models import BlockCompletion
+
+from common.djangoapps.student.tests.factories import UserFactory
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+from ..helpers import submit_bulk_completions
+
+
+@patch('lms.djangoapps.gating.tasks.task_evaluate_subsection_completion_milestones')
+class TestSubmitBulkCompletions(ModuleStoreTestCase):
+    """
+    Tests for submit_bulk_completions.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.course = CourseFactory.create(enable_subsection_gating=True)
+        chapter = ItemFactory.create(parent=self.course, category='chapter')
+        sequential = ItemFactory.create(parent=chapter, category='sequential')
+        self.unit = ItemFactory.create(parent=sequential, category='vertical')
+        self.blocks = [ItemFactory.create(parent=self.unit, category='html') for _ in range(2)]
+        self.users = [UserFactory.create() for _ in range(3)]
+
+    def submit(self):
+        return list(submit_bulk_completions(
+            self.course.id,
+            [user.id for user in self.users],
+            [block.location for block in self.blocks],
+            unit_key=self.unit.location,
+        ))
+
+    def test_completions_and_milestones(self, mock_task):
+        assert self.submit() == [3]
+        assert BlockCompletion.objects.filter(context_key=self.course.id, completion=1.0).count() == 6
+        mock_task.delay.assert_has_calls([
+            call(str(self.course.id), str(self.unit.location), user.id) for user in self.users
+        ])
+        assert mock_task.delay.call_count == 3
+
+    def test_no_milestones_without_gating(self, mock_task):
+        self.course.enable_subsection_gating = False
+        self.update_course(self.course, self.user.id)
+        self.submit()
+        assert not mock_task.delay.called
@@ -17,6 +17,11 @@ urlpatterns = [
         CourseDetailView.as_view(),
         name="course-details-view",
     ),
+    url(
+        r"^site-manage/courses/{}/outline/$".format(settings.COURSE_ID_PATTERN),
+        CourseOutlineView.as_view(),
+        name="course-outline-view",
+    ),
     url(
         r"^site-manage/courses/update/unit/$",
         UpdateUnitView.as_view(),
@@ -29,4 +34,11 @@ urlpatterns = [
         StudentAttendanceView.as_view(),
         name="student-attendance",
     ),
+    url(
+        r"^site-manage/courses/{}/(?P<unit_id>.*)/attendance/progress/$".format(
+            settings.COURSE_ID_PATTERN
+        ),
+        StudentAttendanceProgressView.as_view(),
+        name="student-attendance-progress",
+    ),
 ]
@@ -25,11 +25,12 @@ from xmodule.modulestore.django import modulestore
 from opaque_keys.edx.keys import CourseKey, UsageKey
 from edxmako.shortcuts import render_to_response, render_to_string
 from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
-from openedx.features.course_experience.utils import get_course_outline_block_tree
 from common.djangoapps.student.models import CourseEnrollment
 from common.djangoapps.user_manage.decorators import ensure_coordinator_or_pa_access
 
+from .helpers import get_staff_course_outline
 from .models import *
+from .tasks import get_attendance_progress, set_attendance_progress, submit_attendance_completions
 
 
 log = logging.getLogger(__name__)
@@ -77,9 +78,7 @@ class CourseDetailView(View):
         except Exception as e:
             raise Http404("Invalid Course id")
 
-        course_block_tree = get_course_outline_block_tree(
-            request, course_id, request.user
-        )
+        course_block_tree = get_staff_course_outline(course_key)
         course_sections = course_block_tree.get("children")
         modules = list()
         if course_sections:
@@ -91,6 +90,21 @@ class CourseDetailView(View):
         )
 
 
+class CourseOutlineView(View):
+    @method_decorator(login_required)
+    @method_decorator(ensure_coordinator_or_pa_access)
+    def get(self, request, course_id):
+        """
+        Return the cached staff outline of the course in json format.
+        """
+        try:
+            course_key = CourseKey.from_string(course_id)
+        except Exception as e:
+            raise Http404("Invalid Course id")
+
+        return JsonResponse(status=200, data=get_staff_course_outline(course_key))
+
+
 class UpdateUnitView(View):
     @method_decorator(login_required)
     @method_decorator(ensure_coordinator_or_pa_access)
@@ -206,19 +220,23 @@ class StudentAttendanceView(View):
 
         data = request.POST.dict()
         student_ids = json.loads(data.get("student_ids"))
-        students = User.objects.filter(id__in=student_ids)
-        attendance = ModuleAttendance.objects.filter(
-            course_id=course_key, unit_id=unit.scope_ids.usage_id
+        user_ids = list(
+            User.objects.filter(id__in=student_ids).values_list("id", flat=True)
         )
-        attendance.delete()
-        for user in students:
-            for block in unit.get_children():
-                BlockCompletion.objects.submit_completion(
-                    user=user,
-                    block_key=block.scope_ids.usage_id,
-                    completion=1.0,
+        unit_key = unit.scope_ids.usage_id
+        added, removed = ModuleAttendance.sync(course.id, unit_key, user_ids)
+        log.info(
+            "Attendance of %s updated, %d added and %d removed",
+            unit_key, len(added), len(removed),
+        )
+        if user_ids and unit.children:
+            set_attendance_progress(str(unit_key), "pending", 0, len(user_ids))
+            block_ids = [str(block_key) for block_key in unit.children]
+            transaction.on_commit(
+                lambda: submit_attendance_completions.delay(
+                    str(course.id), str(unit_key), user_ids, block_ids
                 )
-            ModuleAttendance.create_or_update(course.id, unit.scope_ids.usage_id, user)
+            )
         return JsonResponse(
             status=200,
             data={
@@ -227,5 +245,27 @@ class StudentAttendanceView(View):
                     "student-attendance", args=[str(course.id), str(unit.location)]
                 ),
                 "message": "Attendace details updated successfully",
+                "progress_url": reverse(
+                    "student-attendance-progress",
+                    args=[str(course.id), str(unit.location)],
+                ),
             },
         )
+
+
+class StudentAttendanceProgressView(View):
+    @method_decorator(login_required)
+    @method_decorator(ensure_coordinator_or_pa_access)
+    def get(self, request, course_id, unit_id):
+        """
+        Return progress of the completions of the last attendance submission.
+        """
+        try:
+            unit_key = UsageKey.from_string(unit_id)
+        except Exception as e:
+            raise Http404("Invalid Unit id")
+
+        progress = get_attendance_progress(str(unit_key))
+        if progress is None:
+            progress = {"state": "unknown", "done": 0, "total": 0}
+        return JsonResponse(status=200, data=progress)
@@ -2,3 +2,16 @@
 
 from django.contrib import admin
 from .models import *
+
+
+class ReportArtifactAdmin(admin.ModelAdmin):
+    """
+    Admin Interface for ReportArtifact Model
+    """
+
+    list_display = ["file_name", "report_type", "batch", "state", "row_count", "size", "created"]
+    list_filter = ["report_type", "state"]
+    raw_id_fields = ["requested_by"]
+
+
+admin.site.register(ReportArtifact, ReportArtifactAdmin)
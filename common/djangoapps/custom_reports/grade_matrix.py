@@ -0,0 +1,200 @@
+"""
+Batch grade matrix used by the custom grade reports.
+
+The matrix holds, for every learner of a batch, the LeaderBoard score and the
+"I"/"C" status of each batch course together with the weighted total. Scores
+and statuses are read from the denormalized LeaderBoard rows in one query, the
+totals from the materialized BatchScore rows in another, and the matrix is
+cached per batch until a grade changes in one of the batch courses.
+"""
+import hashlib
+import itertools
+import json
+import logging
+from collections import namedtuple
+from uuid import uuid4
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Q
+
+from xmodule.modulestore.django import modulestore
+from common.djangoapps.student.models import CourseAccessRole
+from common.djangoapps.course_manage.models import CourseManage
+from common.djangoapps.leaderboard.models import BatchScore, LeaderBoard
+from lms.djangoapps.instructor.utils import get_course_report_layout
+from .helpers import get_course_progresses
+
+log = logging.getLogger(__name__)
+
+GRADE_MATRIX_CACHE_TIMEOUT = 30 * 60
+GRADE_MATRIX_VERSION_KEY = "custom_reports.grade_matrix.version.{batch_id}"
+GRADE_MATRIX_KEY = "custom_reports.grade_matrix.{batch_id}.{version}"
+
+GradeCell = namedtuple("GradeCell", ["score", "status"])
+
+
+def get_batch_courses(batch):
+    """
+    Return CourseManage records of the given batch ordered by course name.
+    """
+    return list(
+        CourseManage.objects.filter(batch=batch)
+        .select_related("course")
+        .order_by("course__display_name")
+    )
+
+
+def get_batch_students(batch, course_ids):
+    """
+    Return active learners of the batch, excluding staff and course team members.
+    """
+    users = User.objects.filter(is_active=True, profile__batch=batch).order_by(
+        "username"
+    )
+    admin_users = set(
+        CourseAccessRole.objects.filter(course_id__in=course_ids).values_list("user")
+    )
+    admin_users = list(itertools.chain(*admin_users))
+    return users.exclude(
+        Q(is_staff=True) | Q(is_superuser=True) | Q(id__in=admin_users)
+    )
+
+
+def get_course_statuses(course_key, user_ids):
+    """
+    Return {user_id: status} computed from persisted grades and SGA submissions.
+
+    Used for learners whose LeaderBoard row does not carry a status yet.
+    """
+    return {
+        user_id: status
+        for user_id, (status, _attempted) in get_course_progresses(course_key, user_ids).items()
+    }
+
+
+class BatchGradeMatrix:
+    """
+    Scores, statuses and weighted totals of all learners of a batch.
+    """
+
+    def __init__(self, course_ids, cells, totals):
+        self.course_ids = course_ids
+        self.cells = cells
+        self.totals = totals
+
+    def __contains__(self, user_id):
+        return user_id in self.cells
+
+    def rows(self, users):
+        """
+        Return (user, cells, total) for given users, cells in course order.
+        """
+        return [(user, self.cells[user.id], self.totals[user.id]) for user in users]
+
+    @classmethod
+    def build(cls, batch, course_manages, users):
+        """
+        Compute the matrix for given CourseManage records and learners.
+        """
+        user_ids = [user.id for user in users]
+        course_ids = [course_manage.course_id for course_manage in course_manages]
+
+        scores, statuses = {}, {}
+        leaderboard = LeaderBoard.objects.filter(
+            course_id__in=course_ids, user_id__in=user_ids
+        ).values_list("user_id", "course_id", "score", "status")
+        for user_id, course_id, score, status in leaderboard:
+            scores[(user_id, course_id)] = score
+            if status is not None:
+                statuses[(user_id, course_id)] = status
+
+        cells = {user_id: [] for user_id in user_ids}
+        for course_manage in course_manages:
+            course_id = course_manage.course_id
+            missing = [
+                user_id for user_id in user_ids if (user_id, course_id) not in statuses
+            ]
+            if missing:
+                with modulestore().bulk_operations(course_id):
+                    computed = get_course_statuses(course_id, missing)
+                for user_id, status in computed.items():
+                    statuses[(user_id, course_id)] = status
+            for user_id in user_ids:
+                score = scores.get((user_id, course_id)) or 0.00
+                status = statuses[(user_id, course_id)] or None
+                cells[user_id].append(GradeCell(score, status))
+
+        totals = dict.fromkeys(user_ids, 0.0)
+        totals.update(
+            BatchScore.objects.filter(batch=batch, user_id__in=user_ids).values_list(
+                "user_id", "total_score"
+            )
+        )
+        return cls(course_ids, cells, totals)
+
+
+def _get_matrix_version(batch_id):
+    """
+    Return the current cache version of the batch grade matrix.
+    """
+    version_key = GRADE_MATRIX_VERSION_KEY.format(batch_id=batch_id)
+    version = cache.get(version_key)
+    if version is None:
+        version = uuid4().hex
+        cache.set(version_key, version, None)
+    return version
+
+
+def invalidate_batch_grade_matrix(batch_id):
+    """
+    Drop the cached grade matrix of the batch.
+    """
+    cache.set(GRADE_MATRIX_VERSION_KEY.format(batch_id=batch_id), uuid4().hex, None)
+
+
+def get_batch_data_version(batch, course_manages, user_ids):
+    """
+    Return a digest of the data batch reports are built from.
+
+    It changes whenever a grade or status in the batch courses, the course
+    content, the course weights or the batch learners change.
+    """
+    data = [
+        _get_matrix_version(batch.id),
+        [
+            [str(course_manage.course_id), course_manage.weight,
+             str(get_course_report_layout(course_manage.course_id).version)]
+            for course_manage in course_manages
+        ],
+        sorted(user_ids),
+    ]
+    return hashlib.sha256(json.dumps(data).encode("utf-8")).hexdigest()
+
+
+def get_batch_grade_matrix(batch, course_manages=None, users=None):
+    """
+    Return the BatchGradeMatrix of the batch, from cache when it is up to date.
+    """
+    if course_manages is None:
+        course_manages = get_batch_courses(batch)
+    course_ids = [course_manage.course_id for course_manage in course_manages]
+    if users is None:
+        users = get_batch_students(batch, course_ids)
+    users = list(users)
+
+    cache_key = GRADE_MATRIX_KEY.format(
+        batch_id=batch.id, version=_get_matrix_version(batch.id)
+    )
+    matrix = cache.get(cache_key)
+    if (
+        matrix is not None
+        and matrix.course_ids == course_ids
+        and all(user.id in matrix for user in users)
+    ):
+        return matrix
+
+    log.info("Building grade matrix for batch %s", batch.id)
+    matrix = BatchGradeMatrix.build(batch, course_manages, users)
+    cache.set(cache_key, matrix, GRADE_MATRIX_CACHE_TIMEOUT)
+    return matrix
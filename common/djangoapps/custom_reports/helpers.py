@@ -1,42 +1,95 @@
-from xmodule.modulestore.django import modulestore
-from lms.djangoapps.courseware.courses import get_course_with_access
-from lms.djangoapps.instructor.utils import check_sga_in_subsection
-from lms.djangoapps.grades.api import CourseGradeFactory
-
-
-def get_course_status(staff_user, course_key, student):
-    from lms.djangoapps.instructor.utils import get_module_for_student
-
-    course = get_course_with_access(staff_user, "staff", course_key, depth=None)
-
-    with modulestore().bulk_operations(course.location.course_key):
-        course_grade = CourseGradeFactory().read(student, course)
-        courseware_summary = course_grade.customized_chapter_grades
-
-    sga_blocks = modulestore().get_items(course_key, qualifiers={"category": "edx_sga"})
-    not_attempted = not_graded = False
-    for block in sga_blocks:
-        module = get_module_for_student(student, block.location)
-        if module:
-            if not module.student_state().get("uploaded", None):
-                not_attempted = True
-            elif module.score:
-                sumbission_msg = "{0:.0f}%".format(module.score)
-            else:
-                not_graded = True
-
-    for chapter in courseware_summary:
-        if not chapter["display_name"] == "hidden":
-            for section in chapter["sections"]:
-                if section.graded and not check_sga_in_subsection(
-                    section.location, staff_user
-                ):
-                    if not section._should_persist_per_attempted():
-                        not_attempted = True
+"""
+Course status helpers shared by the custom reports and the leaderboard.
+
+A learner is incomplete ("I") in a course when an SGA block has no submission
+or a graded subsection without SGA has not been attempted, and not graded ("C")
+when an SGA submission is still waiting for a score.
+"""
+from lms.djangoapps.grades.models import PersistentSubsectionGrade
+from lms.djangoapps.instructor.utils import (
+    NOT_SUBMITTED_SGA_STATE,
+    get_course_report_layout,
+    get_sga_states,
+)
+
+STATUS_INCOMPLETE = "I"
+STATUS_NOT_GRADED = "C"
+STATUS_COMPLETE = ""
+
+
+def get_attempted_subsections(course_key, user_ids):
+    """
+    Return {user_id: set of attempted subsection keys} from persisted grades.
+    """
+    attempted = {}
+    grades = PersistentSubsectionGrade.objects.filter(
+        course_id=course_key, user_id__in=user_ids, first_attempted__isnull=False
+    ).values_list("user_id", "usage_key")
+    for user_id, usage_key in grades:
+        attempted.setdefault(user_id, set()).add(usage_key.map_into_course(course_key))
+    return attempted
+
+
+def compute_course_status(user_id, subsections_attempted, sga_blocks, sga_states):
+    """
+    Return "I", "C" or "" for the learner.
+
+    subsections_attempted maps graded subsections without SGA to their
+    attempted flag.
+    """
+    not_attempted = not all(subsections_attempted.values())
+    not_graded = False
+    for block_key in sga_blocks:
+        sga_state = sga_states.get((user_id, str(block_key)), NOT_SUBMITTED_SGA_STATE)
+        if not sga_state.uploaded:
+            not_attempted = True
+        elif not sga_state.score:
+            not_graded = True
 
     if not_attempted:
-        return "I"
+        return STATUS_INCOMPLETE
     elif not_graded:
-        return "C"
-    else:
-        return None
+        return STATUS_NOT_GRADED
+    return STATUS_COMPLETE
+
+
+def get_course_progress(user, course_key):
+    """
+    Return (status, subsections_attempted) of the learner in the course.
+    """
+    attempted = get_attempted_subsections(course_key, [user.id]).get(user.id, set())
+
+    layout = get_course_report_layout(course_key)
+    subsections_attempted = {
+        str(key): key in attempted for key in layout.graded_subsections_without_sga
+    }
+    sga_states = get_sga_states(course_key, [user.id], layout.sga_blocks)
+    status = compute_course_status(
+        user.id, subsections_attempted, layout.sga_blocks, sga_states
+    )
+    return status, subsections_attempted
+
+
+def get_course_progresses(course_key, user_ids):
+    """
+    Return {user_id: (status, subsections_attempted)} from persisted grades.
+
+    Bulk counterpart of get_course_progress reading the grades and SGA
+    submissions of all given learners at once.
+    """
+    layout = get_course_report_layout(course_key)
+    attempted = get_attempted_subsections(course_key, user_ids)
+    sga_states = get_sga_states(course_key, user_ids, layout.sga_blocks)
+
+    progresses = {}
+    for user_id in user_ids:
+        user_attempted = attempted.get(user_id, set())
+        subsections_attempted = {
+            str(key): key in user_attempted
+            for key in layout.graded_subsections_without_sga
+        }
+        status = compute_course_status(
+            user_id, subsections_attempted, layout.sga_blocks, sga_states
+        )
+        progresses[user_id] = (status, subsections_attempted)
+    return progresses
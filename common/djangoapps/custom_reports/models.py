@@ -10,8 +10,135 @@ file and check it in at the same time as your model changes. To do that,
 2. ./manage.py lms makemigrations --settings=production custom_report
 3. ./manage.py lms migrate --settings=production custom_report
 """
+from datetime import timedelta
+
 from django.db import models
 
 from django.contrib.auth.models import User
+from django.utils import timezone
 from model_utils.models import TimeStampedModel
 from opaque_keys.edx.django.models import CourseKeyField, UsageKeyField
+
+from common.djangoapps.leaderboard.models import Batch
+
+
+class ReportArtifact(TimeStampedModel):
+    """
+    Model for store generated report files and their generation state
+    """
+
+    GRADE_REPORT = "grade_data"
+    PROGRAM_REPORT = "program_details"
+    REPORT_TYPES = (
+        (GRADE_REPORT, "Grade Report"),
+        (PROGRAM_REPORT, "Program Report"),
+    )
+
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    STATES = (
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (SUCCEEDED, "Succeeded"),
+        (FAILED, "Failed"),
+    )
+    # A pending or running artifact left unchanged for longer, e.g. because its
+    # worker died, is considered failed. Running subtasks refresh the artifact
+    # as they progress, see heartbeat.
+    STALE_TIMEOUT = timedelta(hours=1)
+
+    requested_by = models.ForeignKey(User, on_delete=models.CASCADE)
+    batch = models.ForeignKey(Batch, on_delete=models.CASCADE)
+    report_type = models.CharField(max_length=32, choices=REPORT_TYPES)
+    # Digest of the data the report is built from, see get_batch_data_version.
+    data_version = models.CharField(max_length=64)
+    state = models.CharField(max_length=16, choices=STATES, default=PENDING)
+    task_id = models.CharField(max_length=255, blank=True, null=True)
+    progress_done = models.PositiveIntegerField(default=0)
+    progress_total = models.PositiveIntegerField(default=1)
+    file_name = models.CharField(max_length=255)
+    # Name of the file in the default storage, set once generated.
+    path = models.CharField(max_length=512, blank=True, null=True)
+    row_count = models.PositiveIntegerField(default=0)
+    size = models.BigIntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+
+    class Meta:
+        verbose_name = "Report Artifact"
+        verbose_name_plural = "Report Artifacts"
+        unique_together = ("batch", "report_type", "data_version")
+        indexes = [
+            models.Index(fields=["report_type", "-created"], name="report_type_created"),
+        ]
+
+    def __str__(self):
+        return self.file_name
+
+    @property
+    def progress(self):
+        """
+        Return the generation progress in percent.
+        """
+        if self.state == self.SUCCEEDED:
+            return 100
+        return int(100 * self.progress_done / max(self.progress_total, 1))
+
+    @classmethod
+    def get_or_request(cls, user, batch, report_type, data_version, file_name):
+        """
+        Return (artifact, created) for the report of the given data version.
+
+        An in-flight or finished artifact of the same data is reused, a failed
+        or stale one is reset to be generated again.
+        """
+        artifact, created = cls.objects.get_or_create(
+            batch=batch,
+            report_type=report_type,
+            data_version=data_version,
+            defaults={"requested_by": user, "file_name": file_name},
+        )
+        if not created and (artifact.state == cls.FAILED or artifact.is_stale):
+            artifact.requested_by = user
+            artifact.file_name = file_name
+            artifact.state = cls.PENDING
+            artifact.progress_done = 0
+            artifact.error = ""
+            artifact.save()
+            created = True
+        return artifact, created
+
+    @property
+    def is_stale(self):
+        """
+        Return whether the artifact stopped progressing before it finished.
+        """
+        return (
+            self.state in (self.PENDING, self.RUNNING)
+            and self.modified < timezone.now() - self.STALE_TIMEOUT
+        )
+
+    def set_state(self, state, **fields):
+        """
+        Store the new state together with given fields.
+        """
+        self.state = state
+        for name, value in fields.items():
+            setattr(self, name, value)
+        self.save(update_fields=["state", "modified"] + list(fields))
+
+    def advance(self, steps=1):
+        """
+        Count finished generation steps, safe for concurrent subtasks.
+        """
+        ReportArtifact.objects.filter(id=self.id).update(
+            progress_done=models.F("progress_done") + steps,
+            modified=timezone.now(),
+        )
+
+    def heartbeat(self):
+        """
+        Mark the artifact as still progressing without changing its state.
+        """
+        ReportArtifact.objects.filter(id=self.id).update(modified=timezone.now())
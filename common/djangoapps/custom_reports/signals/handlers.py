@@ -1,16 +1,47 @@
+"""
+Custom report signal handlers.
+"""
 from django.dispatch import receiver
 
-from ..models import LeaderBoard
-from .signals import CUSTOM_COURSE_GRADE_CHANGED
+from common.djangoapps.course_manage.models import CourseManage
+from common.djangoapps.leaderboard.signals.signals import (
+    BATCH_SCORES_CHANGED,
+    LEADERBOARD_SCORES_FLUSHED,
+    LEADERBOARD_STATUS_CHANGED,
+)
+from ..grade_matrix import invalidate_batch_grade_matrix
 
 
-@receiver(CUSTOM_COURSE_GRADE_CHANGED)
-def update_leaderboard(user, course, grade, **kwargs):
-    points = grade.percent * 100
-    passing_grade = course.lowest_passing_grade * 100
-    leaderboard, _created = LeaderBoard.objects.get_or_create(
-        user=user, course_id=course.id
-    )
-    leaderboard.score = points
-    leaderboard.has_passed = True if points >= passing_grade else False
-    leaderboard.save()
+def _invalidate_course_batches(course_key):
+    """
+    Drop cached grade matrices of the batches the course belongs to.
+    """
+    batch_ids = CourseManage.objects.filter(
+        course_id=course_key, batch__isnull=False
+    ).values_list("batch_id", flat=True)
+    for batch_id in batch_ids:
+        invalidate_batch_grade_matrix(batch_id)
+
+
+@receiver(LEADERBOARD_SCORES_FLUSHED)
+def invalidate_grade_matrix(course_key, user_ids, **kwargs):
+    """
+    Invalidate batch grade matrices once new course scores are written.
+    """
+    _invalidate_course_batches(course_key)
+
+
+@receiver(LEADERBOARD_STATUS_CHANGED)
+def invalidate_grade_matrix_on_status(user, course_key, **kwargs):
+    """
+    Invalidate batch grade matrices when a learner's course status changes.
+    """
+    _invalidate_course_batches(course_key)
+
+
+@receiver(BATCH_SCORES_CHANGED)
+def invalidate_grade_matrix_on_batch_scores(batch_id, **kwargs):
+    """
+    Invalidate the batch grade matrix when course weights or batch courses change.
+    """
+    invalidate_batch_grade_matrix(batch_id)
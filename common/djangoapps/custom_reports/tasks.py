@@ -1,200 +1,354 @@
 """
 This file contains celery tasks
 """
-import os
 import csv
+import codecs
+import tempfile
 import logging
-import time
 import itertools
-from collections import OrderedDict
-import datetime as default_datetime
-from datetime import datetime, timedelta, date
+from contextlib import ExitStack
+from uuid import uuid4
 
+from celery import chord
 from celery.task import task
-from django.db.models import Q
 from django.contrib.auth.models import User
 from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from opaque_keys.edx.keys import CourseKey
 
 from xmodule.modulestore.django import modulestore
-from lms.djangoapps.instructor.views.gradebook_api import get_grade_book_page
-from lms.djangoapps.instructor.utils import get_module_for_student
+from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
 from lms.djangoapps.courseware.courses import get_course_with_access
-from lms.djangoapps.instructor.utils import check_sga_in_subsection
-from lms.djangoapps.grades.api import CourseGradeFactory
-from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
-from common.djangoapps.student.models import CourseAccessRole
-from common.djangoapps.course_manage.models import CourseManage
-from common.djangoapps.leaderboard.models import LeaderBoard, Batch
-from .helpers import get_course_status
+from lms.djangoapps.instructor.utils import (
+    NOT_SUBMITTED_SGA_STATE,
+    get_course_report_layout,
+    get_sga_states,
+)
+from lms.djangoapps.grades.api import (
+    CourseGradeFactory,
+    clear_prefetched_course_and_subsection_grades,
+    prefetch_course_and_subsection_grades,
+)
+from .grade_matrix import get_batch_courses, get_batch_grade_matrix, get_batch_students
+from .models import ReportArtifact
 
 log = logging.getLogger(__name__)
 
+PROGRAM_REPORT_USER_BATCH_SIZE = 100
 
-def validate_directory(dir_path):
+
+def get_report_path(artifact):
     """
-    Create directory if not exixt and return
+    Return the storage name the report of the artifact is saved under.
     """
-    if not os.path.isdir(dir_path):
-        os.makedirs(dir_path)
-
-    return os.chdir(dir_path)
+    return "custom_reports/{username}/{report_type}/{file_name}".format(
+        username=artifact.requested_by.username,
+        report_type=artifact.report_type,
+        file_name=artifact.file_name,
+    )
 
 
-def write_csv_file(filename, data):
+def _start_artifact(artifact_id, current_task, progress_total=1):
     """
-    Write data into given csv file.
+    Mark the artifact as running and return it.
     """
-    with open(filename, "wb") as csv_file:
-        writer = csv.writer(csv_file, delimiter=",")
-        writer.writerows(data)
-
-
-@task(routing_key=settings.HIGH_PRIORITY_QUEUE)
-def generate_grade_report_csv(username, batch):
-    staff_user = User.objects.get(username=username)
-    batch = Batch.objects.get(id=batch)
-    report_dir = "custom_reports/{username}/grade_data".format(username=str(username))
-    dir_path = "{media_root}{report_dir}/".format(
-        media_root=settings.MEDIA_ROOT, report_dir=report_dir
+    artifact = ReportArtifact.objects.select_related("batch", "requested_by").get(
+        id=artifact_id
     )
-    validate_directory(dir_path)
-    current_time = time.strftime("%d_%m_%Y__%H_%M_%S")
-    file_name = "GRADE_REPORT_{batch}_{time}.csv".format(
-        batch=batch.name, time=current_time
+    artifact.set_state(
+        ReportArtifact.RUNNING,
+        task_id=current_task.request.id,
+        progress_total=progress_total,
     )
-    file_name = "REPORT_{time}.csv".format(time=current_time)
-    file_path = dir_path + file_name
+    return artifact
 
-    users = User.objects.filter(is_active=True, profile__batch=batch).order_by(
-        "username"
-    )
-    courses = CourseManage.objects.filter(batch=batch).order_by("course__display_name")
-    courses = [course_mange.course for course_mange in courses]
-    course_ids = [course.id for course in courses]
-    admin_users = set(
-        CourseAccessRole.objects.filter(course_id__in=course_ids).values_list("user")
+
+def _finish_artifact(artifact, path, row_count):
+    """
+    Store the generated file details on the artifact.
+    """
+    artifact.set_state(
+        ReportArtifact.SUCCEEDED,
+        path=path,
+        row_count=row_count,
+        size=default_storage.size(path),
+        progress_done=artifact.progress_total,
     )
-    admin_users = list(itertools.chain(*admin_users))
-    users = users.exclude(
-        Q(is_staff=True) | Q(is_superuser=True) | Q(id__in=admin_users)
+    log.info("Report %s saved to %s", artifact.id, path)
+
+
+def _fail_artifact(artifact_id, exc):
+    """
+    Mark the artifact as failed so that a new request regenerates it.
+    """
+    log.exception("Report %s generation failed", artifact_id)
+    ReportArtifact.objects.filter(id=artifact_id).update(
+        state=ReportArtifact.FAILED, error=str(exc)
     )
-    header_data = [
-        "",
-    ]
-    for course in courses:
-        header_data.append(course.display_name)
-    header_data.append("Total(%)")
-
-    row_data = [header_data]
-    for user in users:
-        student_info = [user.username]
-        total_score = 0
-        for course in courses:
-            score = LeaderBoard.get_score(user, course.id)
-            status = get_course_status(staff_user, course.id, user)
-            if status:
-                student_info.append("{} ({})".format(score, status))
-            else:
-                student_info.append(score)
-            try:
-                weighted_score = (score * float(course.course_weight)) / 100
-                total_score += weighted_score
-            except Exception as e:
-                total_score += 0
-        student_info.append(total_score)
-        row_data.append(student_info)
-    write_csv_file(file_path, row_data)
 
 
 @task(routing_key=settings.HIGH_PRIORITY_QUEUE)
-def generate_program_report_csv(username, batch):
-    user = User.objects.get(username=username)
-    batch = Batch.objects.get(id=batch)
+def generate_grade_report_csv(artifact_id):
+    """
+    Generate the grade report of the artifact batch.
+    """
+    try:
+        artifact = _start_artifact(artifact_id, generate_grade_report_csv)
+        batch = artifact.batch
+        course_manages = get_batch_courses(batch)
+        courses = [course_manage.course for course_manage in course_manages]
+        users = get_batch_students(batch, [course.id for course in courses])
+        matrix = get_batch_grade_matrix(batch, course_manages, users)
+        header_data = [
+            "",
+        ]
+        for course in courses:
+            header_data.append(course.display_name)
+        header_data.append("Total(%)")
 
-    report_dir = "custom_reports/{username}/program_details".format(
-        username=str(username)
-    )
-    dir_path = "{media_root}{report_dir}/".format(
-        media_root=settings.MEDIA_ROOT, report_dir=report_dir
-    )
-    validate_directory(dir_path)
-    current_time = time.strftime("%d_%m_%Y__%H_%M_%S")
-    file_name = "DETAILED_REPORT_{batch}_{time}.csv".format(
-        batch=batch.name, time=current_time
-    )
-    file_path = dir_path + file_name
+        row_data = [header_data]
+        for user, cells, total_score in matrix.rows(users):
+            student_info = [user.username]
+            for cell in cells:
+                if cell.status:
+                    student_info.append("{} ({})".format(cell.score, cell.status))
+                else:
+                    student_info.append(cell.score)
+            student_info.append(total_score)
+            row_data.append(student_info)
+        path, row_count = _save_csv_rows(get_report_path(artifact), row_data)
+        _finish_artifact(artifact, path, row_count)
+    except Exception as exc:
+        _fail_artifact(artifact_id, exc)
+        raise
 
-    users = User.objects.filter(is_active=True, profile__batch=batch).order_by(
-        "username"
-    )
-    courses = CourseManage.objects.filter(batch=batch).order_by("course__display_name")
-    courses = [course_mange.course for course_mange in courses]
-    course_ids = [course.id for course in courses]
-    admin_users = set(
-        CourseAccessRole.objects.filter(course_id__in=course_ids).values_list("user")
+
+def format_subsection_score(subsection_summary):
+    """
+    Return the subsection score as shown in the program report.
+    """
+    if subsection_summary is None:
+        return 0
+    earned = subsection_summary.earned
+    total = subsection_summary.possible
+    return "{0:.0%}".format(float(earned) / total) if earned > 0 and total > 0 else 0
+
+
+def format_sga_state(sga_state):
+    """
+    Return the SGA submission message as shown in the program report.
+    """
+    if not sga_state.uploaded:
+        return "NS"
+    elif sga_state.score:
+        return "{0:.0f}%".format(sga_state.score)
+    return "NG"
+
+
+def _open_csv_reader(csv_file):
+    """
+    Return a csv reader over a binary file of the default storage.
+    """
+    return csv.reader(codecs.getreader("utf-8")(csv_file))
+
+
+def _save_csv_rows(path, rows):
+    """
+    Stream rows into a temporary file and save it to the default storage.
+
+    Returns the name the file was saved under and the number of rows.
+    """
+    row_count = 0
+    with tempfile.TemporaryFile(mode="w+", newline="") as csv_file:
+        writer = csv.writer(csv_file, delimiter=",")
+        for row in rows:
+            writer.writerow(row)
+            row_count += 1
+        csv_file.seek(0)
+        return default_storage.save(path, File(csv_file)), row_count
+
+
+def _iter_program_course_block(artifact, course_key, user_ids):
+    """
+    Yield the column block of the course in the program report.
+
+    The first two rows are the course and column headers, followed by one row
+    per user in the order of user_ids starting with the username. The artifact
+    is marked as progressing after each batch of users, so that a long running
+    block is not taken for a stale one.
+    """
+    course = get_course_with_access(artifact.requested_by, "staff", course_key, depth=None)
+    collected_structure = get_course_in_cache(course_key)
+    layout = get_course_report_layout(course_key)
+    graded_subsections = layout.graded_subsections_without_sga
+    sga_blocks = layout.sga_blocks
+
+    yield [""] + [course.display_name] + [""] * (
+        len(graded_subsections) + len(sga_blocks) + 1
     )
-    admin_users = list(itertools.chain(*admin_users))
-    users = users.exclude(
-        Q(is_staff=True) | Q(is_superuser=True) | Q(id__in=admin_users)
+    yield (
+        [""]
+        + ["Total"]
+        + [layout.display_name(key) for key in graded_subsections]
+        + [layout.display_name(key) for key in sga_blocks]
+        + [""]
     )
-    row_data = []
-    for student in users:
-        student_info = [student.username]
-        header_data = [
-            "",
+
+    users_by_id = User.objects.in_bulk(user_ids)
+    for offset in range(0, len(user_ids), PROGRAM_REPORT_USER_BATCH_SIZE):
+        users = [
+            users_by_id[user_id]
+            for user_id in user_ids[offset:offset + PROGRAM_REPORT_USER_BATCH_SIZE]
         ]
-        course_header = [
-            "",
+        prefetch_course_and_subsection_grades(course_key, users)
+        sga_states = get_sga_states(course_key, [user.id for user in users], sga_blocks)
+        try:
+            for student, course_grade, error in CourseGradeFactory().iter(
+                users, course=course, collected_block_structure=collected_structure
+            ):
+                row = [student.username]
+                if error:
+                    row += [""] * (len(graded_subsections) + len(sga_blocks) + 2)
+                    yield row
+                    continue
+                row.append("{0:.0f}%".format(100 * course_grade.percent))
+                summaries = {
+                    summary.location: summary
+                    for chapter in course_grade.chapter_grade_summaries
+                    for summary in chapter["sections"]
+                }
+                for subsection_key in graded_subsections:
+                    row.append(format_subsection_score(summaries.get(subsection_key)))
+                for block_key in sga_blocks:
+                    row.append(
+                        format_sga_state(
+                            sga_states.get((student.id, str(block_key)), NOT_SUBMITTED_SGA_STATE)
+                        )
+                    )
+                row.append("")
+                yield row
+        finally:
+            clear_prefetched_course_and_subsection_grades(course_key)
+        artifact.heartbeat()
+
+
+@task(routing_key=settings.HIGH_PRIORITY_QUEUE)
+def generate_program_course_block(artifact_id, course_id, user_ids, block_path):
+    """
+    Write the program report column block of one course to the storage.
+    """
+    try:
+        artifact = ReportArtifact.objects.select_related("requested_by").get(
+            id=artifact_id
+        )
+        course_key = CourseKey.from_string(course_id)
+        with modulestore().bulk_operations(course_key):
+            block_path, _row_count = _save_csv_rows(
+                block_path,
+                _iter_program_course_block(artifact, course_key, user_ids),
+            )
+        artifact.advance()
+        return block_path
+    except Exception as exc:
+        _fail_artifact(artifact_id, exc)
+        raise
+
+
+def _iter_merged_rows(block_paths):
+    """
+    Yield report rows joining the course blocks line by line.
+    """
+    with ExitStack() as stack:
+        readers = [
+            _open_csv_reader(stack.enter_context(default_storage.open(path, "rb")))
+            for path in block_paths
         ]
-        for course in courses:
-            course_header.append(course.display_name)
-            course_key = course.id
-            course = get_course_with_access(user, "staff", course_key, depth=None)
-            with modulestore().bulk_operations(course.location.course_key):
-                course_grade = CourseGradeFactory().read(student, course)
-                courseware_summary = course_grade.customized_chapter_grades
-                grade_summary = course_grade.summary
-
-            header_data.append("Total")
-            total_score = "{0:.0f}%".format(100 * grade_summary["percent"])
-            student_info.append(total_score)
-            for chapter in courseware_summary:
-                if not chapter["display_name"] == "hidden":
-                    for section in chapter["sections"]:
-                        if section.graded and not check_sga_in_subsection(
-                            section.location, user
-                        ):
-                            header_data.append(section.display_name)
-                            earned = section.all_total.earned
-                            total = section.all_total.possible
-                            score = (
-                                "{0:.0%}".format(float(earned) / total)
-                                if earned > 0 and total > 0
-                                else 0
-                            )
-                            student_info.append(score)
-                            course_header.append("")
-            sumbission_msg = "NS"
-            sga_blocks = modulestore().get_items(
-                course_key, qualifiers={"category": "edx_sga"}
+        for block_rows in zip(*readers):
+            row = [block_rows[0][0]]
+            for block_row in block_rows:
+                row.extend(block_row[1:])
+            yield row
+
+
+@task(routing_key=settings.HIGH_PRIORITY_QUEUE)
+def merge_program_report_blocks(block_paths, artifact_id):
+    """
+    Merge the per course blocks into the program report and drop them.
+    """
+    try:
+        artifact = ReportArtifact.objects.select_related("requested_by").get(
+            id=artifact_id
+        )
+        report_path, row_count = _save_csv_rows(
+            get_report_path(artifact), _iter_merged_rows(block_paths)
+        )
+        _finish_artifact(artifact, report_path, row_count)
+        return report_path
+    except Exception as exc:
+        _fail_artifact(artifact_id, exc)
+        raise
+    finally:
+        for path in block_paths:
+            default_storage.delete(path)
+
+
+@task(routing_key=settings.HIGH_PRIORITY_QUEUE)
+def delete_program_report_blocks(request, exc, traceback, blocks_dir):  # pylint: disable=unused-argument
+    """
+    Drop the course blocks saved before a program report subtask failed.
+    """
+    try:
+        _dir_names, file_names = default_storage.listdir(blocks_dir)
+    except OSError:
+        return
+    for file_name in file_names:
+        default_storage.delete("{}/{}".format(blocks_dir, file_name))
+
+
+@task(routing_key=settings.HIGH_PRIORITY_QUEUE)
+def generate_program_report_csv(artifact_id):
+    """
+    Generate the detailed program report of the artifact batch.
+
+    One subtask per course computes its column block for all learners of the
+    batch, and the blocks are then merged row by row into the final report.
+    """
+    try:
+        artifact = _start_artifact(artifact_id, generate_program_report_csv)
+        batch = artifact.batch
+        blocks_dir = "custom_reports/{username}/tmp/{uuid}".format(
+            username=artifact.requested_by.username, uuid=uuid4().hex
+        )
+
+        course_manages = get_batch_courses(batch)
+        course_ids = [course_manage.course_id for course_manage in course_manages]
+        users = get_batch_students(batch, course_ids)
+        user_ids = list(users.values_list("id", flat=True))
+        if not course_ids:
+            rows = ([student] for student in users.values_list("username", flat=True))
+            report_path, row_count = _save_csv_rows(
+                get_report_path(artifact), itertools.chain([[""], [""]], rows)
+            )
+            _finish_artifact(artifact, report_path, row_count)
+            return
+
+        # One step per course block and one for the merge.
+        artifact.set_state(ReportArtifact.RUNNING, progress_total=len(course_ids) + 1)
+        course_blocks = [
+            generate_program_course_block.s(
+                artifact_id,
+                str(course_id),
+                user_ids,
+                "{}/{}.csv".format(blocks_dir, index),
+            )
+            for index, course_id in enumerate(course_ids)
+        ]
+        chord(course_blocks)(
+            merge_program_report_blocks.s(artifact_id).on_error(
+                delete_program_report_blocks.s(blocks_dir)
             )
-            sga_blocks.sort(key=lambda x: x.display_name)
-            for block in sga_blocks:
-                module = get_module_for_student(student, block.location)
-                header_data.append(block.display_name)
-                if module:
-                    if not module.student_state().get("uploaded", None):
-                        sumbission_msg = "NS"
-                    elif module.score:
-                        sumbission_msg = "{0:.0f}%".format(module.score)
-                    else:
-                        sumbission_msg = "NG"
-                student_info.append(sumbission_msg)
-                course_header.append("")
-            header_data.append("")
-            student_info.append("")
-            course_header.append("")
-        row_data.append(student_info)
-    csv_data = [course_header, header_data]
-    csv_data += row_data
-    write_csv_file(file_path, csv_data)
+        )
+    except Exception as exc:
+        _fail_artifact(artifact_id, exc)
+        raise
@@ -0,0 +1,126 @@
+"""
+Tests for the custom report models.
+"""
+from django.test import TestCase
+from django.utils import timezone
+
+from common.djangoapps.leaderboard.models import Batch
+from common.djangoapps.student.tests.factories import UserFactory
+
+from ..models import ReportArtifact
+
+
+class TestReportArtifact(TestCase):
+    """
+    Tests for the generation state of ReportArtifact.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = UserFactory()
+        self.other_user = UserFactory()
+        self.batch = Batch.objects.create(name='batch')
+
+    def request(self, user=None, data_version='v1', file_name='report.csv'):
+        return ReportArtifact.get_or_request(
+            user or self.user, self.batch, ReportArtifact.GRADE_REPORT, data_version, file_name
+        )
+
+    def make_stale(self, artifact):
+        ReportArtifact.objects.filter(id=artifact.id).update(
+            modified=timezone.now() - ReportArtifact.STALE_TIMEOUT * 2
+        )
+        artifact.refresh_from_db()
+
+    def test_request_creates_pending_artifact(self):
+        artifact, created = self.request()
+        assert created
+        assert artifact.state == ReportArtifact.PENDING
+        assert artifact.progress == 0
+
+    def test_same_data_reuses_artifact(self):
+        artifact, _created = self.request()
+        for state in (ReportArtifact.PENDING, ReportArtifact.RUNNING, ReportArtifact.SUCCEEDED):
+            artifact.set_state(state)
+            reused, created = self.request(user=self.other_user, file_name='other.csv')
+            assert not created
+            assert reused.id == artifact.id
+            assert reused.requested_by == self.user
+            assert reused.file_name == 'report.csv'
+
+    def test_new_data_creates_artifact(self):
+        artifact, _created = self.request()
+        other, created = self.request(data_version='v2')
+        assert created
+        assert other.id != artifact.id
+
+    def test_failed_artifact_is_regenerated(self):
+        artifact, _created = self.request()
+        artifact.set_state(ReportArtifact.RUNNING, progress_total=3, progress_done=2)
+        artifact.set_state(ReportArtifact.FAILED, error='boom')
+
+        reset, created = self.request(user=self.other_user, file_name='other.csv')
+
+        assert created
+        assert reset.id == artifact.id
+        assert reset.state == ReportArtifact.PENDING
+        assert reset.progress_done == 0
+        assert reset.error == ''
+        assert reset.requested_by == self.other_user
+        assert reset.file_name == 'other.csv'
+
+    def test_stale_artifacts_are_regenerated(self):
+        artifact, _created = self.request()
+        for state in (ReportArtifact.PENDING, ReportArtifact.RUNNING):
+            artifact.set_state(state)
+            self.make_stale(artifact)
+            assert artifact.is_stale
+
+            reset, created = self.request()
+
+            assert created
+            assert reset.state == ReportArtifact.PENDING
+            assert not reset.is_stale
+
+    def test_old_succeeded_artifact_is_not_stale(self):
+        artifact, _created = self.request()
+        artifact.set_state(ReportArtifact.SUCCEEDED)
+        self.make_stale(artifact)
+        assert not artifact.is_stale
+        assert not self.request()[1]
+
+    def test_advance(self):
+        artifact, _created = self.request()
+        artifact.set_state(ReportArtifact.RUNNING, progress_total=4)
+        self.make_stale(artifact)
+
+        artifact.advance()
+        artifact.advance(2)
+        artifact.refresh_from_db()
+
+        assert artifact.progress_done == 3
+        assert artifact.progress == 75
+        assert not artifact.is_stale
+        artifact.set_state(ReportArtifact.SUCCEEDED)
+        assert artifact.progress == 100
+
+    def test_heartbeat_keeps_running_artifact(self):
+        artifact, _created = self.request()
+        artifact.set_state(ReportArtifact.RUNNING, progress_total=2)
+        self.make_stale(artifact)
+
+        artifact.heartbeat()
+        artifact.refresh_from_db()
+
+        assert artifact.state == ReportArtifact.RUNNING
+        assert artifact.progress_done == 0
+        assert not artifact.is_stale
+        assert not self.request()[1]
+
+    def test_heartbeat_keeps_failed_state(self):
+        artifact, _created = self.request()
+        artifact.set_state(ReportArtifact.FAILED, error='boom')
+        # A block still running for the failed report must not revive it.
+        artifact.heartbeat()
+        artifact.refresh_from_db()
+        assert artifact.state == ReportArtifact.FAILED
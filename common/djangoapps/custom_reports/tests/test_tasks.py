@@ -0,0 +1,125 @@
+"""
+Tests for the custom report tasks.
+"""
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+
+from common.djangoapps.leaderboard.models import Batch
+from common.djangoapps.student.tests.factories import UserFactory
+
+from ..models import ReportArtifact
+from ..tasks import (
+    delete_program_report_blocks,
+    generate_program_course_block,
+    generate_program_report_csv,
+    merge_program_report_blocks,
+)
+
+
+class TestReportTasks(TestCase):
+    """
+    Tests for the artifact state kept by the report tasks.
+    """
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = UserFactory(is_staff=True)
+        self.batch = Batch.objects.create(name='batch')
+        self.students = [UserFactory(username='student{}'.format(index)) for index in range(2)]
+        for student in self.students:
+            student.profile.batch = self.batch
+            student.profile.save()
+        self.artifact, _created = ReportArtifact.get_or_request(
+            self.user, self.batch, ReportArtifact.PROGRAM_REPORT, 'v1', 'program.csv'
+        )
+
+    def get_state(self):
+        self.artifact.refresh_from_db()
+        return self.artifact.state
+
+    def save_block(self, name, content):
+        return default_storage.save('custom_reports/tmp/{}'.format(name), ContentFile(content))
+
+    def test_program_report_without_courses(self):
+        def get_batch_courses(batch):
+            assert self.get_state() == ReportArtifact.RUNNING
+            return []
+
+        with patch('common.djangoapps.custom_reports.tasks.get_batch_courses', side_effect=get_batch_courses):
+            generate_program_report_csv(self.artifact.id)
+
+        assert self.get_state() == ReportArtifact.SUCCEEDED
+        assert self.artifact.row_count == 4
+        assert self.artifact.progress == 100
+        with default_storage.open(self.artifact.path) as report:
+            assert report.read().decode('utf-8').split() == ['""', '""', 'student0', 'student1']
+
+    def test_program_report_failure(self):
+        with patch('common.djangoapps.custom_reports.tasks.get_batch_courses', side_effect=ValueError('boom')):
+            with self.assertRaises(ValueError):
+                generate_program_report_csv(self.artifact.id)
+
+        assert self.get_state() == ReportArtifact.FAILED
+        assert self.artifact.error == 'boom'
+        artifact, created = ReportArtifact.get_or_request(
+            self.user, self.batch, ReportArtifact.PROGRAM_REPORT, 'v1', 'program.csv'
+        )
+        assert created
+        assert artifact.state == ReportArtifact.PENDING
+
+    @patch('common.djangoapps.custom_reports.tasks.modulestore')
+    def test_course_block_failure(self, _modulestore):
+        self.artifact.set_state(ReportArtifact.RUNNING, progress_total=2)
+        with patch(
+            'common.djangoapps.custom_reports.tasks._iter_program_course_block', side_effect=ValueError('boom')
+        ):
+            with self.assertRaises(ValueError):
+                generate_program_course_block(
+                    self.artifact.id, 'course-v1:edX+A+run', [], 'custom_reports/tmp/0.csv'
+                )
+        assert self.get_state() == ReportArtifact.FAILED
+
+    def test_merge_blocks(self):
+        self.artifact.set_state(ReportArtifact.RUNNING, progress_total=3, progress_done=2)
+        block_paths = [
+            self.save_block('0.csv', b',A\nstudent0,50%\n'),
+            self.save_block('1.csv', b',B\nstudent0,70%\n'),
+        ]
+
+        merge_program_report_blocks(block_paths, self.artifact.id)
+
+        assert self.get_state() == ReportArtifact.SUCCEEDED
+        assert self.artifact.row_count == 2
+        with default_storage.open(self.artifact.path) as report:
+            assert report.read().decode('utf-8').split() == [',A,B', 'student0,50%,70%']
+        assert not any(default_storage.exists(path) for path in block_paths)
+
+    def test_merge_failure_drops_blocks(self):
+        self.artifact.set_state(ReportArtifact.RUNNING, progress_total=3, progress_done=2)
+        block_paths = [self.save_block('0.csv', b',A\n'), 'custom_reports/tmp/missing.csv']
+
+        with self.assertRaises(OSError):
+            merge_program_report_blocks(block_paths, self.artifact.id)
+
+        assert self.get_state() == ReportArtifact.FAILED
+        assert not default_storage.exists(block_paths[0])
+
+    def test_delete_blocks_after_failure(self):
+        block_paths = [self.save_block('0.csv', b',A\n'), self.save_block('1.csv', b',B\n')]
+
+        delete_program_report_blocks(None, ValueError('boom'), None, 'custom_reports/tmp')
+
+        assert not any(default_storage.exists(path) for path in block_paths)
+        # Nothing to drop when no block was saved yet.
+        delete_program_report_blocks(None, ValueError('boom'), None, 'custom_reports/missing')
@@ -1,12 +1,13 @@
-import os
-import glob
 import itertools
+import time
 
+from django.db import transaction
 from django.db.models import Q
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.http import Http404
 from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from common.djangoapps.util.json_request import JsonResponse
 from lms.djangoapps.instructor_analytics.csvs import create_csv_response
@@ -17,8 +18,81 @@ from common.djangoapps.student.models import CourseAccessRole
 
 from common.djangoapps.leaderboard.models import LeaderBoard, Batch
 from common.djangoapps.course_manage.models import CourseManage
+from .grade_matrix import (
+    get_batch_courses,
+    get_batch_data_version,
+    get_batch_grade_matrix,
+    get_batch_students,
+)
+from .models import ReportArtifact
 from .tasks import generate_program_report_csv, generate_grade_report_csv
 
+REPORTS_LIST_LIMIT = 50
+
+
+def _request_report(user, batch_id, report_type, file_name_format, report_task):
+    """
+    Start generating the report, unless one of the same data already exists.
+    """
+    batch = Batch.objects.get(id=batch_id)
+    course_manages = get_batch_courses(batch)
+    students = get_batch_students(
+        batch, [course_manage.course_id for course_manage in course_manages]
+    )
+    data_version = get_batch_data_version(
+        batch, course_manages, list(students.values_list("id", flat=True))
+    )
+    file_name = file_name_format.format(
+        batch=batch.name, time=time.strftime("%d_%m_%Y__%H_%M_%S")
+    )
+    artifact, created = ReportArtifact.get_or_request(
+        user, batch, report_type, data_version, file_name
+    )
+    if created:
+        transaction.on_commit(lambda: report_task.delay(artifact.id))
+    return JsonResponse(
+        {"Success": True, "report": artifact.id, "state": artifact.state}, status=200
+    )
+
+
+def _get_report_link(path):
+    """
+    Return an absolute link to the file in the default storage.
+    """
+    url = default_storage.url(path)
+    if url.startswith("/"):
+        url = "{}{}".format(settings.LMS_ROOT_URL, url)
+    return url
+
+
+def _list_reports(user, report_type):
+    """
+    Return generated reports and reports in progress in json format.
+    """
+    if not (user.is_staff or user.is_superuser):
+        return JsonResponse({"data": [], "reports": []}, status=200)
+    artifacts = ReportArtifact.objects.filter(report_type=report_type).order_by(
+        "-created"
+    )[:REPORTS_LIST_LIMIT]
+    files, reports = [], []
+    for artifact in artifacts:
+        link = None
+        if artifact.state == ReportArtifact.SUCCEEDED:
+            link = _get_report_link(artifact.path)
+            files.append((artifact.file_name, link))
+        reports.append(
+            {
+                "id": artifact.id,
+                "file_name": artifact.file_name,
+                "state": artifact.state,
+                "progress": artifact.progress,
+                "row_count": artifact.row_count,
+                "size": artifact.size,
+                "link": link,
+            }
+        )
+    return JsonResponse({"data": files, "reports": reports}, status=200)
+
 
 @login_required
 def grade_data(request):
@@ -39,20 +113,11 @@ def get_grade_data(request):
     Return Grade report including all courses in json format
     """
     batch = Batch.objects.get(id=request.POST.get("batch"))
-    users = User.objects.filter(is_active=True, profile__batch=batch).order_by(
-        "username"
-    )
-    courses = CourseManage.objects.filter(batch=batch).order_by("course__display_name")
-    courses = [course_mange.course for course_mange in courses]
-    course_ids = [course.id for course in courses]
-    admin_users = set(
-        CourseAccessRole.objects.filter(course_id__in=course_ids).values_list("user")
-    )
-    admin_users = list(itertools.chain(*admin_users))
-    users = users.exclude(
-        Q(is_staff=True) | Q(is_superuser=True) | Q(id__in=admin_users)
-    )
-    paginator = Paginator(users, 20)
+    course_manages = get_batch_courses(batch)
+    courses = [course_manage.course for course_manage in course_manages]
+    students = get_batch_students(batch, [course.id for course in courses])
+    matrix = get_batch_grade_matrix(batch, course_manages, students)
+    paginator = Paginator(students, 20)
     page = request.POST.get("page", 1)
     try:
         users = paginator.page(page)
@@ -60,7 +125,7 @@ def get_grade_data(request):
         users = paginator.page(1)
     except EmptyPage:
         users = paginator.page(paginator.num_pages)
-    context = {"users": users, "courses": courses}
+    context = {"users": users, "courses": courses, "rows": matrix.rows(users)}
     template = render_to_string("custom_reports/table-data-grade.html", context)
 
     return JsonResponse({"data": template}, status=200)
@@ -72,31 +137,22 @@ def generate_grade_data_report(request):
     Return Grade report in CSV Format
     """
     if request.user.is_staff or request.user.is_superuser:
-        generate_grade_report_csv.delay(
-            request.user.username, request.POST.get("batch")
+        return _request_report(
+            request.user,
+            request.POST.get("batch"),
+            ReportArtifact.GRADE_REPORT,
+            "GRADE_REPORT_{batch}_{time}.csv",
+            generate_grade_report_csv,
         )
     return JsonResponse({"Success": True}, status=200)
 
 
 @login_required
 def get_grade_data_report(request):
-    report_dir = "custom_reports/{username}/grade_data/".format(
-        username=str(request.user.username)
-    )
-    dir_path = "{media_root}{report_dir}/*".format(
-        media_root=settings.MEDIA_ROOT, report_dir=report_dir
-    )
-    filelist = glob.glob(dir_path)
-    files = list()
-    for file in filelist:
-        file_name = os.path.basename(file)
-        file_link = "{}{}{}{}".format(
-            settings.LMS_ROOT_URL, settings.MEDIA_URL, report_dir, file_name
-        )
-        files.append((file_name, file_link))
-
-    files.reverse()
-    return JsonResponse({"data": files}, status=200)
+    """
+    Return generated grade reports in json format.
+    """
+    return _list_reports(request.user, ReportArtifact.GRADE_REPORT)
 
 
 @login_required
@@ -118,28 +174,19 @@ def generate_program_data_report(request):
     Return Program report in CSV Format
     """
     if request.user.is_staff or request.user.is_superuser:
-        generate_program_report_csv.delay(
-            request.user.username, request.POST.get("batch")
+        return _request_report(
+            request.user,
+            request.POST.get("batch"),
+            ReportArtifact.PROGRAM_REPORT,
+            "DETAILED_REPORT_{batch}_{time}.csv",
+            generate_program_report_csv,
         )
     return JsonResponse({"Success": True}, status=200)
 
 
 @login_required
 def get_program_data_report(request):
-    report_dir = "custom_reports/{username}/program_details/".format(
-        username=str(request.user.username)
-    )
-    dir_path = "{media_root}{report_dir}/*".format(
-        media_root=settings.MEDIA_ROOT, report_dir=report_dir
-    )
-    filelist = glob.glob(dir_path)
-    files = list()
-    for file in filelist:
-        file_name = os.path.basename(file)
-        file_link = "{}{}{}{}".format(
-            settings.LMS_ROOT_URL, settings.MEDIA_URL, report_dir, file_name
-        )
-        files.append((file_name, file_link))
-
-    files.reverse()
-    return JsonResponse({"data": files}, status=200)
+    """
+    Return generated program reports in json format.
+    """
+    return _list_reports(request.user, ReportArtifact.PROGRAM_REPORT)
@@ -9,7 +9,7 @@ class LeaderBoardAdmin(admin.ModelAdmin):
     Admin Interface for Leaderboard Model
     """
 
-    list_display = ["user", "course_id", "score", "has_passed"]
+    list_display = ["user", "course_id", "score", "has_passed", "status"]
     search_fields = ["user__username"]
 
 
@@ -21,6 +21,18 @@ class BatchAdmin(admin.ModelAdmin):
     list_display = ["name"]
 
 
+class BatchScoreAdmin(admin.ModelAdmin):
+    """
+    Admin Interface for BatchScore Model
+    """
+
+    list_display = ["user", "batch", "total_score"]
+    list_filter = ["batch"]
+    search_fields = ["user__username"]
+
+
 admin.site.register(Batch, BatchAdmin)
 
+admin.site.register(BatchScore, BatchScoreAdmin)
+
 admin.site.register(LeaderBoard, LeaderBoardAdmin)
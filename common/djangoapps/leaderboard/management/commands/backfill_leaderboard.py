@@ -0,0 +1,90 @@
+"""
+Management command to backfill LeaderBoard rows of whole batches.
+"""
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from common.djangoapps.leaderboard.models import Batch
+from common.djangoapps.leaderboard.tasks import (
+    BACKFILL_CHUNK_SIZE,
+    BACKFILL_CONCURRENCY,
+    backfill_batch_leaderboard,
+)
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Example usage:
+        $ ./manage.py lms backfill_leaderboard --batches 1 2 --settings=production
+        $ ./manage.py lms backfill_leaderboard --all_batches --missing_only --settings=production
+
+    Chunks that completed are skipped when the command is run again, pass
+    --restart to compute them anew.
+    """
+    help = "Recomputes LeaderBoard rows of all learners and courses of the given batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batches",
+            nargs="+",
+            type=int,
+            help="Ids of the batches to backfill.",
+        )
+        parser.add_argument(
+            "--all_batches",
+            action="store_true",
+            default=False,
+            help="Backfill all batches.",
+        )
+        parser.add_argument(
+            "--chunk_size",
+            type=int,
+            default=BACKFILL_CHUNK_SIZE,
+            help="Maximum number of learners per celery task.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=BACKFILL_CONCURRENCY,
+            help="Maximum number of celery tasks of a batch running at the same time.",
+        )
+        parser.add_argument(
+            "--missing_only",
+            action="store_true",
+            default=False,
+            help="Only backfill learners without a LeaderBoard row in the course.",
+        )
+        parser.add_argument(
+            "--force_update",
+            action="store_true",
+            default=False,
+            help="Recompute and persist the course grades instead of reading them.",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            default=False,
+            help="Ignore chunks completed by a previous run.",
+        )
+
+    def handle(self, *args, **options):
+        if options["all_batches"]:
+            batches = Batch.objects.all()
+        elif options["batches"]:
+            batches = Batch.objects.filter(id__in=options["batches"])
+        else:
+            raise CommandError("Either --batches or --all_batches must be given.")
+
+        for batch in batches:
+            chunk_count = backfill_batch_leaderboard(
+                batch,
+                chunk_size=max(options["chunk_size"], 1),
+                concurrency=options["concurrency"],
+                missing_only=options["missing_only"],
+                force_update=options["force_update"],
+                restart=options["restart"],
+            )
+            log.info("Enqueued %d leaderboard backfill tasks for batch %s", chunk_count, batch.name)
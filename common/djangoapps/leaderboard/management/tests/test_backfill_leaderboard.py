@@ -0,0 +1,63 @@
+"""
+Tests for the backfill_leaderboard management command.
+"""
+from unittest.mock import call, patch
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from common.djangoapps.leaderboard.models import Batch
+from common.djangoapps.leaderboard.tasks import BACKFILL_CHUNK_SIZE, BACKFILL_CONCURRENCY
+
+
+@patch('common.djangoapps.leaderboard.management.commands.backfill_leaderboard.backfill_batch_leaderboard')
+class TestBackfillLeaderboard(TestCase):
+    """
+    Tests for the backfill_leaderboard command.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.batches = [Batch.objects.create(name='batch{}'.format(index)) for index in range(3)]
+
+    def backfilled_batches(self, backfill):
+        return sorted(batch_call[0][0].id for batch_call in backfill.call_args_list)
+
+    def test_batches(self, backfill):
+        call_command('backfill_leaderboard', '--batches', str(self.batches[0].id), str(self.batches[2].id))
+        assert self.backfilled_batches(backfill) == [self.batches[0].id, self.batches[2].id]
+        assert backfill.call_args[1] == {
+            'chunk_size': BACKFILL_CHUNK_SIZE,
+            'concurrency': BACKFILL_CONCURRENCY,
+            'missing_only': False,
+            'force_update': False,
+            'restart': False,
+        }
+
+    def test_all_batches(self, backfill):
+        call_command('backfill_leaderboard', '--all_batches')
+        assert self.backfilled_batches(backfill) == [batch.id for batch in self.batches]
+
+    def test_options(self, backfill):
+        call_command(
+            'backfill_leaderboard', '--batches', str(self.batches[1].id), '--chunk_size', '10',
+            '--concurrency', '2', '--missing_only', '--force_update', '--restart',
+        )
+        assert backfill.call_args_list == [call(
+            self.batches[1], chunk_size=10, concurrency=2, missing_only=True, force_update=True, restart=True,
+        )]
+
+    def test_chunk_size_at_least_one(self, backfill):
+        call_command('backfill_leaderboard', '--batches', str(self.batches[0].id), '--chunk_size', '0')
+        assert backfill.call_args[1]['chunk_size'] == 1
+
+    def test_unknown_batch(self, backfill):
+        call_command('backfill_leaderboard', '--batches', '0')
+        backfill.assert_not_called()
+
+    def test_no_batches(self, backfill):
+        with pytest.raises(CommandError):
+            call_command('backfill_leaderboard')
+        backfill.assert_not_called()
@@ -11,8 +11,10 @@ file and check it in at the same time as your model changes. To do that,
 3. ./manage.py lms migrate --settings=production leaderboard
 """
 from django.db import models
+from django.utils import timezone
 
 from django.contrib.auth.models import User
+from jsonfield.fields import JSONField
 from model_utils.models import TimeStampedModel
 from opaque_keys.edx.django.models import CourseKeyField, UsageKeyField
 
@@ -26,10 +28,19 @@ class LeaderBoard(TimeStampedModel):
     course_id = CourseKeyField(max_length=255, db_index=True)
     score = models.FloatField(max_length=255, null=True)
     has_passed = models.BooleanField(default=False)
+    # "I" (incomplete), "C" (waiting for SGA grading) or "" (complete),
+    # null until computed for the row.
+    status = models.CharField(max_length=1, blank=True, null=True)
+    # Attempted flag of each graded subsection without SGA, keyed on usage key.
+    subsections_attempted = JSONField(default=dict, blank=True)
 
     class Meta:
         verbose_name = "Leaderboard"
         verbose_name_plural = "Leaderboard"
+        unique_together = ("user", "course_id")
+        indexes = [
+            models.Index(fields=["course_id", "score"], name="leaderboard_course_score"),
+        ]
 
     def __str__(self):
         return self.user.email
@@ -39,11 +50,12 @@ class LeaderBoard(TimeStampedModel):
         """
         Returen score for given user and course id.
         """
-        try:
-            leaderboard = cls.objects.get(user=user, course_id=course_key)
-            return leaderboard.score
-        except Exception as e:
-            return 0.00
+        score = (
+            cls.objects.filter(user=user, course_id=course_key)
+            .values_list("score", flat=True)
+            .first()
+        )
+        return score if score is not None else 0.00
 
 
 class Batch(TimeStampedModel):
@@ -59,3 +71,67 @@ class Batch(TimeStampedModel):
 
     def __str__(self):
         return self.name
+
+
+class BatchScore(TimeStampedModel):
+    """
+    Model for store weighted total score of a learner over the batch courses
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    batch = models.ForeignKey(Batch, on_delete=models.CASCADE)
+    total_score = models.FloatField(default=0.0)
+
+    class Meta:
+        verbose_name = "Batch Score"
+        verbose_name_plural = "Batch Scores"
+        unique_together = ("user", "batch")
+        indexes = [
+            models.Index(fields=["batch", "total_score"], name="batchscore_batch_total"),
+        ]
+
+    def __str__(self):
+        return "{} {}".format(self.user.username, self.batch.name)
+
+    @classmethod
+    def refresh(cls, batch_id, user_ids=None):
+        """
+        Recompute weighted totals of the batch learners from their LeaderBoard scores.
+
+        Only given learners are recomputed when user_ids is set.
+        """
+        from common.djangoapps.course_manage.models import CourseManage
+
+        weights = dict(
+            CourseManage.objects.filter(batch_id=batch_id).values_list("course_id", "weight")
+        )
+        rows = LeaderBoard.objects.filter(
+            course_id__in=list(weights), user__profile__batch_id=batch_id
+        )
+        if user_ids is not None:
+            rows = rows.filter(user_id__in=user_ids)
+        totals = {}
+        for user_id, course_id, score in rows.values_list("user_id", "course_id", "score"):
+            weight = weights[course_id] or 0.0
+            totals[user_id] = totals.get(user_id, 0.0) + (score or 0.0) * weight / 100
+
+        batch_scores = cls.objects.filter(batch_id=batch_id)
+        if user_ids is not None:
+            batch_scores = batch_scores.filter(user_id__in=user_ids)
+        existing = {batch_score.user_id: batch_score for batch_score in batch_scores}
+        # Learners without any score left in the batch courses drop to zero.
+        for user_id in existing:
+            totals.setdefault(user_id, 0.0)
+        now = timezone.now()
+        to_update, to_create = [], []
+        for user_id, total in totals.items():
+            batch_score = existing.get(user_id)
+            if batch_score is None:
+                to_create.append(cls(user_id=user_id, batch_id=batch_id, total_score=total))
+            elif batch_score.total_score != total:
+                batch_score.total_score = total
+                batch_score.modified = now
+                to_update.append(batch_score)
+        cls.objects.bulk_update(to_update, ["total_score", "modified"])
+        cls.objects.bulk_create(to_create, ignore_conflicts=True)
+        return totals
@@ -0,0 +1,297 @@
+"""
+Ranking of learners on course and batch leaderboards.
+
+Rankings are served from snapshots: the scores of a course (or the weighted
+totals of a batch) sorted once and kept in the shared cache. A snapshot answers
+top-N, rank and neighbour lookups without touching the database and is
+patched in place when LeaderBoard rows are flushed, so only the learners that
+changed are read again.
+
+Every patch first changes the generation of the snapshot. A build or patch
+only writes its snapshot when the generation did not change meanwhile, so a
+snapshot read before a flush never replaces the flushed one.
+"""
+import bisect
+import logging
+import time
+from uuid import uuid4
+
+from django.core.cache import cache
+
+from common.djangoapps.course_manage.models import CourseManage
+from .models import BatchScore, LeaderBoard
+
+log = logging.getLogger("leaderboard")
+
+RANKING_CACHE_TIMEOUT = 60 * 60
+RANKING_BUILD_LOCK_TIMEOUT = 30
+RANKING_BUILD_WAIT = 5
+COURSE_RANKING_KEY = "leaderboard.ranking.course.{course_id}"
+BATCH_RANKING_KEY = "leaderboard.ranking.batch.{batch_id}"
+RANKING_LOCK_KEY = "{key}.lock"
+RANKING_GENERATION_KEY = "{key}.generation"
+
+
+class RankingSnapshot:
+    """
+    Learners sorted by descending score, with equal scores sharing a rank.
+    """
+
+    def __init__(self, entries):
+        # (negated score, username, user_id) keeps bisect ordering stable.
+        self.entries = sorted(entries)
+        self._index()
+
+    def __getstate__(self):
+        # Only the entries are cached, the indexes are rebuilt on load.
+        return {"entries": self.entries}
+
+    def __setstate__(self, state):
+        self.entries = state["entries"]
+        self._index()
+
+    def _index(self):
+        self.positions = {}
+        self.ranks = []
+        previous_score = None
+        for position, (neg_score, _username, user_id) in enumerate(self.entries):
+            if neg_score != previous_score:
+                rank = position + 1
+                previous_score = neg_score
+            self.ranks.append(rank)
+            self.positions[user_id] = position
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, user_id):
+        return user_id in self.positions
+
+    def _row(self, position):
+        neg_score, username, user_id = self.entries[position]
+        return {
+            "rank": self.ranks[position],
+            "user_id": user_id,
+            "username": username,
+            "score": round(-neg_score, 2),
+        }
+
+    def top(self, limit):
+        """
+        Return the first limit rows.
+        """
+        return [self._row(position) for position in range(min(limit, len(self.entries)))]
+
+    def get(self, user_id):
+        """
+        Return the row of the learner, None when not ranked.
+        """
+        position = self.positions.get(user_id)
+        return None if position is None else self._row(position)
+
+    def neighbours(self, user_id, radius):
+        """
+        Return rows of up to radius learners ranked above and below the learner.
+        """
+        position = self.positions.get(user_id)
+        if position is None:
+            return []
+        start = max(position - radius, 0)
+        end = min(position + radius + 1, len(self.entries))
+        return [self._row(index) for index in range(start, end)]
+
+    def update(self, changes):
+        """
+        Apply {user_id: (username, score)}, a None score drops the learner.
+        """
+        self.entries = [entry for entry in self.entries if entry[2] not in changes]
+        for user_id, (username, score) in changes.items():
+            if score is not None:
+                bisect.insort(self.entries, (-score, username, user_id))
+        self._index()
+
+
+def _acquire_lock(key):
+    """
+    Return the token of the lock of the snapshot, None when it is held.
+    """
+    token = uuid4().hex
+    if cache.add(RANKING_LOCK_KEY.format(key=key), token, RANKING_BUILD_LOCK_TIMEOUT):
+        return token
+    return None
+
+
+def _release_lock(key, token):
+    """
+    Release the lock of the snapshot unless it expired and was taken by another.
+    """
+    lock_key = RANKING_LOCK_KEY.format(key=key)
+    if cache.get(lock_key) == token:
+        cache.delete(lock_key)
+
+
+def _get_generation(key):
+    return cache.get(RANKING_GENERATION_KEY.format(key=key))
+
+
+def _change_generation(key):
+    cache.set(RANKING_GENERATION_KEY.format(key=key), uuid4().hex, RANKING_CACHE_TIMEOUT)
+
+
+def _set_if_current(key, snapshot, generation):
+    """
+    Cache the snapshot unless the generation changed since it was read.
+    """
+    if _get_generation(key) != generation:
+        return
+    cache.set(key, snapshot, RANKING_CACHE_TIMEOUT)
+    if _get_generation(key) != generation:
+        # A patch changed it while the snapshot was written.
+        cache.delete(key)
+
+
+def _get_or_build(key, builder):
+    """
+    Return the cached snapshot, building it once when many requests miss.
+
+    Requests that do not get the build lock wait for the snapshot of the
+    request holding it, and build an uncached one when it takes too long.
+    """
+    snapshot = cache.get(key)
+    if snapshot is not None:
+        return snapshot
+
+    token = _acquire_lock(key)
+    if token is None:
+        # Another request is building it, wait for its result.
+        deadline = time.time() + RANKING_BUILD_WAIT
+        while time.time() < deadline:
+            time.sleep(0.1)
+            snapshot = cache.get(key)
+            if snapshot is not None:
+                return snapshot
+        log.warning("Ranking %s not built in time, building it uncached", key)
+        return builder()
+    try:
+        generation = _get_generation(key)
+        snapshot = builder()
+        _set_if_current(key, snapshot, generation)
+    finally:
+        _release_lock(key, token)
+    return snapshot
+
+
+def _course_scores(course_key, user_ids=None):
+    """
+    Return {user_id: (username, score)} of active learners of the course.
+    """
+    rows = LeaderBoard.objects.filter(
+        course_id=course_key, score__isnull=False, user__is_active=True
+    )
+    if user_ids is not None:
+        rows = rows.filter(user_id__in=user_ids)
+    return {
+        user_id: (username, score)
+        for user_id, username, score in rows.values_list(
+            "user_id", "user__username", "score"
+        )
+    }
+
+
+def _batch_totals(batch_id, user_ids=None):
+    """
+    Return {user_id: (username, weighted total)} of active learners of the batch.
+    """
+    rows = BatchScore.objects.filter(
+        batch_id=batch_id, user__is_active=True, user__profile__batch_id=batch_id
+    )
+    if user_ids is not None:
+        rows = rows.filter(user_id__in=user_ids)
+    return {
+        user_id: (username, total_score)
+        for user_id, username, total_score in rows.values_list(
+            "user_id", "user__username", "total_score"
+        )
+    }
+
+
+def _build(scores):
+    return RankingSnapshot(
+        (-score, username, user_id) for user_id, (username, score) in scores.items()
+    )
+
+
+def get_course_ranking(course_key):
+    """
+    Return the RankingSnapshot of the course.
+    """
+    return _get_or_build(
+        COURSE_RANKING_KEY.format(course_id=course_key),
+        lambda: _build(_course_scores(course_key)),
+    )
+
+
+def get_batch_ranking(batch_id):
+    """
+    Return the RankingSnapshot of the batch ranked by weighted course total.
+    """
+    return _get_or_build(
+        BATCH_RANKING_KEY.format(batch_id=batch_id),
+        lambda: _build(_batch_totals(batch_id)),
+    )
+
+
+def _patch(key, changes, user_ids):
+    """
+    Apply changes of the given learners to the cached snapshot, if any.
+
+    The snapshot is patched under the lock it is built with. When the lock is
+    held by another build or patch, the snapshot is dropped instead; the
+    holder does not cache its own snapshot as the generation changed.
+    """
+    _change_generation(key)
+    token = _acquire_lock(key)
+    if token is None:
+        cache.delete(key)
+        return
+    try:
+        generation = _get_generation(key)
+        snapshot = cache.get(key)
+        if snapshot is None:
+            return
+        changes = dict(changes)
+        for user_id in user_ids:
+            changes.setdefault(user_id, (None, None))
+        snapshot.update(changes)
+        _set_if_current(key, snapshot, generation)
+    finally:
+        _release_lock(key, token)
+
+
+def invalidate_batch_ranking(batch_id):
+    """
+    Drop the cached snapshot of the batch, it is rebuilt on next request.
+    """
+    key = BATCH_RANKING_KEY.format(batch_id=batch_id)
+    _change_generation(key)
+    cache.delete(key)
+
+
+def refresh_rankings(course_key, user_ids):
+    """
+    Patch the course and batch snapshots after LeaderBoard rows of the learners changed.
+    """
+    _patch(
+        COURSE_RANKING_KEY.format(course_id=course_key),
+        _course_scores(course_key, user_ids),
+        user_ids,
+    )
+    batch_ids = CourseManage.objects.filter(
+        course_id=course_key, batch__isnull=False
+    ).values_list("batch_id", flat=True)
+    for batch_id in batch_ids:
+        _patch(
+            BATCH_RANKING_KEY.format(batch_id=batch_id),
+            _batch_totals(batch_id, user_ids),
+            user_ids,
+        )
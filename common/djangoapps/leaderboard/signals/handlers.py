@@ -1,16 +1,56 @@
+from django.db import transaction
+from django.db.models.signals import post_save
 from django.dispatch import receiver
+from submissions.models import Submission
 
-from ..models import LeaderBoard
-from .signals import CUSTOM_COURSE_GRADE_CHANGED
+from ..ranking import invalidate_batch_ranking, refresh_rankings
+from ..tasks import refresh_leaderboard_status
+from ..writer import buffer_leaderboard_update
+from .signals import (
+    BATCH_SCORES_CHANGED,
+    CUSTOM_COURSE_GRADE_CHANGED,
+    LEADERBOARD_SCORES_FLUSHED,
+)
+
+SGA_ITEM_TYPE = "sga"
 
 
 @receiver(CUSTOM_COURSE_GRADE_CHANGED)
 def update_leaderboard(user, course, grade, **kwargs):
+    """
+    Buffer the new course score, rows are written in bulk per course window.
+    """
     points = grade.percent * 100
     passing_grade = course.lowest_passing_grade * 100
-    leaderboard, _created = LeaderBoard.objects.get_or_create(
-        user=user, course_id=course.id
+    buffer_leaderboard_update(user.id, course.id, points, points >= passing_grade)
+
+
+@receiver(post_save, sender=Submission)
+def update_leaderboard_status(sender, instance, **kwargs):
+    """
+    Refresh the course status when an SGA submission is created or removed.
+    """
+    student_item = instance.student_item
+    if student_item.item_type != SGA_ITEM_TYPE:
+        return
+    transaction.on_commit(
+        lambda: refresh_leaderboard_status.delay(
+            student_item.student_id, student_item.course_id
+        )
     )
-    leaderboard.score = points
-    leaderboard.has_passed = True if points >= passing_grade else False
-    leaderboard.save()
+
+
+@receiver(LEADERBOARD_SCORES_FLUSHED)
+def update_rankings(course_key, user_ids, **kwargs):
+    """
+    Patch cached rankings with the scores just written.
+    """
+    refresh_rankings(course_key, user_ids)
+
+
+@receiver(BATCH_SCORES_CHANGED)
+def reset_batch_ranking(batch_id, **kwargs):
+    """
+    Drop the batch ranking once all its totals were recomputed.
+    """
+    invalidate_batch_ranking(batch_id)
@@ -11,3 +11,23 @@ CUSTOM_COURSE_GRADE_CHANGED = Signal(
         "grade",  # Course Grade object
     ]
 )
+
+LEADERBOARD_STATUS_CHANGED = Signal(
+    providing_args=[
+        "user",  # User object
+        "course_key",  # Course Key
+    ]
+)
+
+LEADERBOARD_SCORES_FLUSHED = Signal(
+    providing_args=[
+        "course_key",  # Course Key
+        "user_ids",  # ids of the learners whose rows were written
+    ]
+)
+
+BATCH_SCORES_CHANGED = Signal(
+    providing_args=[
+        "batch_id",  # id of the batch whose totals were all recomputed
+    ]
+)
@@ -2,12 +2,191 @@
 This file contains celery tasks
 """
 import logging
+import time
 
+from celery import chain, group
 from celery.task import task
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from opaque_keys.edx.keys import CourseKey
 from xmodule.modulestore.django import modulestore
+from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
+from common.djangoapps.student.models import user_by_anonymous_id
+from .models import BatchScore, LeaderBoard
+from .signals.signals import BATCH_SCORES_CHANGED, LEADERBOARD_STATUS_CHANGED
 
 
 log = logging.getLogger("leaderboard")
+
+BACKFILL_CHUNK_SIZE = 100
+BACKFILL_CONCURRENCY = 4
+BACKFILL_CHECKPOINT_TIMEOUT = 7 * 24 * 60 * 60
+BACKFILL_CHECKPOINT_KEY = "leaderboard.backfill.{batch_id}.{course_id}.{first}.{last}"
+
+
+@task(routing_key=settings.HIGH_PRIORITY_QUEUE)
+def refresh_leaderboard_status(anonymous_user_id, course_id):
+    """
+    Recompute and store the course status of the learner on LeaderBoard.
+    """
+    from common.djangoapps.custom_reports.helpers import get_course_progress
+
+    user = user_by_anonymous_id(anonymous_user_id)
+    if user is None:
+        log.info("No user found for anonymous id %s", anonymous_user_id)
+        return
+
+    course_key = CourseKey.from_string(course_id)
+    with modulestore().bulk_operations(course_key):
+        status, subsections_attempted = get_course_progress(user, course_key)
+    LeaderBoard.objects.update_or_create(
+        user=user,
+        course_id=course_key,
+        defaults={"status": status, "subsections_attempted": subsections_attempted},
+    )
+    LEADERBOARD_STATUS_CHANGED.send(sender=None, user=user, course_key=course_key)
+
+
+@task(routing_key=settings.HIGH_PRIORITY_QUEUE)
+def flush_leaderboard_window(course_id, window):
+    """
+    Write the LeaderBoard updates buffered for the course during the window.
+    """
+    from .writer import flush_leaderboard_updates, pop_buffered_updates
+
+    updates = pop_buffered_updates(course_id, window)
+    flush_leaderboard_updates(CourseKey.from_string(course_id), updates)
+
+
+@task(routing_key=settings.BATCH_SCORES_ROUTING_KEY)
+def refresh_batch_scores(batch_id):
+    """
+    Recompute weighted totals of all learners of the batch.
+    """
+    totals = BatchScore.refresh(batch_id)
+    log.info("Refreshed %d batch scores of batch %s", len(totals), batch_id)
+    BATCH_SCORES_CHANGED.send(sender=None, batch_id=batch_id)
+
+
+def _backfill_checkpoint_key(batch_id, course_id, user_ids):
+    return BACKFILL_CHECKPOINT_KEY.format(
+        batch_id=batch_id, course_id=course_id, first=user_ids[0], last=user_ids[-1]
+    )
+
+
+def get_backfill_chunks(batch, chunk_size=BACKFILL_CHUNK_SIZE, missing_only=False):
+    """
+    Return [(course_id, user_ids)] chunks covering all learners of the batch courses.
+
+    With missing_only, learners that already have a LeaderBoard row of the
+    course are left out.
+    """
+    from common.djangoapps.custom_reports.grade_matrix import (
+        get_batch_courses,
+        get_batch_students,
+    )
+
+    course_ids = [course_manage.course_id for course_manage in get_batch_courses(batch)]
+    user_ids = list(
+        get_batch_students(batch, course_ids).order_by("id").values_list("id", flat=True)
+    )
+    chunks = []
+    for course_id in course_ids:
+        course_user_ids = user_ids
+        if missing_only:
+            existing = set(
+                LeaderBoard.objects.filter(
+                    course_id=course_id, user_id__in=user_ids
+                ).values_list("user_id", flat=True)
+            )
+            course_user_ids = [user_id for user_id in user_ids if user_id not in existing]
+        for offset in range(0, len(course_user_ids), chunk_size):
+            chunks.append((str(course_id), course_user_ids[offset:offset + chunk_size]))
+    return chunks
+
+
+@task(routing_key=settings.POLICY_CHANGE_GRADES_ROUTING_KEY)
+def backfill_leaderboard_chunk(batch_id, course_id, user_ids, force_update=False):
+    """
+    Compute course grades of the learners and bulk write their LeaderBoard rows.
+
+    Finished chunks are checkpointed so that a restarted backfill skips them.
+    """
+    # Grades are not installed in Studio, which loads this module too.
+    from lms.djangoapps.grades.api import (
+        CourseGradeFactory,
+        clear_prefetched_course_and_subsection_grades,
+        prefetch_course_and_subsection_grades,
+    )
+    from .writer import flush_leaderboard_updates
+
+    checkpoint_key = _backfill_checkpoint_key(batch_id, course_id, user_ids)
+    if cache.get(checkpoint_key):
+        log.info("Skipping backfilled chunk %s", checkpoint_key)
+        return
+
+    course_key = CourseKey.from_string(course_id)
+    users = list(User.objects.filter(id__in=user_ids).order_by("id"))
+    updates, errors = {}, 0
+    with modulestore().bulk_operations(course_key):
+        collected_structure = get_course_in_cache(course_key)
+        prefetch_course_and_subsection_grades(course_key, users)
+        try:
+            for user, course_grade, error in CourseGradeFactory().iter(
+                users,
+                course_key=course_key,
+                collected_block_structure=collected_structure,
+                force_update=force_update,
+            ):
+                if error:
+                    errors += 1
+                    log.warning(
+                        "Leaderboard backfill failed for user %s in %s: %s",
+                        user.id, course_id, error,
+                    )
+                    continue
+                updates[user.id] = (
+                    course_grade.percent * 100, course_grade.passed, time.time()
+                )
+        finally:
+            clear_prefetched_course_and_subsection_grades(course_key)
+        flush_leaderboard_updates(course_key, updates)
+
+    if not errors:
+        cache.set(checkpoint_key, True, BACKFILL_CHECKPOINT_TIMEOUT)
+    log.info(
+        "Backfilled %d leaderboard rows of %s, %d errors", len(updates), course_id, errors
+    )
+
+
+def backfill_batch_leaderboard(
+    batch,
+    chunk_size=BACKFILL_CHUNK_SIZE,
+    concurrency=BACKFILL_CONCURRENCY,
+    missing_only=False,
+    force_update=False,
+    restart=False,
+):
+    """
+    Enqueue the LeaderBoard backfill of all learners and courses of the batch.
+
+    Chunks are spread over concurrency chains, so that no more than that many
+    chunks of the batch are processed at the same time. Returns the number of
+    chunks enqueued.
+    """
+    chunks = get_backfill_chunks(batch, chunk_size, missing_only)
+    if restart:
+        cache.delete_many(
+            [_backfill_checkpoint_key(batch.id, course_id, user_ids) for course_id, user_ids in chunks]
+        )
+    if not chunks:
+        return 0
+
+    lanes = [[] for _ in range(min(max(concurrency, 1), len(chunks)))]
+    for index, (course_id, user_ids) in enumerate(chunks):
+        lanes[index % len(lanes)].append(
+            backfill_leaderboard_chunk.si(batch.id, course_id, user_ids, force_update)
+        )
+    group(chain(*lane) for lane in lanes).apply_async()
+    return len(chunks)
@@ -0,0 +1,87 @@
+"""
+Tests for the leaderboard models.
+"""
+from django.test import TestCase
+from opaque_keys.edx.keys import CourseKey
+
+from common.djangoapps.course_manage.models import CourseManage
+from common.djangoapps.student.tests.factories import UserFactory
+
+from ..models import Batch, BatchScore, LeaderBoard
+
+
+class TestBatchScoreRefresh(TestCase):
+    """
+    Tests for the weighted totals computed by BatchScore.refresh.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.batch = Batch.objects.create(name='batch')
+        self.course_a = CourseKey.from_string('course-v1:edX+A+run')
+        self.course_b = CourseKey.from_string('course-v1:edX+B+run')
+        CourseManage.objects.create(course_id=self.course_a, weight=60, batch=self.batch)
+        CourseManage.objects.create(course_id=self.course_b, weight=40, batch=self.batch)
+        self.users = [UserFactory() for _ in range(3)]
+        for user in self.users:
+            user.profile.batch = self.batch
+            user.profile.save()
+
+    def set_score(self, user, course_key, score):
+        LeaderBoard.objects.update_or_create(
+            user=user, course_id=course_key, defaults={'score': score}
+        )
+
+    def get_totals(self):
+        return dict(
+            BatchScore.objects.filter(batch=self.batch).values_list('user_id', 'total_score')
+        )
+
+    def test_weighted_totals(self):
+        self.set_score(self.users[0], self.course_a, 100)
+        self.set_score(self.users[0], self.course_b, 50)
+        self.set_score(self.users[1], self.course_b, None)
+
+        totals = BatchScore.refresh(self.batch.id)
+
+        assert totals == {self.users[0].id: 80.0, self.users[1].id: 0.0}
+        assert self.get_totals() == totals
+
+    def test_learner_without_rows(self):
+        self.set_score(self.users[0], self.course_a, 100)
+        BatchScore.refresh(self.batch.id)
+        assert self.users[2].id not in self.get_totals()
+
+        LeaderBoard.objects.filter(user=self.users[0]).delete()
+        BatchScore.refresh(self.batch.id)
+
+        assert self.get_totals() == {self.users[0].id: 0.0}
+
+    def test_zero_and_unset_weights(self):
+        self.set_score(self.users[0], self.course_a, 100)
+        self.set_score(self.users[0], self.course_b, 100)
+        CourseManage.objects.filter(course_id=self.course_a).update(weight=0)
+        CourseManage.create_or_update(self.course_b, {'batch': self.batch.id, 'weight': None})
+
+        BatchScore.refresh(self.batch.id)
+
+        assert CourseManage.objects.get(course_id=self.course_b).weight == 0.0
+        assert self.get_totals() == {self.users[0].id: 0.0}
+
+    def test_refresh_given_learners(self):
+        self.set_score(self.users[0], self.course_a, 100)
+        self.set_score(self.users[1], self.course_a, 50)
+
+        totals = BatchScore.refresh(self.batch.id, user_ids=[self.users[1].id])
+
+        assert totals == {self.users[1].id: 30.0}
+        assert self.get_totals() == totals
+
+    def test_weight_change_refreshes_totals(self):
+        self.set_score(self.users[0], self.course_a, 100)
+        BatchScore.refresh(self.batch.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CourseManage.create_or_update(self.course_a, {'batch': self.batch.id, 'weight': 20})
+
+        assert self.get_totals() == {self.users[0].id: 20.0}
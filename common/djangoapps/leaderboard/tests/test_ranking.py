@@ -0,0 +1,201 @@
+"""
+Tests for the leaderboard rankings.
+"""
+import pickle
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from opaque_keys.edx.keys import CourseKey
+
+from common.djangoapps.course_manage.models import CourseManage
+from common.djangoapps.student.tests.factories import CourseEnrollmentFactory, UserFactory
+
+from ..models import Batch, BatchScore, LeaderBoard
+from ..ranking import (
+    COURSE_RANKING_KEY,
+    RANKING_LOCK_KEY,
+    RankingSnapshot,
+    _get_or_build,
+    get_batch_ranking,
+    get_course_ranking,
+    invalidate_batch_ranking,
+    refresh_rankings,
+)
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class TestRankingSnapshot(TestCase):
+    """
+    Tests for RankingSnapshot.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.snapshot = RankingSnapshot([
+            (-50.0, 'carol', 3),
+            (-90.0, 'alice', 1),
+            (-70.0, 'dave', 4),
+            (-90.0, 'bob', 2),
+            (-10.0, 'erin', 5),
+        ])
+
+    def test_ranks_share_ties(self):
+        assert [(row['username'], row['rank']) for row in self.snapshot.top(5)] == [
+            ('alice', 1), ('bob', 1), ('dave', 3), ('carol', 4), ('erin', 5),
+        ]
+        assert self.snapshot.get(2) == {'rank': 1, 'user_id': 2, 'username': 'bob', 'score': 90.0}
+        assert self.snapshot.get(6) is None
+        assert len(self.snapshot) == 5
+
+    def test_top_limit(self):
+        assert [row['user_id'] for row in self.snapshot.top(2)] == [1, 2]
+        assert len(self.snapshot.top(10)) == 5
+
+    def test_neighbours(self):
+        assert [row['user_id'] for row in self.snapshot.neighbours(4, 1)] == [2, 4, 3]
+        assert [row['user_id'] for row in self.snapshot.neighbours(1, 2)] == [1, 2, 4]
+        assert [row['user_id'] for row in self.snapshot.neighbours(5, 1)] == [3, 5]
+        assert self.snapshot.neighbours(6, 1) == []
+
+    def test_update(self):
+        self.snapshot.update({5: ('erin', 95.0), 2: (None, None)})
+        assert [(row['user_id'], row['rank']) for row in self.snapshot.top(5)] == [
+            (5, 1), (1, 2), (4, 3), (3, 4),
+        ]
+        assert 2 not in self.snapshot
+
+    def test_pickle_keeps_entries_only(self):
+        assert set(self.snapshot.__getstate__()) == {'entries'}
+        restored = pickle.loads(pickle.dumps(self.snapshot))
+        assert restored.top(5) == self.snapshot.top(5)
+        assert restored.positions == self.snapshot.positions
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestRankings(TestCase):
+    """
+    Tests for the cached course and batch rankings.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.course_key = CourseKey.from_string('course-v1:edX+Ranking+Run')
+        self.batch = Batch.objects.create(name='batch')
+        CourseManage.objects.create(course_id=self.course_key, weight=50, batch=self.batch)
+        self.users = [UserFactory.create(username=f'learner{index}') for index in range(3)]
+        for user in self.users:
+            user.profile.batch = self.batch
+            user.profile.save()
+        self.set_scores({self.users[0]: 60.0, self.users[1]: 80.0, self.users[2]: 70.0})
+
+    def set_scores(self, scores):
+        """
+        Store the course scores and batch totals of the learners.
+        """
+        for user, score in scores.items():
+            LeaderBoard.objects.update_or_create(
+                user=user, course_id=self.course_key, defaults={'score': score},
+            )
+        BatchScore.refresh(self.batch.id)
+
+    def test_course_ranking(self):
+        ranking = get_course_ranking(self.course_key)
+        assert [row['username'] for row in ranking.top(3)] == ['learner1', 'learner2', 'learner0']
+
+        # Served from the cache.
+        self.set_scores({self.users[0]: 90.0})
+        assert get_course_ranking(self.course_key).top(1)[0]['username'] == 'learner1'
+
+    def test_batch_ranking(self):
+        ranking = get_batch_ranking(self.batch.id)
+        assert [(row['username'], row['score']) for row in ranking.top(3)] == [
+            ('learner1', 40.0), ('learner2', 35.0), ('learner0', 30.0),
+        ]
+
+        self.set_scores({self.users[0]: 90.0})
+        invalidate_batch_ranking(self.batch.id)
+        assert get_batch_ranking(self.batch.id).top(1)[0]['username'] == 'learner0'
+
+    def test_refresh_rankings(self):
+        get_course_ranking(self.course_key)
+        get_batch_ranking(self.batch.id)
+        self.set_scores({self.users[0]: 90.0})
+        LeaderBoard.objects.filter(user=self.users[2]).delete()
+        BatchScore.refresh(self.batch.id)
+
+        refresh_rankings(self.course_key, [self.users[0].id, self.users[2].id])
+
+        course_ranking = get_course_ranking(self.course_key)
+        assert [row['username'] for row in course_ranking.top(3)] == ['learner0', 'learner1']
+        batch_ranking = get_batch_ranking(self.batch.id)
+        assert [row['username'] for row in batch_ranking.top(3)] == ['learner0', 'learner1', 'learner2']
+        assert batch_ranking.get(self.users[2].id)['score'] == 0.0
+
+    def test_refresh_rankings_while_locked(self):
+        get_course_ranking(self.course_key)
+        key = COURSE_RANKING_KEY.format(course_id=self.course_key)
+        cache.set(RANKING_LOCK_KEY.format(key=key), 'other', 30)
+        self.set_scores({self.users[0]: 90.0})
+
+        refresh_rankings(self.course_key, [self.users[0].id])
+
+        assert cache.get(key) is None
+        assert cache.get(RANKING_LOCK_KEY.format(key=key)) == 'other'
+
+    def test_build_racing_a_refresh_is_not_cached(self):
+        key = COURSE_RANKING_KEY.format(course_id=self.course_key)
+        stale = RankingSnapshot([(-1.0, 'stale', 0)])
+
+        def builder():
+            # A flush is written and patched while the ranking is being built.
+            self.set_scores({self.users[0]: 90.0})
+            refresh_rankings(self.course_key, [self.users[0].id])
+            return stale
+
+        assert _get_or_build(key, builder) is stale
+        assert cache.get(key) is None
+        assert get_course_ranking(self.course_key).top(1)[0]['username'] == 'learner0'
+
+    @patch('common.djangoapps.leaderboard.ranking.RANKING_BUILD_WAIT', 0)
+    def test_build_without_lock_is_not_cached(self):
+        key = COURSE_RANKING_KEY.format(course_id=self.course_key)
+        lock_key = RANKING_LOCK_KEY.format(key=key)
+        cache.set(lock_key, 'other', 30)
+
+        ranking = get_course_ranking(self.course_key)
+
+        assert len(ranking) == 3
+        assert cache.get(key) is None
+        assert cache.get(lock_key) == 'other'
+
+    def test_course_leaderboard_view(self):
+        CourseEnrollmentFactory.create(user=self.users[2], course_id=self.course_key)
+        self.client.login(username='learner2', password='test')
+        response = self.client.get(
+            reverse('course_leaderboard', kwargs={'course_id': str(self.course_key)}), {'top': 1, 'radius': 1},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data['count'] == 3
+        assert [row['username'] for row in data['top']] == ['learner1']
+        assert data['user']['rank'] == 2
+        assert [row['username'] for row in data['neighbours']] == ['learner1', 'learner2', 'learner0']
+
+    def test_course_leaderboard_view_not_enrolled(self):
+        self.client.login(username='learner2', password='test')
+        response = self.client.get(reverse('course_leaderboard', kwargs={'course_id': str(self.course_key)}))
+        assert response.status_code == 404
+
+    def test_batch_leaderboard_view(self):
+        self.client.login(username='learner0', password='test')
+        response = self.client.get(reverse('batch_leaderboard', kwargs={'batch_id': self.batch.id}))
+        assert response.status_code == 200
+        assert response.json()['user']['score'] == 30.0
+
+        other_batch = Batch.objects.create(name='other')
+        response = self.client.get(reverse('batch_leaderboard', kwargs={'batch_id': other_batch.id}))
+        assert response.status_code == 404
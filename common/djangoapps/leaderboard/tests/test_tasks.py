@@ -0,0 +1,211 @@
+"""
+Tests for the leaderboard tasks.
+"""
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from common.djangoapps.course_manage.models import CourseManage
+from common.djangoapps.student.tests.factories import UserFactory
+from openedx.core.djangoapps.content.course_overviews.tests.factories import CourseOverviewFactory
+
+from ..models import Batch, BatchScore, LeaderBoard
+from ..signals.signals import BATCH_SCORES_CHANGED
+from ..tasks import (
+    BACKFILL_CHECKPOINT_KEY,
+    backfill_batch_leaderboard,
+    backfill_leaderboard_chunk,
+    get_backfill_chunks,
+    refresh_batch_scores,
+)
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class BatchTestCase(TestCase):
+    """
+    Base class creating a batch of two courses and five learners.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.batch = Batch.objects.create(name='batch')
+        self.courses = [
+            CourseOverviewFactory.create(display_name=display_name) for display_name in ('A', 'B')
+        ]
+        for course in self.courses:
+            CourseManage.objects.create(course_id=course.id, weight=50, batch=self.batch)
+        self.users = UserFactory.create_batch(5)
+        for user in self.users:
+            user.profile.batch = self.batch
+            user.profile.save()
+        self.user_ids = [user.id for user in self.users]
+        staff = UserFactory(is_staff=True)
+        staff.profile.batch = self.batch
+        staff.profile.save()
+
+
+class TestRefreshBatchScores(BatchTestCase):
+    """
+    Tests for refresh_batch_scores.
+    """
+
+    def test_refresh(self):
+        LeaderBoard.objects.create(user=self.users[0], course_id=self.courses[0].id, score=80)
+        receiver = Mock()
+        BATCH_SCORES_CHANGED.connect(receiver, weak=False)
+        self.addCleanup(BATCH_SCORES_CHANGED.disconnect, receiver)
+
+        refresh_batch_scores(self.batch.id)
+        refresh_batch_scores(self.batch.id)
+
+        assert BatchScore.objects.get(user=self.users[0], batch=self.batch).total_score == 40.0
+        assert BatchScore.objects.count() == 1
+        assert receiver.call_count == 2
+        assert receiver.call_args[1]['batch_id'] == self.batch.id
+
+
+class TestBackfillChunks(BatchTestCase):
+    """
+    Tests for get_backfill_chunks.
+    """
+
+    def test_chunk_boundaries(self):
+        for chunk_size, sizes in ((1, [1] * 5), (2, [2, 2, 1]), (5, [5]), (6, [5])):
+            chunks = get_backfill_chunks(self.batch, chunk_size)
+            for course in self.courses:
+                course_chunks = [user_ids for course_id, user_ids in chunks if course_id == str(course.id)]
+                assert [len(user_ids) for user_ids in course_chunks] == sizes
+                assert sum(course_chunks, []) == self.user_ids
+
+    def test_missing_only(self):
+        LeaderBoard.objects.create(user=self.users[1], course_id=self.courses[0].id, score=10)
+        chunks = get_backfill_chunks(self.batch, 3, missing_only=True)
+        assert chunks == [
+            (str(self.courses[0].id), [self.user_ids[0]] + self.user_ids[2:4]),
+            (str(self.courses[0].id), self.user_ids[4:]),
+            (str(self.courses[1].id), self.user_ids[:3]),
+            (str(self.courses[1].id), self.user_ids[3:]),
+        ]
+
+    def test_no_courses(self):
+        CourseManage.objects.all().delete()
+        assert get_backfill_chunks(self.batch) == []
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+@patch('common.djangoapps.leaderboard.tasks.modulestore')
+@patch('common.djangoapps.leaderboard.tasks.get_course_in_cache')
+@patch('lms.djangoapps.grades.api.prefetch_course_and_subsection_grades')
+@patch('lms.djangoapps.grades.api.clear_prefetched_course_and_subsection_grades')
+@patch('common.djangoapps.leaderboard.writer.flush_leaderboard_updates')
+@patch('lms.djangoapps.grades.api.CourseGradeFactory')
+class TestBackfillLeaderboardChunk(BatchTestCase):
+    """
+    Tests for backfill_leaderboard_chunk.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.course_id = str(self.courses[0].id)
+
+    def grade_results(self, failing_user=None):
+        def iter_grades(users, **kwargs):
+            for user in users:
+                if user == failing_user:
+                    yield user, None, ValueError('Cannot grade')
+                else:
+                    yield user, Mock(percent=0.5, passed=True), None
+        return iter_grades
+
+    def test_rerun_skips_finished_chunk(self, grade_factory, flush, *mocks):
+        grade_factory.return_value.iter.side_effect = self.grade_results()
+
+        backfill_leaderboard_chunk(self.batch.id, self.course_id, self.user_ids[:2])
+        backfill_leaderboard_chunk(self.batch.id, self.course_id, self.user_ids[:2])
+
+        assert grade_factory.return_value.iter.call_count == 1
+        course_key, updates = flush.call_args[0]
+        assert str(course_key) == self.course_id
+        assert {user_id: update[:2] for user_id, update in updates.items()} == {
+            self.user_ids[0]: (50.0, True),
+            self.user_ids[1]: (50.0, True),
+        }
+        # Other chunks are not checkpointed.
+        backfill_leaderboard_chunk(self.batch.id, self.course_id, self.user_ids[2:4])
+        assert grade_factory.return_value.iter.call_count == 2
+
+    def test_rerun_retries_chunk_with_errors(self, grade_factory, flush, *mocks):
+        grade_factory.return_value.iter.side_effect = self.grade_results(failing_user=self.users[1])
+
+        backfill_leaderboard_chunk(self.batch.id, self.course_id, self.user_ids[:2])
+        assert list(flush.call_args[0][1]) == [self.user_ids[0]]
+
+        backfill_leaderboard_chunk(self.batch.id, self.course_id, self.user_ids[:2])
+        assert grade_factory.return_value.iter.call_count == 2
+
+    def test_force_update(self, grade_factory, *mocks):
+        grade_factory.return_value.iter.side_effect = self.grade_results()
+        backfill_leaderboard_chunk(self.batch.id, self.course_id, self.user_ids[:1], force_update=True)
+        assert grade_factory.return_value.iter.call_args[1]['force_update']
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+@patch('common.djangoapps.leaderboard.tasks.chain', side_effect=lambda *signatures: list(signatures))
+@patch('common.djangoapps.leaderboard.tasks.group')
+class TestBackfillBatchLeaderboard(BatchTestCase):
+    """
+    Tests for backfill_batch_leaderboard.
+    """
+
+    def get_lanes(self, group):
+        return [
+            [signature.args for signature in lane]
+            for lane in group.call_args[0][0]
+        ]
+
+    def test_lanes(self, group, _chain):
+        assert backfill_batch_leaderboard(self.batch, chunk_size=2, concurrency=4) == 6
+        lanes = self.get_lanes(group)
+        assert [len(lane) for lane in lanes] == [2, 2, 1, 1]
+        assert sorted(user_id for lane in lanes for args in lane for user_id in args[2]) == sorted(
+            self.user_ids * 2
+        )
+        group.return_value.apply_async.assert_called_once_with()
+
+    def test_concurrency_bounds(self, group, _chain):
+        backfill_batch_leaderboard(self.batch, chunk_size=5, concurrency=10)
+        assert len(self.get_lanes(group)) == 2
+        backfill_batch_leaderboard(self.batch, chunk_size=5, concurrency=0)
+        assert len(self.get_lanes(group)) == 1
+
+    def test_options(self, group, _chain):
+        backfill_batch_leaderboard(self.batch, chunk_size=5, force_update=True)
+        assert [args for lane in self.get_lanes(group) for args in lane] == [
+            (self.batch.id, str(course.id), self.user_ids, True) for course in self.courses
+        ]
+
+    def test_nothing_to_backfill(self, group, _chain):
+        for user in self.users:
+            for course in self.courses:
+                LeaderBoard.objects.create(user=user, course_id=course.id, score=10)
+        assert backfill_batch_leaderboard(self.batch, missing_only=True) == 0
+        group.assert_not_called()
+
+    def test_restart_drops_checkpoints(self, group, _chain):
+        chunks = get_backfill_chunks(self.batch, 5)
+        keys = [
+            BACKFILL_CHECKPOINT_KEY.format(
+                batch_id=self.batch.id, course_id=course_id, first=user_ids[0], last=user_ids[-1]
+            )
+            for course_id, user_ids in chunks
+        ]
+        cache.set_many({key: True for key in keys})
+
+        backfill_batch_leaderboard(self.batch, chunk_size=5)
+        assert all(cache.get(key) for key in keys)
+
+        backfill_batch_leaderboard(self.batch, chunk_size=5, restart=True)
+        assert not any(cache.get(key) for key in keys)
@@ -0,0 +1,120 @@
+"""
+Tests for the coalescing LeaderBoard writer.
+"""
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.test import TestCase, override_settings
+from opaque_keys.edx.keys import CourseKey
+
+from common.djangoapps.student.tests.factories import UserFactory
+
+from ..models import LeaderBoard
+from ..writer import buffer_leaderboard_update, flush_leaderboard_updates, pop_buffered_updates
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+FLUSH_TASK = 'common.djangoapps.leaderboard.tasks.flush_leaderboard_window'
+
+
+@override_settings(CACHES=LOCMEM_CACHES, CELERY_ALWAYS_EAGER=False, LEADERBOARD_WRITE_WINDOW=10)
+@patch('common.djangoapps.leaderboard.writer.modulestore')
+@patch('common.djangoapps.custom_reports.helpers.get_course_progresses')
+class TestLeaderboardWriter(TestCase):
+    """
+    Tests for buffering and flushing LeaderBoard updates.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.course_key = CourseKey.from_string('course-v1:edX+Writer+Run')
+        self.course_id = str(self.course_key)
+        self.users = [UserFactory.create() for _ in range(2)]
+
+    def buffer(self, user, score, has_passed=False):
+        with self.captureOnCommitCallbacks(execute=True):
+            buffer_leaderboard_update(user.id, self.course_key, score, has_passed)
+
+    @staticmethod
+    def progresses(mock_progresses):
+        mock_progresses.side_effect = lambda course_key, user_ids: {
+            user_id: ('I', {}) for user_id in user_ids
+        }
+
+    def scores(self):
+        return dict(LeaderBoard.objects.filter(course_id=self.course_key).values_list('user_id', 'score'))
+
+    @patch('common.djangoapps.leaderboard.writer.time')
+    def test_updates_coalesce_latest_wins(self, mock_time, mock_progresses, _mock_modulestore):
+        mock_time.time.return_value = 1005.0
+        self.progresses(mock_progresses)
+        with patch(FLUSH_TASK) as mock_flush:
+            self.buffer(self.users[0], 10.0)
+            self.buffer(self.users[1], 20.0)
+            self.buffer(self.users[0], 30.0, has_passed=True)
+
+        # One flush is scheduled for the window, nothing is written yet.
+        mock_flush.apply_async.assert_called_once_with(args=[self.course_id, 100], countdown=7.0)
+        assert not self.scores()
+
+        updates = pop_buffered_updates(self.course_id, 100)
+        assert updates == {
+            self.users[0].id: (30.0, True, 1005.0),
+            self.users[1].id: (20.0, False, 1005.0),
+        }
+        flush_leaderboard_updates(self.course_key, updates)
+        assert self.scores() == {self.users[0].id: 30.0, self.users[1].id: 20.0}
+        assert LeaderBoard.objects.get(user=self.users[0]).has_passed
+        assert pop_buffered_updates(self.course_id, 100) == {}
+
+    @patch('common.djangoapps.leaderboard.writer.time')
+    def test_late_update_goes_to_next_window(self, mock_time, mock_progresses, _mock_modulestore):
+        mock_time.time.return_value = 1005.0
+        self.progresses(mock_progresses)
+        with patch(FLUSH_TASK) as mock_flush:
+            self.buffer(self.users[0], 10.0)
+            pop_buffered_updates(self.course_id, 100)
+            self.buffer(self.users[0], 40.0)
+
+        assert [call.kwargs['args'] for call in mock_flush.apply_async.call_args_list] == [
+            [self.course_id, 100], [self.course_id, 101],
+        ]
+        assert pop_buffered_updates(self.course_id, 101) == {self.users[0].id: (40.0, False, 1005.0)}
+
+    def test_rolled_back_update_is_not_buffered(self, mock_progresses, _mock_modulestore):
+        self.progresses(mock_progresses)
+        with patch(FLUSH_TASK) as mock_flush:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                with pytest.raises(ValueError):
+                    with transaction.atomic():
+                        buffer_leaderboard_update(self.users[0].id, self.course_key, 10.0, False)
+                        raise ValueError
+        assert callbacks == []
+        assert not mock_flush.apply_async.called
+
+    @override_settings(CELERY_ALWAYS_EAGER=True)
+    def test_eager_writes_directly(self, mock_progresses, _mock_modulestore):
+        self.progresses(mock_progresses)
+        self.buffer(self.users[0], 10.0)
+        assert self.scores() == {self.users[0].id: 10.0}
+
+    @override_settings(LEADERBOARD_WRITE_WINDOW=0)
+    def test_no_window_writes_directly(self, mock_progresses, _mock_modulestore):
+        self.progresses(mock_progresses)
+        self.buffer(self.users[0], 10.0)
+        self.buffer(self.users[0], 15.0)
+        assert self.scores() == {self.users[0].id: 15.0}
+
+    def test_flush_upserts_rows_created_meanwhile(self, mock_progresses, _mock_modulestore):
+        self.progresses(mock_progresses)
+        LeaderBoard.objects.create(user=self.users[1], course_id=self.course_key, score=5.0)
+        updates = {self.users[0].id: (10.0, False, 1.0), self.users[1].id: (20.0, True, 1.0)}
+
+        # Another writer creates the row of the first learner after it was read.
+        with patch.object(LeaderBoard.objects, 'bulk_create', side_effect=IntegrityError):
+            flush_leaderboard_updates(self.course_key, updates)
+
+        assert self.scores() == {self.users[0].id: 10.0, self.users[1].id: 20.0}
+        assert LeaderBoard.objects.get(user=self.users[0]).status == 'I'
@@ -3,3 +3,18 @@ URLs for the Leaderboard app.
 """
 from django.conf.urls import url
 from django.conf import settings
+
+from .views import batch_leaderboard, course_leaderboard
+
+urlpatterns = [
+    url(
+        r"^leaderboard/courses/{}/$".format(settings.COURSE_ID_PATTERN),
+        course_leaderboard,
+        name="course_leaderboard",
+    ),
+    url(
+        r"^leaderboard/batches/(?P<batch_id>\d+)/$",
+        batch_leaderboard,
+        name="batch_leaderboard",
+    ),
+]
@@ -0,0 +1,77 @@
+"""
+Views for the Leaderboard app.
+"""
+from django.contrib.auth.decorators import login_required
+from django.http import Http404
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import require_GET
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+
+from common.djangoapps.student.models import CourseEnrollment
+from common.djangoapps.util.json_request import JsonResponse
+
+from .models import Batch
+from .ranking import get_batch_ranking, get_course_ranking
+
+DEFAULT_TOP = 10
+MAX_TOP = 100
+NEIGHBOURS_RADIUS = 2
+
+
+def _get_int_param(request, name, default, maximum):
+    try:
+        return max(0, min(int(request.GET.get(name, default)), maximum))
+    except ValueError:
+        return default
+
+
+def _ranking_response(request, ranking):
+    """
+    Return top learners, the requesting learner's row and neighbours as JSON.
+    """
+    top = _get_int_param(request, "top", DEFAULT_TOP, MAX_TOP)
+    radius = _get_int_param(request, "radius", NEIGHBOURS_RADIUS, MAX_TOP)
+    return JsonResponse(
+        {
+            "count": len(ranking),
+            "top": ranking.top(top),
+            "user": ranking.get(request.user.id),
+            "neighbours": ranking.neighbours(request.user.id, radius),
+        },
+        status=200,
+    )
+
+
+@login_required
+@require_GET
+@cache_control(private=True, max_age=30)
+def course_leaderboard(request, course_id):
+    """
+    Return the ranking of the course in json format.
+    """
+    try:
+        course_key = CourseKey.from_string(course_id)
+    except InvalidKeyError:
+        raise Http404()
+    if not (
+        request.user.is_staff or CourseEnrollment.is_enrolled(request.user, course_key)
+    ):
+        raise Http404()
+    return _ranking_response(request, get_course_ranking(course_key))
+
+
+@login_required
+@require_GET
+@cache_control(private=True, max_age=30)
+def batch_leaderboard(request, batch_id):
+    """
+    Return the ranking of the batch by weighted course total in json format.
+    """
+    batch_id = int(batch_id)
+    if not Batch.objects.filter(id=batch_id).exists():
+        raise Http404()
+    profile = getattr(request.user, "profile", None)
+    if not (request.user.is_staff or (profile and profile.batch_id == batch_id)):
+        raise Http404()
+    return _ranking_response(request, get_batch_ranking(batch_id))
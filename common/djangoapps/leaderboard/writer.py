@@ -0,0 +1,216 @@
+"""
+Coalescing writer for LeaderBoard rows.
+
+Course grade changes arrive once per scored event, which is many times per
+learner and minute around assessment deadlines. Instead of writing the row on
+every event, updates are buffered in the shared cache in fixed windows per
+course and a single task flushes each window with a bulk upsert, keeping only
+the latest score of every learner.
+
+A window is marked flushed before its updates are read, and updates arriving
+late for a flushed window go to the next one.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from edx_django_utils.monitoring import set_custom_attribute
+from xmodule.modulestore.django import modulestore
+
+from common.djangoapps.course_manage.models import CourseManage
+from .models import BatchScore, LeaderBoard
+from .signals.signals import LEADERBOARD_SCORES_FLUSHED
+
+log = logging.getLogger("leaderboard")
+
+# Extra delay giving late cache writes of a window time to land before flush.
+LEADERBOARD_FLUSH_DELAY = 2
+LEADERBOARD_BUFFER_TIMEOUT = 10 * 60
+
+WINDOW_SCHEDULED_KEY = "leaderboard.window.{course_id}.{window}.scheduled"
+WINDOW_FLUSHED_KEY = "leaderboard.window.{course_id}.{window}.flushed"
+WINDOW_COUNT_KEY = "leaderboard.window.{course_id}.{window}.count"
+WINDOW_SLOT_KEY = "leaderboard.window.{course_id}.{window}.{slot}"
+
+
+def _is_buffering_enabled():
+    """
+    Buffer only when flush tasks really run later, i.e. not in eager mode.
+    """
+    return settings.LEADERBOARD_WRITE_WINDOW > 0 and not getattr(
+        settings, "CELERY_ALWAYS_EAGER", False
+    )
+
+
+def _next_slot(course_id, window):
+    """
+    Reserve the next free slot of the window.
+    """
+    count_key = WINDOW_COUNT_KEY.format(course_id=course_id, window=window)
+    cache.add(count_key, 0, LEADERBOARD_BUFFER_TIMEOUT)
+    return cache.incr(count_key)
+
+
+def buffer_leaderboard_update(user_id, course_key, score, has_passed):
+    """
+    Queue the score of the learner to be written with the next window flush.
+
+    Nothing is buffered before the current transaction commits, so that the
+    score of a rolled back grade change is never written.
+    """
+    transaction.on_commit(
+        lambda: _buffer_update(user_id, course_key, score, has_passed, time.time())
+    )
+
+
+def _buffer_update(user_id, course_key, score, has_passed, buffered_at):
+    """
+    Store the update in a slot of the current window, or write it directly.
+    """
+    from .tasks import flush_leaderboard_window
+
+    if not _is_buffering_enabled():
+        flush_leaderboard_updates(course_key, {user_id: (score, has_passed, buffered_at)})
+        return
+
+    course_id = str(course_key)
+    write_window = settings.LEADERBOARD_WRITE_WINDOW
+    window = int(time.time() // write_window)
+    while True:
+        try:
+            slot = _next_slot(course_id, window)
+        except ValueError:
+            # The cache lost the counter, do not drop the update.
+            log.warning("Leaderboard buffer unavailable for %s, writing directly", course_id)
+            flush_leaderboard_updates(course_key, {user_id: (score, has_passed, buffered_at)})
+            return
+        cache.set(
+            WINDOW_SLOT_KEY.format(course_id=course_id, window=window, slot=slot),
+            (user_id, score, has_passed, buffered_at),
+            LEADERBOARD_BUFFER_TIMEOUT,
+        )
+        # The flush marks the window before reading it, so an update stored
+        # before the mark is read by the flush, and one after it moves on.
+        if not cache.get(WINDOW_FLUSHED_KEY.format(course_id=course_id, window=window)):
+            break
+        window += 1
+
+    scheduled_key = WINDOW_SCHEDULED_KEY.format(course_id=course_id, window=window)
+    if cache.add(scheduled_key, True, LEADERBOARD_BUFFER_TIMEOUT):
+        countdown = (window + 1) * write_window - time.time()
+        flush_leaderboard_window.apply_async(
+            args=[course_id, window],
+            countdown=max(countdown, 0) + LEADERBOARD_FLUSH_DELAY,
+        )
+
+
+def pop_buffered_updates(course_id, window):
+    """
+    Return {user_id: (score, has_passed, buffered_at)} of the window, latest wins.
+
+    The window is marked flushed first, later updates go to the next window.
+    """
+    cache.set(
+        WINDOW_FLUSHED_KEY.format(course_id=course_id, window=window), True, LEADERBOARD_BUFFER_TIMEOUT
+    )
+    count_key = WINDOW_COUNT_KEY.format(course_id=course_id, window=window)
+    count = cache.get(count_key) or 0
+    slot_keys = [
+        WINDOW_SLOT_KEY.format(course_id=course_id, window=window, slot=slot)
+        for slot in range(1, count + 1)
+    ]
+    buffered = cache.get_many(slot_keys)
+    updates = {}
+    for slot_key in slot_keys:
+        if slot_key not in buffered:
+            continue
+        user_id, score, has_passed, buffered_at = buffered[slot_key]
+        first_buffered_at = updates[user_id][2] if user_id in updates else buffered_at
+        updates[user_id] = (score, has_passed, first_buffered_at)
+    cache.delete_many(slot_keys + [count_key])
+    if len(buffered) < count:
+        log.warning(
+            "Leaderboard window %s of %s lost %d of %d updates",
+            window, course_id, count - len(buffered), count,
+        )
+    return updates
+
+
+def flush_leaderboard_updates(course_key, updates):
+    """
+    Write the buffered scores of the course with one bulk upsert.
+
+    updates maps user ids to (score, has_passed, buffered_at). Course status
+    and attempted subsections are recomputed for all learners at once.
+    """
+    from common.djangoapps.custom_reports.helpers import get_course_progresses
+
+    if not updates:
+        return
+    started = time.time()
+    user_ids = list(updates)
+    with modulestore().bulk_operations(course_key):
+        progresses = get_course_progresses(course_key, user_ids)
+
+    existing = {
+        leaderboard.user_id: leaderboard
+        for leaderboard in LeaderBoard.objects.filter(
+            course_id=course_key, user_id__in=user_ids
+        )
+    }
+    now = timezone.now()
+    to_update, to_create = [], []
+    for user_id, (score, has_passed, _buffered_at) in updates.items():
+        status, subsections_attempted = progresses[user_id]
+        leaderboard = existing.get(user_id)
+        if leaderboard is None:
+            leaderboard = LeaderBoard(user_id=user_id, course_id=course_key)
+            to_create.append(leaderboard)
+        else:
+            to_update.append(leaderboard)
+        leaderboard.score = score
+        leaderboard.has_passed = has_passed
+        leaderboard.status = status
+        leaderboard.subsections_attempted = subsections_attempted
+        # bulk_update does not run the auto-now pre_save of TimeStampedModel.
+        leaderboard.modified = now
+
+    LeaderBoard.objects.bulk_update(
+        to_update,
+        ["score", "has_passed", "status", "subsections_attempted", "modified"],
+    )
+    try:
+        with transaction.atomic():
+            LeaderBoard.objects.bulk_create(to_create)
+    except IntegrityError:
+        # Another writer created some of the rows meanwhile.
+        for leaderboard in to_create:
+            LeaderBoard.objects.update_or_create(
+                user_id=leaderboard.user_id,
+                course_id=course_key,
+                defaults={
+                    "score": leaderboard.score,
+                    "has_passed": leaderboard.has_passed,
+                    "status": leaderboard.status,
+                    "subsections_attempted": leaderboard.subsections_attempted,
+                },
+            )
+    batch_ids = CourseManage.objects.filter(
+        course_id=course_key, batch__isnull=False
+    ).values_list("batch_id", flat=True)
+    for batch_id in batch_ids:
+        BatchScore.refresh(batch_id, user_ids)
+
+    finished = time.time()
+    oldest = min(buffered_at for _score, _passed, buffered_at in updates.values())
+    set_custom_attribute("leaderboard_flush_size", len(updates))
+    set_custom_attribute("leaderboard_flush_duration_ms", int((finished - started) * 1000))
+    set_custom_attribute("leaderboard_flush_latency_ms", int((finished - oldest) * 1000))
+    log.info(
+        "Flushed %d leaderboard updates for %s in %.3fs, oldest buffered %.3fs ago",
+        len(updates), course_key, finished - started, finished - oldest,
+    )
+    LEADERBOARD_SCORES_FLUSHED.send(sender=None, course_key=course_key, user_ids=user_ids)
@@ -1,18 +1,31 @@
 # lint-amnesty, pylint: disable=missing-module-docstring
 
+import hashlib
+import json
 import logging
 import re
+from functools import lru_cache
+from uuid import uuid4
 
 from django.conf import settings
 from django.contrib.staticfiles import finders
 from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
 from opaque_keys.edx.locator import AssetLocator
 
+from openedx.core.lib.cache_utils import get_cache
 from xmodule.contentstore.content import StaticContent
 
 log = logging.getLogger(__name__)
 XBLOCK_STATIC_RESOURCE_PREFIX = '/static/xblock'
 
+# Resolved course static urls are cached per course until one of its assets
+# changes or the asset configuration changes, and at most for this long.
+STATIC_URL_TABLE_TIMEOUT = 24 * 60 * 60
+STATIC_URL_TABLE_VERSION_KEY = 'static_replace.url_table.version.{course_id}'
+STATIC_URL_TABLE_KEY = 'static_replace.url_table.{course_id}.{version}.{config}'
+STATIC_URL_TABLE_REQUEST_CACHE = 'static_replace.url_table'
+
 
 def _url_replace_regex(prefix):
     """
@@ -29,6 +42,14 @@ def _url_replace_regex(prefix):
         """.format(prefix=prefix)
 
 
+@lru_cache(maxsize=None)
+def _compiled_url_replace_regex(prefix):
+    """
+    Return the compiled _url_replace_regex of the prefix.
+    """
+    return re.compile(_url_replace_regex(prefix))
+
+
 def try_staticfiles_lookup(path):
     """
     Try to lookup a path in staticfiles_storage.  If it fails, return
@@ -70,7 +91,7 @@ def replace_jump_to_id_urls(text, course_id, jump_to_id_base_url):  # lint-amnes
         rest = match.group('rest')
         return "".join([quote, jump_to_id_base_url + rest, quote])
 
-    return re.sub(_url_replace_regex('/jump_to_id/'), replace_jump_to_id_url, text)
+    return _compiled_url_replace_regex('/jump_to_id/').sub(replace_jump_to_id_url, text)
 
 
 def replace_course_urls(text, course_key):
@@ -90,7 +111,7 @@ def replace_course_urls(text, course_key):
         rest = match.group('rest')
         return "".join([quote, '/courses/' + course_id + '/', rest, quote])
 
-    return re.sub(_url_replace_regex('/course/'), replace_course_url, text)
+    return _compiled_url_replace_regex('/course/').sub(replace_course_url, text)
 
 
 def process_static_urls(text, replacement_function, data_dir=None):
@@ -120,14 +141,10 @@ def process_static_urls(text, replacement_function, data_dir=None):
 
         return replacement_function(original, prefix, quote, rest)
 
-    return re.sub(
-        _url_replace_regex('(?:{static_url}|/static/)(?!{data_dir})'.format(
-            static_url=settings.STATIC_URL,
-            data_dir=data_dir
-        )),
-        wrap_part_extraction,
-        text
-    )
+    return _compiled_url_replace_regex('(?:{static_url}|/static/)(?!{data_dir})'.format(
+        static_url=settings.STATIC_URL,
+        data_dir=data_dir
+    )).sub(wrap_part_extraction, text)
 
 
 def make_static_urls_absolute(request, html):
@@ -147,6 +164,102 @@ def make_static_urls_absolute(request, html):
     )
 
 
+def invalidate_static_url_table(course_id):
+    """
+    Drop the resolved static urls of the course, e.g. after one of its assets changed.
+    """
+    cache.set(STATIC_URL_TABLE_VERSION_KEY.format(course_id=course_id), uuid4().hex, None)
+
+
+class CourseStaticUrlTable:
+    """
+    Course static urls resolved by replace_static_urls, keyed by the path after /static/.
+
+    Resolving a path checks whether it is a platform static file and otherwise
+    looks the asset up in the contentstore, so the results of a course are
+    cached until invalidate_static_url_table is called for the course or the
+    asset configuration changes, and shared by every block of a request.
+    """
+
+    def __init__(self, course_id, base_url, excluded_exts, cache_key):
+        self.course_id = course_id
+        self.base_url = base_url
+        self.excluded_exts = excluded_exts
+        self.cache_key = cache_key
+        self.urls = cache.get(cache_key) or {}
+        self.changed = False
+
+    @classmethod
+    def for_course(cls, course_id):
+        """
+        Return the url table of the course for the current asset configuration.
+        """
+        # Import is placed here to avoid model import at project startup.
+        from common.djangoapps.static_replace.models import AssetBaseUrlConfig, AssetExcludedExtensionsConfig
+        base_url = AssetBaseUrlConfig.get_base_url()
+        excluded_exts = AssetExcludedExtensionsConfig.get_excluded_extensions()
+
+        version_key = STATIC_URL_TABLE_VERSION_KEY.format(course_id=course_id)
+        version = cache.get(version_key)
+        if version is None:
+            version = uuid4().hex
+            cache.set(version_key, version, None)
+        cache_key = STATIC_URL_TABLE_KEY.format(
+            course_id=course_id,
+            version=version,
+            config=hashlib.sha1(json.dumps([base_url, excluded_exts]).encode('utf-8')).hexdigest(),
+        )
+
+        request_cache = get_cache(STATIC_URL_TABLE_REQUEST_CACHE)
+        table = request_cache.get(cache_key)
+        if table is None:
+            table = request_cache[cache_key] = cls(course_id, base_url, excluded_exts, cache_key)
+        return table
+
+    def resolve(self, rest):
+        """
+        Return the url of the course static path.
+        """
+        url = self.urls.get(rest)
+        if url is None:
+            url = self.urls[rest] = self._resolve(rest)
+            self.changed = True
+        return url
+
+    def _resolve(self, rest):
+        """
+        Compute the url of the course static path.
+        """
+        # first look in the static file pipeline and see if we are trying to reference
+        # a piece of static content which is in the edx-platform repo (e.g. JS associated with an xmodule)
+
+        exists_in_staticfiles_storage = False
+        try:
+            exists_in_staticfiles_storage = staticfiles_storage.exists(rest)
+        except Exception as err:  # lint-amnesty, pylint: disable=broad-except
+            log.warning("staticfiles_storage couldn't find path {}: {}".format(
+                rest, str(err)))
+
+        if exists_in_staticfiles_storage:
+            return staticfiles_storage.url(rest)
+
+        # if not, then assume it's courseware specific content and then look in the
+        # Mongo-backed database
+        url = StaticContent.get_canonicalized_asset_path(self.course_id, rest, self.base_url, self.excluded_exts)
+
+        if AssetLocator.CANONICAL_NAMESPACE in url:
+            url = url.replace('block@', 'block/', 1)
+        return url
+
+    def save(self):
+        """
+        Store the urls resolved since the table was loaded.
+        """
+        if self.changed:
+            cache.set(self.cache_key, self.urls, STATIC_URL_TABLE_TIMEOUT)
+            self.changed = False
+
+
 def replace_static_urls(text, data_directory=None, course_id=None, static_asset_path='', static_paths_out=None):
     """
     Replace /static/$stuff urls either with their correct url as generated by collectstatic,
@@ -165,6 +278,8 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
 
     if static_paths_out is None:
         static_paths_out = []
+    # The url table of the course, loaded on the first course static url.
+    url_tables = []
 
     def replace_static_url(original, prefix, quote, rest):
         """
@@ -183,29 +298,9 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
 
         # if we're running with a MongoBacked store course_namespace is not None, then use studio style urls
         elif (not static_asset_path) and course_id:
-            # first look in the static file pipeline and see if we are trying to reference
-            # a piece of static content which is in the edx-platform repo (e.g. JS associated with an xmodule)
-
-            exists_in_staticfiles_storage = False
-            try:
-                exists_in_staticfiles_storage = staticfiles_storage.exists(rest)
-            except Exception as err:  # lint-amnesty, pylint: disable=broad-except
-                log.warning("staticfiles_storage couldn't find path {}: {}".format(
-                    rest, str(err)))
-
-            if exists_in_staticfiles_storage:
-                url = staticfiles_storage.url(rest)
-            else:
-                # if not, then assume it's courseware specific content and then look in the
-                # Mongo-backed database
-                # Import is placed here to avoid model import at project startup.
-                from common.djangoapps.static_replace.models import AssetBaseUrlConfig, AssetExcludedExtensionsConfig
-                base_url = AssetBaseUrlConfig.get_base_url()
-                excluded_exts = AssetExcludedExtensionsConfig.get_excluded_extensions()
-                url = StaticContent.get_canonicalized_asset_path(course_id, rest, base_url, excluded_exts)
-
-                if AssetLocator.CANONICAL_NAMESPACE in url:
-                    url = url.replace('block@', 'block/', 1)
+            if not url_tables:
+                url_tables.append(CourseStaticUrlTable.for_course(course_id))
+            url = url_tables[0].resolve(rest)
 
         # Otherwise, look the file up in staticfiles_storage, and append the data directory if needed
         else:
@@ -225,4 +320,7 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
         static_paths_out.append((original_uri, url))
         return "".join([quote, url, quote])
 
-    return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
+    text = process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
+    for url_table in url_tables:
+        url_table.save()
+    return text
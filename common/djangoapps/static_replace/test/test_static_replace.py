@@ -14,6 +14,7 @@ from PIL import Image
 
 from common.djangoapps.static_replace import (
     _url_replace_regex,
+    invalidate_static_url_table,
     make_static_urls_absolute,
     process_static_urls,
     replace_course_urls,
@@ -130,6 +131,37 @@ def test_mongo_filestore(mock_get_excluded_extensions, mock_get_base_url, mock_m
     mock_static_content.get_canonicalized_asset_path.assert_called_once_with(COURSE_KEY, 'file.png', '', ['foobar'])
 
 
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+@patch('common.djangoapps.static_replace.StaticContent', autospec=True)
+@patch('common.djangoapps.static_replace.staticfiles_storage', autospec=True)
+@patch('common.djangoapps.static_replace.models.AssetBaseUrlConfig.get_base_url')
+@patch('common.djangoapps.static_replace.models.AssetExcludedExtensionsConfig.get_excluded_extensions')
+def test_course_static_url_table(
+    mock_get_excluded_extensions, mock_get_base_url, mock_storage, mock_static_content,
+):
+    mock_storage.exists.return_value = False
+    mock_static_content.get_canonicalized_asset_path.return_value = "/asset/file.png"
+    mock_get_base_url.return_value = ''
+    mock_get_excluded_extensions.return_value = ['foobar']
+    text = STATIC_SOURCE + ' ' + STATIC_SOURCE
+
+    # Each course static url is resolved once, then read from the course url table
+    assert replace_static_urls(text, course_id=COURSE_KEY) == '"/asset/file.png" "/asset/file.png"'
+    assert replace_static_urls(text, course_id=COURSE_KEY) == '"/asset/file.png" "/asset/file.png"'
+    assert mock_storage.exists.call_count == 1
+    assert mock_static_content.get_canonicalized_asset_path.call_count == 1
+
+    # The table is dropped when an asset of the course changes
+    invalidate_static_url_table(COURSE_KEY)
+    assert replace_static_urls(text, course_id=COURSE_KEY) == '"/asset/file.png" "/asset/file.png"'
+    assert mock_static_content.get_canonicalized_asset_path.call_count == 2
+
+    # and not shared with other asset configurations
+    mock_get_base_url.return_value = 'cdn.example.com'
+    replace_static_urls(text, course_id=COURSE_KEY)
+    assert mock_static_content.get_canonicalized_asset_path.call_count == 3
+
+
 @patch('common.djangoapps.static_replace.settings', autospec=True)
 @patch('xmodule.modulestore.django.modulestore', autospec=True)
 @patch('common.djangoapps.static_replace.staticfiles_storage', autospec=True)
@@ -10,14 +10,14 @@ import urllib.parse
 from collections import OrderedDict
 from datetime import datetime
 
-from completion.exceptions import UnavailableCompletionData
-from completion.utilities import get_key_to_last_completed_block
+from completion.models import BlockCompletion
 from django.conf import settings
 from django.contrib.auth import load_backend
 from django.contrib.auth.models import User  # lint-amnesty, pylint: disable=imported-auth-user
 from django.core.exceptions import PermissionDenied, ObjectDoesNotExist
 from django.core.validators import ValidationError
 from django.db import IntegrityError, transaction, ProgrammingError
+from django.db.models import Max, Q
 from django.urls import NoReverseMatch, reverse
 from django.utils.translation import gettext as _
 from pytz import UTC
@@ -41,6 +41,7 @@ from lms.djangoapps.certificates.api import (
     get_certificate_url,
     has_html_certificates_enabled,
     certificate_status_for_student,
+    certificate_statuses_for_student,
     auto_certificate_generation_enabled,
 )
 from lms.djangoapps.certificates.data import CertificateStatuses
@@ -462,6 +463,28 @@ def cert_info(user, enrollment):
     )
 
 
+def cert_info_for_enrollments(user, enrollments):
+    """
+    Get the certificate info of each of the given enrollments of the student,
+    reading the certificates of all of them at once.
+
+    Arguments:
+        user (User): A user.
+        enrollments (list): The user's course enrollments.
+
+    Returns:
+        dict: course id to the cert_info of the enrollment in that course
+    """
+    enrollments = list(enrollments)
+    cert_statuses = certificate_statuses_for_student(
+        user, [enrollment.course_overview.id for enrollment in enrollments],
+    )
+    return {
+        enrollment.course_id: _cert_info(user, enrollment, cert_statuses[enrollment.course_overview.id])
+        for enrollment in enrollments
+    }
+
+
 def _cert_info(user, enrollment, cert_status):
     """
     Implements the logic for cert_info -- split out for testing.
@@ -747,6 +770,31 @@ def do_create_account(form, custom_form=None):
     return user, profile, registration
 
 
+def _get_keys_to_last_completed_blocks(user, course_keys):
+    '''
+    Return the key of the block the user completed last in each of the given
+    course runs where they completed any, reading the completions of all the
+    course runs at once.
+    '''
+    latest_completions = (
+        BlockCompletion.objects
+        .filter(user=user, context_key__in=course_keys)
+        .order_by()
+        .values_list('context_key')
+        .annotate(latest=Max('modified'))
+    )
+    query = Q()
+    for context_key, modified in latest_completions:
+        query |= Q(context_key=context_key, modified=modified)
+    if not query:
+        return {}
+
+    block_keys = {}
+    for completion in BlockCompletion.objects.filter(query, user=user).order_by('modified', 'id'):
+        block_keys[completion.context_key] = completion.full_block_key
+    return block_keys
+
+
 def get_resume_urls_for_enrollments(user, enrollments):
     '''
     For a given user, return a list of urls to the user's last completed block in
@@ -762,16 +810,18 @@ def get_resume_urls_for_enrollments(user, enrollments):
             value: url to the last completed block
                 if the value is '', then the user has not completed any blocks in the course run
     '''
+    enrollments = list(enrollments)
+    block_keys = _get_keys_to_last_completed_blocks(user, [enrollment.course_id for enrollment in enrollments])
     resume_course_urls = OrderedDict()
     for enrollment in enrollments:
-        try:
-            block_key = get_key_to_last_completed_block(user, enrollment.course_id)
+        block_key = block_keys.get(enrollment.course_id)
+        if block_key is None:
+            url_to_block = ''
+        else:
             url_to_block = reverse(
                 'jump_to',
                 kwargs={'course_id': enrollment.course_id, 'location': block_key}
             )
-        except UnavailableCompletionData:
-            url_to_block = ''
         resume_course_urls[enrollment.course_id] = url_to_block
     return resume_course_urls
 
@@ -182,7 +182,10 @@ class CertificateDisplayTest(CertificateDisplayTestBase):
 
     @patch.dict('django.conf.settings.FEATURES', {'CERTIFICATES_HTML_VIEW': False})
     def test_no_certificate_status_no_problem(self):
-        with patch('common.djangoapps.student.views.dashboard.cert_info', return_value={}):
+        with patch(
+            'common.djangoapps.student.views.dashboard.cert_info_for_enrollments',
+            side_effect=lambda user, enrollments: {enrollment.course_id: {} for enrollment in enrollments},
+        ):
             self._create_certificate('honor')
             self._check_can_not_download_certificate()
 
@@ -73,6 +73,10 @@ class TestStudentDashboardUnenrollments(SharedModuleStoreTestCase):
         self.cert_status = 'processing'
         self.client.login(username=self.user.username, password=PASSWORD)
 
+    def mock_cert_for_enrollments(self, user, enrollments):
+        """ Return a preset certificate status for each enrollment. """
+        return {enrollment.course_id: self.mock_cert(user, enrollment) for enrollment in enrollments}
+
     def mock_cert(self, _user, _course_overview):
         """ Return a preset certificate status. """
         return {
@@ -96,7 +100,10 @@ class TestStudentDashboardUnenrollments(SharedModuleStoreTestCase):
         """ Assert that the unenroll action is shown or not based on the cert status."""
         self.cert_status = cert_status
 
-        with patch('common.djangoapps.student.views.dashboard.cert_info', side_effect=self.mock_cert):
+        with patch(
+            'common.djangoapps.student.views.dashboard.cert_info_for_enrollments',
+            side_effect=self.mock_cert_for_enrollments,
+        ):
             response = self.client.get(reverse('dashboard'))
 
             assert pq(response.content)(self.UNENROLL_ELEMENT_ID).length == unenroll_action_count
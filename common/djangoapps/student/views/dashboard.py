@@ -28,6 +28,7 @@ from common.djangoapps.entitlements.models import CourseEntitlement
 from lms.djangoapps.commerce.utils import EcommerceService
 from lms.djangoapps.courseware.access import has_access
 from lms.djangoapps.experiments.utils import get_dashboard_course_info, get_experiment_user_metadata_context
+from lms.djangoapps.grades.api import prefetch_course_grades_for_user
 from lms.djangoapps.verify_student.services import IDVerificationService
 from openedx.core.djangoapps.catalog.utils import (
     get_programs,
@@ -47,7 +48,11 @@ from openedx.features.enterprise_support.api import (
     get_enterprise_learner_portal_context,
 )
 from common.djangoapps.student.api import COURSE_DASHBOARD_PLUGIN_VIEW_NAME
-from common.djangoapps.student.helpers import cert_info, check_verify_status_by_course, get_resume_urls_for_enrollments
+from common.djangoapps.student.helpers import (
+    cert_info_for_enrollments,
+    check_verify_status_by_course,
+    get_resume_urls_for_enrollments
+)
 from common.djangoapps.student.models import (
     AccountRecovery,
     CourseEnrollment,
@@ -675,10 +680,11 @@ def student_dashboard(request):  # lint-amnesty, pylint: disable=too-many-statem
     # If a course is not included in this dictionary,
     # there is no verification messaging to display.
     verify_status_by_course = check_verify_status_by_course(user, course_enrollments)
-    cert_statuses = {
-        enrollment.course_id: cert_info(request.user, enrollment)
-        for enrollment in course_enrollments
-    }
+
+    # Read the persisted grades of all the enrollments at once, they are used by
+    # the certificate information and by the course cards.
+    prefetch_course_grades_for_user(user, [enrollment.course_id for enrollment in course_enrollments])
+    cert_statuses = cert_info_for_enrollments(request.user, course_enrollments)
 
     # only show email settings for Mongo course and when bulk email is turned on
     show_email_settings_for = frozenset(
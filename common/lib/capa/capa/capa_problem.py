@@ -14,6 +14,7 @@ This is used by capa_module.
 """
 
 
+import hashlib
 import logging
 import os.path
 import re
@@ -32,9 +33,10 @@ import capa.inputtypes as inputtypes
 import capa.responsetypes as responsetypes
 import capa.xqueue_interface as xqueue_interface
 from capa.correctmap import CorrectMap
-from capa.safe_exec import safe_exec
+from capa.safe_exec import safe_exec, safe_exec_many
 from capa.util import contextualize_text, convert_files_to_filenames, get_course_id_from_capa_module
 from openedx.core.djangolib.markup import HTML, Text
+from openedx.core.lib.cache_utils import LocalLRUCache
 from openedx.core.lib.edx_six import get_gettext
 from xmodule.stringify import stringify_children
 
@@ -76,6 +78,10 @@ html_problem_semantics = [
 
 log = logging.getLogger(__name__)
 
+# Parsed problem trees, before includes and any seed dependent processing, by
+# digest of the problem text. Sized by the length of the problem text.
+PROBLEM_TREE_CACHE = LocalLRUCache('capa.problem_tree_cache', max_entries=1000, max_bytes=32 * 1024 * 1024)
+
 #-----------------------------------------------------------------------------
 # main class for this module
 
@@ -184,22 +190,7 @@ class LoncapaProblem(object):
         self.problem_text = problem_text
 
         # parse problem XML file into an element tree
-        if isinstance(problem_text, six.text_type):
-            # etree chokes on Unicode XML with an encoding declaration
-            problem_text = problem_text.encode('utf-8')
-        self.tree = etree.XML(problem_text)
-
-        try:
-            self.make_xml_compatible(self.tree)
-        except Exception:
-            capa_module = self.capa_module
-            log.exception(
-                "CAPAProblemError: %s, id:%s, data: %s",
-                capa_module.display_name,
-                self.problem_id,
-                capa_module.data
-            )
-            raise
+        self.tree = self._get_problem_tree(problem_text)
 
         # handle any <include file="foo"> tags
         self._process_includes()
@@ -235,6 +226,41 @@ class LoncapaProblem(object):
             if extract_tree:
                 self.extracted_tree = self._extract_html(self.tree)
 
+    def _get_problem_tree(self, problem_text):
+        """
+        Return a new element tree of the problem text, made compatible with make_xml_compatible.
+
+        The tree doesn't depend on the seed or the learner, so it is parsed once per
+        problem text and process, and copied for every problem built from that text.
+        Trees with <include>s are not cached, since the included files can change
+        independently of the problem text.
+        """
+        if isinstance(problem_text, six.text_type):
+            # etree chokes on Unicode XML with an encoding declaration
+            problem_text = problem_text.encode('utf-8')
+
+        key = hashlib.sha1(problem_text).hexdigest()
+        tree = PROBLEM_TREE_CACHE.get(key)
+        if tree is not None:
+            return deepcopy(tree)
+
+        tree = etree.XML(problem_text)
+        try:
+            self.make_xml_compatible(tree)
+        except Exception:
+            capa_module = self.capa_module
+            log.exception(
+                "CAPAProblemError: %s, id:%s, data: %s",
+                capa_module.display_name,
+                self.problem_id,
+                capa_module.data
+            )
+            raise
+
+        if tree.find('.//include') is None:
+            PROBLEM_TREE_CACHE.set(key, deepcopy(tree), len(problem_text))
+        return tree
+
     def make_xml_compatible(self, tree):
         """
         Adjust tree xml in-place for compatibility before creating
@@ -888,17 +914,10 @@ class LoncapaProblem(object):
 
         return path
 
-    def _extract_context(self, tree):
+    def _extract_script_code(self, tree):
         """
-        Extract content of <script>...</script> from the problem.xml file, and exec it in the
-        context of this problem.  Provides ability to randomize problems, and also set
-        variables for problem answer checking.
-
-        Problem XML goes to Python execution context. Runs everything in script tags.
+        Return (all_code, python_path, extra_files) of the Python <script>s of the problem.
         """
-        context = {}
-        context['seed'] = self.seed
-        context['anonymous_student_id'] = self.capa_system.anonymous_student_id
         all_code = ''
 
         python_path = []
@@ -929,6 +948,27 @@ class LoncapaProblem(object):
                 extra_files.append(("python_lib.zip", zip_lib))
                 python_path.append("python_lib.zip")
 
+        return all_code, python_path, extra_files
+
+    @staticmethod
+    def _initial_context(seed, anonymous_student_id):
+        """
+        Return the globals the script code of the problem is executed with.
+        """
+        return {'seed': seed, 'anonymous_student_id': anonymous_student_id}
+
+    def _extract_context(self, tree):
+        """
+        Extract content of <script>...</script> from the problem.xml file, and exec it in the
+        context of this problem.  Provides ability to randomize problems, and also set
+        variables for problem answer checking.
+
+        Problem XML goes to Python execution context. Runs everything in script tags.
+        """
+        context = self._initial_context(self.seed, self.capa_system.anonymous_student_id)
+        all_code, python_path, extra_files = self._extract_script_code(tree)
+
+        if all_code:
             try:
                 safe_exec(
                     all_code,
@@ -954,6 +994,31 @@ class LoncapaProblem(object):
         context['extra_files'] = extra_files or None
         return context
 
+    def preload_script_results(self, variants):
+        """
+        Execute the script code of the problem for many (seed, anonymous_student_id) pairs
+        in batches, storing the results in capa_system.cache.
+
+        Problems built afterwards for one of these pairs then find their context in the
+        cache instead of starting a sandbox each.  Errors are left for those problems to
+        report.
+        """
+        if not self.capa_system.cache:
+            return
+        all_code, python_path, extra_files = self._extract_script_code(self.tree)
+        if not all_code:
+            return
+        safe_exec_many(
+            all_code,
+            [(self._initial_context(seed, anonymous_student_id), seed) for seed, anonymous_student_id in variants],
+            python_path=python_path,
+            extra_files=extra_files,
+            cache=self.capa_system.cache,
+            limit_overrides_context=get_course_id_from_capa_module(self.capa_module),
+            slug=self.problem_id,
+            unsafely=self.capa_system.can_execute_unsafe_code(),
+        )
+
     def _extract_html(self, problemtree):  # private
         """
         Main (private) function which converts Problem XML tree to HTML.
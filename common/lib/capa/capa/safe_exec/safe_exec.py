@@ -2,14 +2,18 @@
 
 
 import hashlib
+import json
+import logging
 
 from codejail.safe_exec import SafeExecException, json_safe
 from codejail.safe_exec import not_safe_exec as codejail_not_safe_exec
 from codejail.safe_exec import safe_exec as codejail_safe_exec
-from edx_django_utils.monitoring import function_trace
+from edx_django_utils.monitoring import accumulate, function_trace
 import six
 from six import text_type
 
+from openedx.core.lib.cache_utils import LocalLRUCache
+
 from . import lazymod
 from .remote_exec import is_codejail_rest_service_enabled, get_remote_exec
 
@@ -57,6 +61,56 @@ for name, modname in ASSUMED_IMPORTS:
 
 LAZY_IMPORTS = "".join(LAZY_IMPORTS)
 
+# Code run in the sandbox by safe_exec_many: the problem code is executed once for each
+# variant, with its own globals and a random module seeded as CODE_PROLOG does, and the
+# JSON-safe globals or the traceback of each run are collected in safe_exec_results.
+# The modules a variant imports are dropped before the next one, so that they are
+# imported again as in a sandbox of its own, except numpy and scipy, whose compiled
+# modules cannot be initialized twice in a process.
+BATCH_CODE = """\
+import json
+import sys
+import traceback
+
+import random2
+from six.moves import xrange
+
+safe_exec_modules = dict(sys.modules)
+
+def safe_exec_reset_modules():
+    for name in list(sys.modules):
+        if name not in safe_exec_modules and name.partition(".")[0] not in ("numpy", "scipy"):
+            del sys.modules[name]
+    sys.modules.update(safe_exec_modules)
+
+def safe_exec_jsonable(value):
+    try:
+        json.dumps(value)
+    except Exception:
+        return False
+    return True
+
+safe_exec_results = []
+for safe_exec_globals, safe_exec_seed in safe_exec_variants:
+    safe_exec_reset_modules()
+    try:
+        exec(compile(safe_exec_prolog % (safe_exec_seed,) + safe_exec_code, "<string>", "exec"), safe_exec_globals)
+    except Exception:
+        safe_exec_results.append([traceback.format_exc(), None])
+    else:
+        safe_exec_results.append([None, {
+            name: value for name, value in safe_exec_globals.items()
+            if name != "__builtins__" and safe_exec_jsonable(value)
+        }])
+safe_exec_reset_modules()
+del safe_exec_variants, safe_exec_prolog, safe_exec_code
+"""
+
+# Number of variants safe_exec_many runs in one sandbox.
+SAFE_EXEC_BATCH_SIZE = 25
+
+log = logging.getLogger(__name__)
+
 
 def update_hash(hasher, obj):
     """
@@ -81,6 +135,102 @@ def update_hash(hasher, obj):
         hasher.update(six.b(repr(obj)))
 
 
+def get_cache_key(code, globals_dict, random_seed):
+    """
+    Return the key under which the result of running code with globals_dict and random_seed is cached.
+    """
+    md5er = hashlib.md5()
+    md5er.update(repr(code).encode('utf-8'))
+    update_hash(md5er, json_safe(globals_dict))
+    return "safe_exec.%r.%s" % (random_seed, md5er.hexdigest())
+
+
+def get_cached_result(cache, key):
+    """
+    Return the (emsg, cleaned_results) pair cached for key, None if there is none.
+
+    Hits and misses are accumulated as the safe_exec.cache_hits and
+    safe_exec.cache_misses custom monitoring attributes.
+    """
+    cached = cache.get(key)
+    accumulate('safe_exec.cache_hits' if cached is not None else 'safe_exec.cache_misses', 1)
+    return cached
+
+
+class SafeExecResultCache:
+    """
+    Bounded result cache for safe_exec, with an optional shared cache behind it.
+
+    Results are kept in a process-local LRU of at most max_entries results and
+    max_bytes of JSON, and written through to `shared_cache`, any object with
+    .get(key) and .set(key, value) methods, when one is given. Results larger
+    than max_result_bytes are not cached at all.
+    """
+
+    def __init__(self, shared_cache=None, max_entries=1000, max_bytes=32 * 1024 * 1024,
+                 max_result_bytes=512 * 1024):
+        self.local = LocalLRUCache('safe_exec.local_cache', max_entries, max_bytes)
+        self.shared_cache = shared_cache
+        self.max_result_bytes = max_result_bytes
+
+    def get(self, key):
+        result = self.local.get(key)
+        if result is None and self.shared_cache is not None:
+            result = self.shared_cache.get(key)
+            if result is not None:
+                self.local.set(key, result, len(json.dumps(result)))
+        return result
+
+    def set(self, key, value):
+        size = len(json.dumps(value))
+        if size > self.max_result_bytes:
+            return
+        self.local.set(key, value, size)
+        if self.shared_cache is not None:
+            self.shared_cache.set(key, value)
+
+
+def _execute(code, globals_dict, python_path, extra_files, limit_overrides_context, slug, unsafely):
+    """
+    Run the complete code with codejail, locally or through the codejail service.
+
+    Returns (emsg, exception): the message and exception raised by the code, both
+    None if it succeeded.
+    """
+    if is_codejail_rest_service_enabled():
+        data = {
+            "code": code,
+            "globals_dict": globals_dict,
+            "python_path": python_path,
+            "limit_overrides_context": limit_overrides_context,
+            "slug": slug,
+            "unsafely": unsafely,
+            "extra_files": extra_files,
+        }
+
+        return get_remote_exec(data)
+
+    # Decide which code executor to use.
+    if unsafely:
+        exec_fn = codejail_not_safe_exec
+    else:
+        exec_fn = codejail_safe_exec
+
+    # Run the code!  Results are side effects in globals_dict.
+    try:
+        exec_fn(
+            code,
+            globals_dict,
+            python_path=python_path,
+            extra_files=extra_files,
+            limit_overrides_context=limit_overrides_context,
+            slug=slug,
+        )
+    except SafeExecException as e:
+        return text_type(e), e
+    return None, None
+
+
 @function_trace('safe_exec')
 def safe_exec(
     code,
@@ -126,12 +276,8 @@ def safe_exec(
     """
     # Check the cache for a previous result.
     if cache:
-        safe_globals = json_safe(globals_dict)
-        md5er = hashlib.md5()
-        md5er.update(repr(code).encode('utf-8'))
-        update_hash(md5er, safe_globals)
-        key = "safe_exec.%r.%s" % (random_seed, md5er.hexdigest())
-        cached = cache.get(key)
+        key = get_cache_key(code, globals_dict, random_seed)
+        cached = get_cached_result(cache, key)
         if cached is not None:
             # We have a cached result.  The result is a pair: the exception
             # message, if any, else None; and the resulting globals dictionary.
@@ -144,42 +290,15 @@ def safe_exec(
     # Create the complete code we'll run.
     code_prolog = CODE_PROLOG % random_seed
 
-    if is_codejail_rest_service_enabled():
-        data = {
-            "code": code_prolog + LAZY_IMPORTS + code,
-            "globals_dict": globals_dict,
-            "python_path": python_path,
-            "limit_overrides_context": limit_overrides_context,
-            "slug": slug,
-            "unsafely": unsafely,
-            "extra_files": extra_files,
-        }
-
-        emsg, exception = get_remote_exec(data)
-
-    else:
-        # Decide which code executor to use.
-        if unsafely:
-            exec_fn = codejail_not_safe_exec
-        else:
-            exec_fn = codejail_safe_exec
-
-        # Run the code!  Results are side effects in globals_dict.
-        try:
-            exec_fn(
-                code_prolog + LAZY_IMPORTS + code,
-                globals_dict,
-                python_path=python_path,
-                extra_files=extra_files,
-                limit_overrides_context=limit_overrides_context,
-                slug=slug,
-            )
-        except SafeExecException as e:
-            # Saving SafeExecException e in exception to be used later.
-            exception = e
-            emsg = text_type(e)
-        else:
-            emsg = None
+    emsg, exception = _execute(
+        code_prolog + LAZY_IMPORTS + code,
+        globals_dict,
+        python_path,
+        extra_files,
+        limit_overrides_context,
+        slug,
+        unsafely,
+    )
 
     # Put the result back in the cache.  This is complicated by the fact that
     # the globals dict might not be entirely serializable.
@@ -190,3 +309,88 @@ def safe_exec(
     # If an exception happened, raise it now.
     if emsg:
         raise exception
+
+
+@function_trace('safe_exec_many')
+def safe_exec_many(
+    code,
+    variants,
+    python_path=None,
+    extra_files=None,
+    cache=None,
+    limit_overrides_context=None,
+    slug=None,
+    unsafely=False,
+):
+    """
+    Execute python code safely for many globals dictionaries and random seeds.
+
+    `variants` is a list of (globals_dict, random_seed) pairs.  The code is run for
+    each of them as safe_exec would, and the changes it makes to each globals_dict
+    are visible when this function returns.  Variants found in `cache` are not run;
+    the others are run SAFE_EXEC_BATCH_SIZE at a time in a single sandbox and their
+    results cached.  When the sandbox fails to run a batch as a whole, e.g. because
+    it exceeds the execution limits, its variants are run one by one with safe_exec.
+
+    The other arguments are as for safe_exec.
+
+    Returns a list with the SafeExecException raised by the code for each variant,
+    None for the variants it succeeded on.
+    """
+    errors = [None] * len(variants)
+    pending = []
+    for index, (globals_dict, random_seed) in enumerate(variants):
+        key = None
+        if cache:
+            key = get_cache_key(code, globals_dict, random_seed)
+            cached = get_cached_result(cache, key)
+            if cached is not None:
+                emsg, cleaned_results = cached
+                globals_dict.update(cleaned_results)
+                if emsg:
+                    errors[index] = SafeExecException(emsg)
+                continue
+        pending.append((index, key))
+
+    for start in range(0, len(pending), SAFE_EXEC_BATCH_SIZE):
+        batch = pending[start:start + SAFE_EXEC_BATCH_SIZE]
+        batch_globals = {
+            "safe_exec_variants": [[json_safe(variants[index][0]), variants[index][1]] for index, _key in batch],
+            "safe_exec_prolog": CODE_PROLOG,
+            "safe_exec_code": LAZY_IMPORTS + code,
+        }
+        emsg, _exception = _execute(
+            BATCH_CODE, batch_globals, python_path, extra_files, limit_overrides_context, slug, unsafely,
+        )
+        results = batch_globals.get("safe_exec_results")
+        if emsg or not isinstance(results, list) or len(results) != len(batch):
+            log.warning("Running %d variants of %s one by one, the batch failed: %s", len(batch), slug, emsg)
+            for index, _key in batch:
+                globals_dict, random_seed = variants[index]
+                try:
+                    safe_exec(
+                        code,
+                        globals_dict,
+                        random_seed=random_seed,
+                        python_path=python_path,
+                        extra_files=extra_files,
+                        cache=cache,
+                        limit_overrides_context=limit_overrides_context,
+                        slug=slug,
+                        unsafely=unsafely,
+                    )
+                except SafeExecException as e:
+                    errors[index] = e
+            continue
+
+        for (index, key), (emsg, cleaned_results) in zip(batch, results):
+            globals_dict = variants[index][0]
+            if emsg:
+                emsg = "Couldn't execute jailed code: %s" % emsg
+                errors[index] = SafeExecException(emsg)
+            else:
+                globals_dict.update(cleaned_results)
+            if cache:
+                cache.set(key, (emsg, json_safe(globals_dict)))
+
+    return errors
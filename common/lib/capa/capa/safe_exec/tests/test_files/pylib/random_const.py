@@ -0,0 +1,3 @@
+import random
+
+THE_CONST = random.randint(0, 999)
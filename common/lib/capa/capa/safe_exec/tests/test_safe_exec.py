@@ -19,7 +19,7 @@ from django.test import override_settings
 from six import text_type, unichr
 from six.moves import range
 
-from capa.safe_exec import safe_exec, update_hash
+from capa.safe_exec import SafeExecResultCache, safe_exec, safe_exec_many, update_hash
 
 
 class TestSafeExec(unittest.TestCase):  # lint-amnesty, pylint: disable=missing-class-docstring
@@ -260,6 +260,48 @@ class TestSafeExecCaching(unittest.TestCase):
                 self.fail("Tried executing code with non-ASCII unicode: {0}".format(code))
 
 
+class TestSafeExecMany(unittest.TestCase):
+    """Test running many variants of the same code with safe_exec_many."""
+
+    CODE = "y = 10 // x\nr = random.randint(0, 999)"
+
+    def test_variants(self):
+        cache = {}
+        variants = [({'x': 1}, 17), ({'x': 2}, 18), ({'x': 0}, 17)]
+        errors = safe_exec_many(self.CODE, variants, cache=DictCache(cache))
+
+        assert variants[0][0]['y'] == 10
+        assert variants[0][0]['r'] == random.Random(17).randint(0, 999)
+        assert variants[1][0]['y'] == 5
+        assert variants[1][0]['r'] == random.Random(18).randint(0, 999)
+        assert errors[:2] == [None, None]
+        assert 'ZeroDivisionError' in text_type(errors[2])
+        assert len(cache) == 3
+
+        # safe_exec finds the results of the variants in the cache.
+        cache[list(cache.keys())[1]] = (None, {'x': 2, 'y': 17})
+        g = {'x': 2}
+        safe_exec(self.CODE, g, random_seed=18, cache=DictCache(cache))
+        assert g['y'] == 17
+
+    def test_modules_imported_per_variant(self):
+        # The helper module draws a random number when it is imported, so each
+        # variant must import it again with its own seed.
+        pylib = os.path.dirname(__file__) + "/test_files/pylib"
+        variants = [({}, 17), ({}, 18)]
+        errors = safe_exec_many("import random_const; a = random_const.THE_CONST", variants, python_path=[pylib])
+
+        assert errors == [None, None]
+        assert variants[0][0]['a'] == random.Random(17).randint(0, 999)
+        assert variants[1][0]['a'] == random.Random(18).randint(0, 999)
+
+    def test_result_cache_limits(self):
+        cache = SafeExecResultCache(max_result_bytes=100)
+        safe_exec_many("a = 'a' * 200", [({}, 1)], cache=cache)
+        safe_exec_many("a = 17", [({}, 1)], cache=cache)
+        assert len(cache.local) == 1
+
+
 class TestUpdateHash(unittest.TestCase):
     """Test the safe_exec.update_hash function to be sure it canonicalizes properly."""
 
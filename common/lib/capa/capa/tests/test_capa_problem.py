@@ -12,6 +12,7 @@ from lxml import etree
 from markupsafe import Markup
 from mock import patch
 
+from capa.capa_problem import PROBLEM_TREE_CACHE
 from capa.responsetypes import LoncapaProblemError
 from capa.tests.helpers import new_loncapa_problem
 from openedx.core.djangolib.markup import HTML
@@ -734,3 +735,36 @@ class CAPAProblemReportHelpersTest(unittest.TestCase):
         # Ensure that the answer is a string so that the dict returned from this
         # function can eventualy be serialized to json without issues.
         assert isinstance(problem.get_question_answers()['1_solution_1'], six.text_type)
+
+
+class CAPAProblemTreeCacheTest(unittest.TestCase):
+    """
+    Tests for the cache of parsed problem trees.
+    """
+
+    XML = """
+    <problem>
+        <optionresponse>
+            <optioninput options="('yellow','blue','green')" correct="blue" label="Color_1"/>
+        </optionresponse>
+    </problem>
+    """
+
+    def setUp(self):
+        super().setUp()
+        PROBLEM_TREE_CACHE.clear()
+        self.addCleanup(PROBLEM_TREE_CACHE.clear)
+
+    def test_problems_get_their_own_tree(self):
+        first = new_loncapa_problem(self.XML, problem_id='first')
+        second = new_loncapa_problem(self.XML, problem_id='second')
+
+        assert len(PROBLEM_TREE_CACHE) == 1
+        assert first.tree is not second.tree
+        assert first.tree.find('.//optioninput').get('id') == 'first_2_1'
+        assert second.tree.find('.//optioninput').get('id') == 'second_2_1'
+
+    def test_includes_are_not_cached(self):
+        # The test capa system runs in DEBUG mode, where includes that fail are skipped.
+        new_loncapa_problem('<problem><include file="missing.xml"/></problem>')
+        assert len(PROBLEM_TREE_CACHE) == 0
@@ -5,6 +5,7 @@ Implements the Problem XBlock, which is built on top of the CAPA subsystem.
 import copy
 import datetime
 import hashlib
+import itertools
 import json
 import logging
 import os
@@ -30,6 +31,7 @@ from capa import responsetypes
 from capa.capa_problem import LoncapaProblem, LoncapaSystem
 from capa.inputtypes import Status
 from capa.responsetypes import LoncapaProblemError, ResponseError, StudentInputError
+from capa.safe_exec import SafeExecResultCache
 from capa.util import convert_files_to_filenames, get_inner_html_from_xpath
 from openedx.core.djangolib.markup import HTML, Text
 from xmodule.contentstore.django import contentstore
@@ -64,6 +66,10 @@ NUM_RANDOMIZATION_BINS = 20
 # Never produce more than this many different seeds, no matter what.
 MAX_RANDOMIZATION_BINS = 1000
 
+# Number of learner states generate_report_data reads ahead to run the problem
+# script code for their seeds in one batch.
+REPORT_SCRIPT_PRELOAD_WINDOW = 200
+
 
 try:
     FEATURES = getattr(settings, 'FEATURES', {})
@@ -663,7 +669,8 @@ class ProblemBlock(
             # '$anonymous_student_id' in their XML.
             # For the purposes of this report, we don't need to support those use cases.
             anonymous_student_id=None,
-            cache=None,
+            # The script code runs with the same globals for all learners sharing a seed.
+            cache=SafeExecResultCache(),
             can_execute_unsafe_code=lambda: None,
             get_python_lib_zip=(lambda: get_python_lib_zip(contentstore, self.runtime.course_id)),
             DEBUG=None,
@@ -679,7 +686,7 @@ class ProblemBlock(
         _ = capa_system.i18n.ugettext
 
         count = 0
-        for user_state in user_state_iterator:
+        for user_state in self._preload_report_scripts(user_state_iterator, capa_system.cache):
 
             if 'student_answers' not in user_state.state:
                 continue
@@ -743,6 +750,62 @@ class ProblemBlock(
                 }
                 yield (user_state.username, report)
 
+    def _preload_report_scripts(self, user_state_iterator, cache):
+        """
+        Yield the user states, running the script code for the seeds of each window of
+        them in one batch beforehand.
+        """
+        user_state_iterator = iter(user_state_iterator)
+        while True:
+            user_states = list(itertools.islice(user_state_iterator, REPORT_SCRIPT_PRELOAD_WINDOW))
+            if not user_states:
+                return
+            seeds = {
+                user_state.state.get('seed') for user_state in user_states
+                if 'student_answers' in user_state.state
+            }
+            self.preload_script_results([(seed, None) for seed in seeds if seed is not None], cache)
+            yield from user_states
+
+    def preload_script_results(self, variants, cache, unsafely=False):
+        """
+        Run the script code of this problem for many (seed, anonymous_student_id) pairs
+        in batches, storing the results in cache.
+
+        LoncapaProblems built afterwards with that cache for one of these pairs, e.g.
+        while rescoring or reporting on many learners, then find their context there.
+        """
+        capa_system = LoncapaSystem(
+            ajax_url=None,
+            anonymous_student_id=None,
+            cache=cache,
+            can_execute_unsafe_code=lambda: unsafely,
+            get_python_lib_zip=(lambda: get_python_lib_zip(contentstore, self.runtime.course_id)),
+            DEBUG=None,
+            filestore=self.runtime.resources_fs,
+            i18n=self.runtime.service(self, "i18n"),
+            node_path=None,
+            render_template=None,
+            seed=1,
+            STATIC_URL=None,
+            xqueue=None,
+            matlab_api_key=None,
+        )
+        try:
+            lcp = LoncapaProblem(
+                problem_text=self.data,
+                id=self.location.html_id(),
+                capa_system=capa_system,
+                capa_module=self,
+                state={},
+                seed=1,
+                minimal_init=True,
+            )
+        except LoncapaProblemError:
+            log.exception("LcpFatalError for block %s while preloading script results", str(self.location))
+            return
+        lcp.preload_script_results(variants)
+
     @property
     def close_date(self):
         """
@@ -607,6 +607,19 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         except NotImplementedError:
             return None, None
 
+    @strip_key
+    def get_blocks_changed_since(self, course_key, version_guid, **kwargs):  # pylint: disable=unused-argument
+        """
+        Returns the usage keys of the blocks of the course that were added or
+        changed since the given version of its structure, or None if that
+        version is not found.
+
+        Raises NotImplementedError if the course's modulestore does not keep
+        versioned structures.
+        """
+        store = self._verify_modulestore_support(course_key, 'get_blocks_changed_since')
+        return store.get_blocks_changed_since(course_key, version_guid)
+
     def get_modulestore_type(self, course_id):
         """
         Returns a type which identifies which modulestore is servicing the given course_id.
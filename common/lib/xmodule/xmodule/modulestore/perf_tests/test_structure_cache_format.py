@@ -0,0 +1,150 @@
+"""
+Performance test comparing the formats of the split CourseStructureCache.
+"""
+
+
+import datetime
+import itertools
+import pickle
+import time
+import tracemalloc
+import unittest
+import zlib
+
+import ddt
+from bson.objectid import ObjectId
+
+from xmodule.modulestore import BlockData
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.mongo_connection import STRUCTURE_CACHE_COMPRESSORS, _get_compressor
+from xmodule.modulestore.split_mongo.packed_structure import pack_structure, unpack_structure
+
+# Number of blocks in the generated structures.
+BLOCK_AMOUNT_PER_TEST = (100, 1000, 10000, 50000)
+
+# Children of every non leaf block of the generated structures.
+FANOUT = 8
+
+# Times each structure is loaded, the best time is reported.
+LOAD_REPEATS = 5
+
+
+def make_structure(block_amount):
+    """
+    Return a split structure with block_amount blocks, as read from mongo.
+    """
+    version = ObjectId()
+    edited_on = datetime.datetime(2020, 1, 1)
+    block_types = itertools.cycle(('chapter', 'sequential', 'vertical', 'problem', 'html', 'video'))
+    block_keys = [BlockKey('course', 'course')] + [
+        BlockKey(block_type, f'{block_type}_{index:032x}')
+        for index, block_type in zip(range(1, block_amount), block_types)
+    ]
+    blocks = {}
+    for index, block_key in enumerate(block_keys):
+        children = block_keys[index * FANOUT + 1:(index + 1) * FANOUT + 1]
+        fields = {'display_name': f'Block {index}', 'graded': index % 2 == 0}
+        if children:
+            fields['children'] = list(children)
+        blocks[block_key] = BlockData(
+            block_type=block_key.type,
+            fields=fields,
+            definition=ObjectId(),
+            edit_info={
+                'previous_version': version,
+                'update_version': version,
+                'source_version': None,
+                'edited_on': edited_on,
+                'edited_by': 1,
+            },
+        )
+    return {
+        '_id': version,
+        'root': block_keys[0],
+        'previous_version': None,
+        'original_version': version,
+        'edited_by': 1,
+        'edited_on': edited_on,
+        'schema_version': 1,
+        'blocks': blocks,
+    }
+
+
+def dump_pickle(structure):
+    return zlib.compress(pickle.dumps(structure, 4), 1)
+
+
+def load_pickle(data):
+    return pickle.loads(zlib.decompress(data), encoding='latin-1')
+
+
+def format_functions():
+    """
+    Return {format name: (dump, load)} of the formats available here.
+    """
+    functions = {'pickle+zlib': (dump_pickle, load_pickle)}
+    for name, (compressor_id, _factory) in STRUCTURE_CACHE_COMPRESSORS.items():
+        compressor = _get_compressor(compressor_id)
+        if compressor is None:
+            continue
+        _name, compress, decompress = compressor
+        functions[f'packed+{name}'] = (
+            lambda structure, compress=compress: compress(pack_structure(structure)),
+            lambda data, decompress=decompress: unpack_structure(decompress(data)),
+        )
+    return functions
+
+
+def measure_load(load, data, touch_blocks):
+    """
+    Return (best load seconds, peak bytes allocated) of loading data.
+
+    When touch_blocks is set, the fields of every block are read too.
+    """
+    best = None
+    for _ in range(LOAD_REPEATS):
+        started = time.perf_counter()
+        structure = load(data)
+        if touch_blocks:
+            for block in structure['blocks'].values():
+                block.fields  # pylint: disable=pointless-statement
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    structure = load(data)
+    if touch_blocks:
+        for block in structure['blocks'].values():
+            block.fields  # pylint: disable=pointless-statement
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+@ddt.ddt
+@unittest.skip
+class StructureCacheFormatTiming(unittest.TestCase):
+    """
+    Times loading structures from the cache in the legacy pickle and the
+    packed formats, once only decoding the structure and once reading the
+    fields of every block as well.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    @ddt.data(*BLOCK_AMOUNT_PER_TEST)
+    def test_structure_cache_format_timings(self, block_amount):
+        structure = make_structure(block_amount)
+        print(f'\n{block_amount} blocks')
+        print('{:<14} {:>10} {:>12} {:>12} {:>12} {:>12}'.format(
+            'format', 'size', 'load ms', 'load KiB', 'touched ms', 'touched KiB',
+        ))
+        for name, (dump, load) in format_functions().items():
+            data = dump(structure)
+            assert load(data) == structure
+            load_time, load_peak = measure_load(load, data, touch_blocks=False)
+            touched_time, touched_peak = measure_load(load, data, touch_blocks=True)
+            print('{:<14} {:>10} {:>12.2f} {:>12} {:>12.2f} {:>12}'.format(
+                name, len(data), load_time * 1000, load_peak // 1024, touched_time * 1000, touched_peak // 1024,
+            ))
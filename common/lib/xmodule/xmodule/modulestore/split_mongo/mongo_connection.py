@@ -12,15 +12,18 @@ import zlib
 from contextlib import contextmanager
 from time import time
 
+from django.conf import settings
 from django.core.cache import caches, InvalidCacheBackendError
 import pymongo
 import pytz
 from mongodb_proxy import autoretry_read
 # Import this just to export it
 from pymongo.errors import DuplicateKeyError  # pylint: disable=unused-import
+from openedx.core.lib.cache_utils import LocalLRUCache, process_cached
 from xmodule.exceptions import HeartbeatFailure
 from xmodule.modulestore import BlockData
 from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.packed_structure import pack_structure, unpack_structure
 from xmodule.mongo_utils import connect_to_mongodb, create_collection_index
 
 
@@ -184,10 +187,72 @@ def structure_to_mongo(structure, course_context=None):
         return new_structure
 
 
+# Header of packed cache entries: magic, format version and compressor id.
+# Entries without it are zlib compressed pickles written by the legacy format.
+STRUCTURE_CACHE_MAGIC = b'SPS'
+STRUCTURE_CACHE_FORMAT_VERSION = 1
+STRUCTURE_CACHE_HEADER_SIZE = len(STRUCTURE_CACHE_MAGIC) + 2
+
+
+def _lz4_compressor():
+    """
+    Return (compress, decompress) of lz4 frames, None when lz4 is not installed.
+    """
+    try:
+        import lz4.frame  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    return lz4.frame.compress, lz4.frame.decompress
+
+
+STRUCTURE_CACHE_COMPRESSORS = {
+    # name: (id stored in the header, factory of (compress, decompress))
+    'zlib': (1, lambda: (lambda data: zlib.compress(data, 1), zlib.decompress)),
+    'lz4': (2, _lz4_compressor),
+}
+
+
+def _get_compressor(compressor_id):
+    """
+    Return (name, compress, decompress) of the compressor, None if unavailable.
+    """
+    for name, (known_id, factory) in STRUCTURE_CACHE_COMPRESSORS.items():
+        if known_id == compressor_id:
+            functions = factory()
+            return (name,) + functions if functions else None
+    return None
+
+
+@process_cached
+def get_local_structure_cache():
+    """
+    Return the in-process tier in front of the course_structure_cache.
+
+    Structures are immutable per version, so their uncompressed serialized
+    data is kept for the life of the process, bounded by the
+    COURSE_STRUCTURE_LOCAL_CACHE setting.
+    """
+    local_settings = getattr(settings, 'COURSE_STRUCTURE_LOCAL_CACHE', {})
+    return LocalLRUCache(
+        'course_structure_local_cache',
+        max_entries=local_settings.get('MAX_ENTRIES', 0),
+        max_bytes=local_settings.get('MAX_BYTES', 0),
+    )
+
+
 class CourseStructureCache:
     """
     Wrapper around django cache object to cache course structure objects.
-    The course structures are pickled and compressed when cached.
+
+    Structures are written in the packed format of :mod:`.packed_structure`
+    and compressed with zlib, or with lz4 when it is installed and selected
+    with the COURSE_STRUCTURE_CACHE_COMPRESSOR setting. Setting
+    COURSE_STRUCTURE_CACHE_FORMAT to "pickle" writes the legacy zlib
+    compressed pickles instead, e.g. while older workers still read the
+    cache. Entries in either format are read, so switching needs no flush.
+
+    Uncompressed data of recently used structures is also kept in a local
+    in-process tier, see get_local_structure_cache.
 
     If the 'course_structure_cache' doesn't exist, then don't do anything for
     for set and get.
@@ -200,47 +265,102 @@ class CourseStructureCache:
             pass
 
     def get(self, key, course_context=None):
-        """Pull the compressed, pickled struct data from cache and deserialize."""
+        """Pull the compressed struct data from cache and deserialize."""
         if self.cache is None:
             return None
 
         with TIMER.timer("CourseStructureCache.get", course_context) as tagger:
+            local_cache = get_local_structure_cache()
+            local_entry = local_cache.get(key)
+            if local_entry is not None:
+                tagger.tag(from_cache='local')
+                return self._load(*local_entry)
+
             try:
-                compressed_pickled_data = self.cache.get(key)
-                tagger.tag(from_cache=str(compressed_pickled_data is not None).lower())
+                compressed_data = self.cache.get(key)
+                tagger.tag(from_cache=str(compressed_data is not None).lower())
 
-                if compressed_pickled_data is None:
+                if compressed_data is None:
                     # Always log cache misses, because they are unexpected
                     tagger.sample_rate = 1
                     return None
 
-                tagger.measure('compressed_size', len(compressed_pickled_data))
-
-                pickled_data = zlib.decompress(compressed_pickled_data)
-                tagger.measure('uncompressed_size', len(pickled_data))
+                tagger.measure('compressed_size', len(compressed_data))
+
+                if not compressed_data.startswith(STRUCTURE_CACHE_MAGIC):
+                    tagger.tag(format='pickle')
+                    local_entry = ('pickle', zlib.decompress(compressed_data))
+                else:
+                    format_version, compressor_id = compressed_data[
+                        len(STRUCTURE_CACHE_MAGIC):STRUCTURE_CACHE_HEADER_SIZE
+                    ]
+                    compressor = _get_compressor(compressor_id)
+                    if format_version != STRUCTURE_CACHE_FORMAT_VERSION or compressor is None:
+                        # Written by a newer or differently configured worker, read it from the db.
+                        tagger.tag(format='unsupported')
+                        return None
+                    name, _compress, decompress = compressor
+                    tagger.tag(format='packed', compressor=name)
+                    local_entry = ('packed', decompress(compressed_data[STRUCTURE_CACHE_HEADER_SIZE:]))
+                tagger.measure('uncompressed_size', len(local_entry[1]))
 
-                return pickle.loads(pickled_data, encoding='latin-1')
+                structure = self._load(*local_entry)
             except Exception:  # lint-amnesty, pylint: disable=broad-except
                 # The cached data is corrupt in some way, get rid of it.
                 log.warning("CourseStructureCache: Bad data in cache for %s", course_context)
                 self.cache.delete(key)
                 return None
 
+            local_cache.set(key, local_entry, len(local_entry[1]))
+            return structure
+
+    @staticmethod
+    def _load(data_format, data):
+        """
+        Return the structure from its uncompressed serialization.
+        """
+        if data_format == 'pickle':
+            return pickle.loads(data, encoding='latin-1')
+        return unpack_structure(data)
+
     def set(self, key, structure, course_context=None):
-        """Given a structure, will pickle, compress, and write to cache."""
+        """Given a structure, will serialize, compress, and write to cache."""
         if self.cache is None:
             return None
 
         with TIMER.timer("CourseStructureCache.set", course_context) as tagger:
-            pickled_data = pickle.dumps(structure, 4)  # Protocol can't be incremented until cache is cleared
-            tagger.measure('uncompressed_size', len(pickled_data))
+            if getattr(settings, 'COURSE_STRUCTURE_CACHE_FORMAT', 'packed') == 'pickle':
+                data_format = 'pickle'
+                data = pickle.dumps(structure, 4)  # Protocol can't be incremented until cache is cleared
+                tagger.measure('uncompressed_size', len(data))
 
-            # 1 = Fastest (slightly larger results)
-            compressed_pickled_data = zlib.compress(pickled_data, 1)
-            tagger.measure('compressed_size', len(compressed_pickled_data))
+                # 1 = Fastest (slightly larger results)
+                compressed_data = zlib.compress(data, 1)
+            else:
+                compressor_name = getattr(settings, 'COURSE_STRUCTURE_CACHE_COMPRESSOR', 'zlib')
+                compressor_id, _factory = STRUCTURE_CACHE_COMPRESSORS.get(
+                    compressor_name, STRUCTURE_CACHE_COMPRESSORS['zlib']
+                )
+                compressor = _get_compressor(compressor_id)
+                if compressor is None:
+                    log.warning("CourseStructureCache: %s is not available, using zlib", compressor_name)
+                    compressor_id = STRUCTURE_CACHE_COMPRESSORS['zlib'][0]
+                    compressor = _get_compressor(compressor_id)
+                _name, compress, _decompress = compressor
+
+                data_format = 'packed'
+                data = pack_structure(structure)
+                tagger.measure('uncompressed_size', len(data))
+                compressed_data = (
+                    STRUCTURE_CACHE_MAGIC +
+                    bytes((STRUCTURE_CACHE_FORMAT_VERSION, compressor_id)) +
+                    compress(data)
+                )
+            tagger.measure('compressed_size', len(compressed_data))
 
             # Stuctures are immutable, so we set a timeout of "never"
-            self.cache.set(key, compressed_pickled_data, None)
+            self.cache.set(key, compressed_data, None)
+            get_local_structure_cache().set(key, (data_format, data), len(data))
 
 
 class MongoConnection:
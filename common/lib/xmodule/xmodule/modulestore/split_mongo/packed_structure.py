@@ -0,0 +1,134 @@
+"""
+Packed serialization of split course structures for the CourseStructureCache.
+
+A packed structure stores every BlockKey of the structure once in a key
+table, refers to children by their position in that table and keeps the
+fields of each block as a separately pickled record. Loading it only builds
+the key table and one small placeholder per block; the record of a block is
+decoded the first time one of its attributes other than block_type is read.
+"""
+
+
+import pickle
+import sys
+
+from xmodule.modulestore import BlockData, EditInfo
+from xmodule.modulestore.split_mongo import BlockKey
+
+PICKLE_PROTOCOL = 4
+
+# Order of the EditInfo values in a packed block record.
+EDIT_INFO_FIELDS = (
+    'previous_version',
+    'update_version',
+    'source_version',
+    'edited_on',
+    'edited_by',
+    'original_usage',
+    'original_usage_version',
+)
+
+
+class PackedBlockData(BlockData):  # pylint: disable=eq-without-hash
+    """
+    BlockData whose fields are decoded from a packed record on first access.
+
+    Cached structures are shared between threads, so the record is decoded
+    into locals and the fields are stored before the record is dropped: a
+    thread reading the block meanwhile either decodes the record again or
+    finds the fields.
+    """
+
+    def __init__(self, block_type, record, block_keys):  # pylint: disable=super-init-not-called
+        self.definition_loaded = False
+        self.block_type = block_type
+        self._packed = (record, block_keys)
+
+    def __getattr__(self, name):
+        # Only called for attributes not set yet, i.e. before the record is decoded.
+        if name.startswith('__') or '_packed' not in self.__dict__:
+            raise AttributeError(name)
+        self._unpack()
+        return getattr(self, name)
+
+    def _unpack(self):
+        """
+        Decode the record, keeping any attribute assigned in the meantime.
+        """
+        packed = self.__dict__.get('_packed')
+        if packed is None:
+            return
+        record, block_keys = packed
+        fields, definition, defaults, asides, edit_info = pickle.loads(record)
+        if 'children' in fields:
+            fields['children'] = [block_keys[position] for position in fields['children']]
+        decoded = {
+            'fields': fields,
+            'definition': definition,
+            'defaults': defaults,
+            'asides': asides,
+            'edit_info': EditInfo(**dict(zip(EDIT_INFO_FIELDS, edit_info))),
+        }
+        state = self.__dict__
+        for name, value in decoded.items():
+            state.setdefault(name, value)
+        state.pop('_packed', None)
+
+    def __getstate__(self):
+        self._unpack()
+        return self.__dict__
+
+
+def pack_structure(structure):
+    """
+    Return the packed, uncompressed bytes of the structure.
+    """
+    positions = {}
+    block_keys = []
+
+    def position_of(block_key):
+        position = positions.get(block_key)
+        if position is None:
+            position = positions[block_key] = len(block_keys)
+            block_keys.append((sys.intern(block_key.type), block_key.id))
+        return position
+
+    blocks = []
+    for block_key, block in structure['blocks'].items():
+        fields = block.fields
+        if 'children' in fields:
+            fields = dict(fields, children=[position_of(child) for child in fields['children']])
+        edit_info = block.edit_info.to_storable()
+        record = (
+            fields,
+            block.definition,
+            block.defaults,
+            block.get_asides(),
+            tuple(edit_info[name] for name in EDIT_INFO_FIELDS),
+        )
+        blocks.append((
+            position_of(block_key),
+            block.block_type or block_key.type,
+            pickle.dumps(record, PICKLE_PROTOCOL),
+        ))
+
+    header = {name: value for name, value in structure.items() if name != 'blocks'}
+    if 'root' in header:
+        header['root'] = position_of(header['root'])
+    return pickle.dumps((header, block_keys, blocks), PICKLE_PROTOCOL)
+
+
+def unpack_structure(data):
+    """
+    Return the structure from bytes written by pack_structure.
+    """
+    header, block_keys, blocks = pickle.loads(data)
+    block_keys = [BlockKey(block_type, block_id) for block_type, block_id in block_keys]
+    structure = dict(header)
+    if 'root' in structure:
+        structure['root'] = block_keys[structure['root']]
+    structure['blocks'] = {
+        block_keys[position]: PackedBlockData(block_type, record, block_keys)
+        for position, block_type, record in blocks
+    }
+    return structure
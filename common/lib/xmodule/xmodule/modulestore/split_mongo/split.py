@@ -107,6 +107,7 @@ from xmodule.partitions.partitions_service import PartitionService
 
 from ..exceptions import ItemNotFoundError
 from .caching_descriptor_system import CachingDescriptorSystem
+from .structure_index import StructureIndex
 
 log = logging.getLogger(__name__)
 
@@ -802,8 +803,10 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                 del self.request_cache.data.setdefault('course_cache', {})[course_version_guid]
             except KeyError:
                 pass
+            self.request_cache.data.setdefault('structure_index_cache', {}).pop(course_version_guid, None)
         else:
             self.request_cache.data['course_cache'] = {}
+            self.request_cache.data['structure_index_cache'] = {}
 
     def _lookup_course(self, course_key, head_validation=True):
         """
@@ -1228,24 +1231,25 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
 
         if settings is None:
             settings = {}
+        index = self._get_structure_index(course_locator, course.structure)
         if 'name' in qualifiers:
             # odd case where we don't search just confirm
             block_name = qualifiers.pop('name')
-            block_ids = []
-            for block_id, block in course.structure['blocks'].items():
-                # Don't do an in comparison blindly; first check to make sure
-                # that the name qualifier we're looking at isn't a plain string;
-                # if it is a string, then it should match exactly. If it's other
-                # than a string, we check whether it contains the block ID; this
-                # is so a list or other iterable can be passed with multiple
-                # valid qualifiers.
-                if isinstance(block_name, str):
-                    name_matches = block_id.id == block_name
-                else:
-                    name_matches = block_id.id in block_name
-                if name_matches and _block_matches_all(block):
-                    block_ids.append(block_id)
-
+            # Don't do an in comparison blindly; first check to make sure
+            # that the name qualifier we're looking at isn't a plain string;
+            # if it is a string, then it should match exactly. If it's other
+            # than a string, we check whether it contains the block ID; this
+            # is so a list or other iterable can be passed with multiple
+            # valid qualifiers.
+            block_names = self._indexable_values(block_name)
+            if block_names is not None:
+                candidates = index.of_ids(block_names)
+            else:
+                candidates = [block_id for block_id in course.structure['blocks'] if block_id.id in block_name]
+            block_ids = [
+                block_id for block_id in candidates
+                if _block_matches_all(course.structure['blocks'][block_id])
+            ]
             return self._load_items(course, block_ids, **kwargs)
 
         if 'category' in qualifiers:
@@ -1255,21 +1259,16 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         if 'children' in qualifiers:
             settings['children'] = qualifiers.pop('children')
 
-        # No need of these caches unless include_orphans is set to False
-        path_cache = None
-        parents_cache = None
-
-        if not include_orphans:
-            path_cache = {}
-            parents_cache = self.build_block_key_to_parents_mapping(course.structure)
+        block_types = self._indexable_values(qualifiers.get('block_type'))
+        if block_types is not None:
+            candidates = index.of_types(block_types)
+        else:
+            candidates = course.structure['blocks']
 
-        for block_id, value in course.structure['blocks'].items():
-            if _block_matches_all(value):
+        for block_id in candidates:
+            if _block_matches_all(course.structure['blocks'][block_id]):
                 if not include_orphans:
-                    if (
-                        block_id.type in DETACHED_XBLOCK_TYPES or
-                        self.has_path_to_root(block_id, course, path_cache, parents_cache)
-                    ):
+                    if block_id.type in DETACHED_XBLOCK_TYPES or block_id in index.reachable:
                         items.append(block_id)
                 else:
                     items.append(block_id)
@@ -1279,6 +1278,40 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         else:
             return []
 
+    @staticmethod
+    def _indexable_values(criteria):
+        """
+        Return the list of exact values matched by the criteria when it can be
+        answered from a StructureIndex, None otherwise.
+        """
+        if isinstance(criteria, dict) and list(criteria) == ['$in']:
+            criteria = criteria['$in']
+        if isinstance(criteria, str):
+            return [criteria]
+        if isinstance(criteria, (list, tuple, set, frozenset)) and all(isinstance(value, str) for value in criteria):
+            return list(criteria)
+        return None
+
+    def _get_structure_index(self, course_key, structure):
+        """
+        Return the StructureIndex of the structure.
+
+        Indexes of stored structures are cached in the request cache, next to
+        the descriptor systems of their version. A structure versioned in the
+        active bulk operation may still change, so it gets a fresh index.
+        """
+        version_guid = structure['_id']
+        bulk_write_record = self._get_bulk_ops_record(course_key)
+        if self.request_cache is None or (
+            bulk_write_record.active and version_guid not in bulk_write_record.structures_in_db
+        ):
+            return StructureIndex(structure)
+
+        indexes = self.request_cache.data.setdefault('structure_index_cache', {})
+        if version_guid not in indexes:
+            indexes[version_guid] = StructureIndex(structure)
+        return indexes[version_guid]
+
     def build_block_key_to_parents_mapping(self, structure):
         """
         Given a structure, builds block_key to parents mapping for all block keys in structure
@@ -1347,14 +1380,15 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             raise ItemNotFoundError(locator)
 
         course = self._lookup_course(locator.course_key)
-        all_parent_ids = self._get_parents_from_structure(BlockKey.from_usage_key(locator), course.structure)
+        index = self._get_structure_index(locator.course_key, course.structure)
+        all_parent_ids = index.parents.get(BlockKey.from_usage_key(locator), [])
 
         # Check and verify the found parent_ids are not orphans; Remove parent which has no valid path
         # to the course root
         parent_ids = [
             valid_parent
             for valid_parent in all_parent_ids
-            if self.has_path_to_root(valid_parent, course)
+            if valid_parent in index.reachable
         ]
 
         if len(parent_ids) == 0:
@@ -1478,6 +1512,47 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             return usage_key, block.edit_info.original_usage_version
         return None, None
 
+    def get_blocks_changed_since(self, course_key, version_guid):
+        """
+        Returns the usage keys of the blocks of the course that were added or
+        changed since the given version of its structure, or None if that
+        version is not found.
+
+        A block counts as changed when its type, definition, fields, defaults,
+        asides or original usage differ, so blocks whose edit info was only
+        touched by a copy or a republish are not returned. A block whose
+        children were added, removed or reordered is changed as well.
+        """
+        course = self._lookup_course(course_key)
+        version_guid = course_key.as_object_id(version_guid)
+        if course.structure['_id'] == version_guid:
+            return []
+        old_structure = self.get_structure(course_key, version_guid)
+        if old_structure is None:
+            return None
+
+        def block_content(block):
+            """
+            Returns the values of the block that affect its xBlock.
+            """
+            return (
+                block.block_type,
+                block.definition,
+                block.fields,
+                block.defaults,
+                block.get_asides(),
+                block.edit_info.original_usage,
+                block.edit_info.original_usage_version,
+            )
+
+        old_blocks = old_structure['blocks']
+        changed_keys = []
+        for block_key, block in course.structure['blocks'].items():
+            old_block = old_blocks.get(block_key)
+            if old_block is None or block_content(old_block) != block_content(block):
+                changed_keys.append(course_key.make_usage_key(block_key.type, block_key.id))
+        return changed_keys
+
     def create_definition_from_data(self, course_key, new_def_data, category, user_id):
         """
         Pull the definition fields out of descriptor and save to the db as a new definition
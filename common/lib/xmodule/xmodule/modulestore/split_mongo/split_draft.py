@@ -316,6 +316,10 @@ class DraftVersioningModuleStore(SplitMongoModuleStore, ModuleStoreDraftAndPubli
         usage_key = self._map_revision_to_branch(usage_key)
         return super().get_block_original_usage(usage_key)
 
+    def get_blocks_changed_since(self, course_key, version_guid):
+        course_key = self._map_revision_to_branch(course_key)
+        return super().get_blocks_changed_since(course_key, version_guid)
+
     def get_orphans(self, course_key, **kwargs):
         course_key = self._map_revision_to_branch(course_key)
         return super().get_orphans(course_key, **kwargs)
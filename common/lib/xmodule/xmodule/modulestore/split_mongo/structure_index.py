@@ -0,0 +1,107 @@
+"""
+Secondary indexes over the blocks of a split course structure.
+
+Structures are immutable once stored, so the indexes of a stored structure
+version are built at most once per request and shared by every lookup on it.
+"""
+
+
+from collections import defaultdict
+
+from lazy import lazy
+
+ROOT_BLOCK_TYPES = ('course', 'library')
+
+
+class StructureIndex:
+    """
+    Lookups of the blocks of one structure by type, by id and by parent.
+
+    Each index is built lazily on first use.
+    """
+
+    def __init__(self, structure):
+        self.blocks = structure['blocks']
+
+    @lazy
+    def positions(self):
+        """
+        Position of each block key in the structure.
+        """
+        return {block_key: position for position, block_key in enumerate(self.blocks)}
+
+    @lazy
+    def by_type(self):
+        """
+        Block keys grouped by block type, in structure order.
+        """
+        block_keys = defaultdict(list)
+        for block_key in self.blocks:
+            block_keys[block_key.type].append(block_key)
+        return dict(block_keys)
+
+    @lazy
+    def by_id(self):
+        """
+        Block keys grouped by block id, in structure order.
+        """
+        block_keys = defaultdict(list)
+        for block_key in self.blocks:
+            block_keys[block_key.id].append(block_key)
+        return dict(block_keys)
+
+    @lazy
+    def parents(self):
+        """
+        Parent block keys of every child block key.
+        """
+        children_to_parents = defaultdict(list)
+        for parent_key, value in self.blocks.items():
+            for child_key in value.fields.get('children', []):
+                children_to_parents[child_key].append(parent_key)
+        return children_to_parents
+
+    @lazy
+    def reachable(self):
+        """
+        Block keys that have a path to the root of the course or library.
+        """
+        reachable = set()
+        pending = [
+            block_key for block_key in self.blocks
+            if block_key.type in ROOT_BLOCK_TYPES and not self.parents.get(block_key)
+        ]
+        while pending:
+            block_key = pending.pop()
+            if block_key in reachable:
+                continue
+            reachable.add(block_key)
+            block = self.blocks.get(block_key)
+            if block is not None:
+                pending.extend(block.fields.get('children', []))
+        return reachable
+
+    def _select(self, groups, values):
+        """
+        Return block keys of the groups of any of the values, in structure order.
+        """
+        if len(values) == 1:
+            return list(groups.get(values[0], []))
+        block_keys = [
+            block_key
+            for value in set(values)
+            for block_key in groups.get(value, [])
+        ]
+        return sorted(block_keys, key=self.positions.__getitem__)
+
+    def of_types(self, block_types):
+        """
+        Return block keys of any of the given block types.
+        """
+        return self._select(self.by_type, block_types)
+
+    def of_ids(self, block_ids):
+        """
+        Return block keys with any of the given block ids.
+        """
+        return self._select(self.by_id, block_ids)
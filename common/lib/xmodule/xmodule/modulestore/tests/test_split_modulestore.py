@@ -5,6 +5,7 @@
 
 import datetime
 import os
+import pickle
 import random
 import re
 import unittest
@@ -15,6 +16,7 @@ import pytest
 import ddt
 from ccx_keys.locator import CCXBlockUsageLocator
 from django.core.cache import InvalidCacheBackendError, caches
+from django.test.utils import override_settings
 from opaque_keys.edx.locator import BlockUsageLocator, CourseKey, CourseLocator, LocalId
 from path import Path as path
 from xblock.fields import Reference, ReferenceList, ReferenceValueDict
@@ -35,6 +37,8 @@ from xmodule.modulestore.exceptions import (
 )
 from xmodule.modulestore.inheritance import InheritanceMixin
 from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.mongo_connection import STRUCTURE_CACHE_MAGIC
+from xmodule.modulestore.split_mongo.packed_structure import PackedBlockData
 from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore
 from xmodule.modulestore.tests.factories import check_mongo_calls
 from xmodule.modulestore.tests.mongo_connection import MONGO_HOST, MONGO_PORT_NUM
@@ -877,6 +881,53 @@ class TestCourseStructureCache(CacheIsolationMixin, SplitModuleTest):
         # now make sure that you get the same structure
         assert not_corrupt_structure == not_cached_structure
 
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_course_structure_cache_formats(self, mock_get_cache):
+        # entries written in the legacy pickle format stay readable
+        enabled_cache = caches['default']
+        mock_get_cache.return_value = enabled_cache
+
+        with override_settings(COURSE_STRUCTURE_CACHE_FORMAT='pickle'):
+            with check_mongo_calls(1):
+                not_cached_structure = self._get_structure(self.new_course)
+        assert not enabled_cache.get(self.new_course.id.version_guid).startswith(STRUCTURE_CACHE_MAGIC)
+
+        with check_mongo_calls(0):
+            cached_structure = self._get_structure(self.new_course)
+        assert cached_structure == not_cached_structure
+
+        enabled_cache.clear()
+        with check_mongo_calls(1):
+            self._get_structure(self.new_course)
+        assert enabled_cache.get(self.new_course.id.version_guid).startswith(STRUCTURE_CACHE_MAGIC)
+
+        with check_mongo_calls(0):
+            cached_structure = self._get_structure(self.new_course)
+        assert all(isinstance(block, PackedBlockData) for block in cached_structure['blocks'].values())
+        assert cached_structure == not_cached_structure
+
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_packed_block_read_while_decoding(self, mock_get_cache):
+        # cached structures are shared between threads, which may read a block
+        # while another thread is decoding it
+        mock_get_cache.return_value = caches['default']
+        not_cached_structure = self._get_structure(self.new_course)
+        cached_structure = self._get_structure(self.new_course)
+        block_key = cached_structure['root']
+        block = cached_structure['blocks'][block_key]
+        loads = pickle.loads
+        read_meanwhile = []
+
+        def loads_and_read(data):
+            if not read_meanwhile:
+                read_meanwhile.append(None)
+                read_meanwhile.append(block.fields)
+            return loads(data)
+
+        with patch('xmodule.modulestore.split_mongo.packed_structure.pickle.loads', side_effect=loads_and_read):
+            assert block.fields == not_cached_structure['blocks'][block_key].fields
+        assert read_meanwhile == [None, block.fields]
+
     @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
     def test_course_structure_cache_no_cache_configured(self, mock_get_cache):
         mock_get_cache.side_effect = InvalidCacheBackendError
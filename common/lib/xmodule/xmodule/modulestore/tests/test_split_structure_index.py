@@ -0,0 +1,54 @@
+"""
+Tests for the split modulestore StructureIndex.
+"""
+
+
+import unittest
+
+from xmodule.modulestore import BlockData
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.structure_index import StructureIndex
+
+
+class TestStructureIndex(unittest.TestCase):
+    """
+    Tests for StructureIndex lookups.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.course = BlockKey('course', 'course')
+        self.chapter = BlockKey('chapter', 'chapter')
+        self.sequential = BlockKey('sequential', 'sequential')
+        self.problem = BlockKey('problem', 'problem')
+        self.html = BlockKey('html', 'html')
+        self.orphan = BlockKey('vertical', 'orphan')
+        self.orphan_problem = BlockKey('problem', 'orphan_problem')
+        children = {
+            self.course: [self.chapter],
+            self.chapter: [self.sequential],
+            self.sequential: [self.problem, self.html],
+            self.orphan: [self.orphan_problem],
+        }
+        blocks = {
+            block_key: BlockData(block_type=block_key.type, fields={'children': children.get(block_key, [])})
+            for block_key in (
+                self.course, self.chapter, self.orphan, self.sequential, self.problem, self.html, self.orphan_problem,
+            )
+        }
+        self.index = StructureIndex({'_id': 'version', 'blocks': blocks})
+
+    def test_of_types(self):
+        assert self.index.of_types(['problem']) == [self.problem, self.orphan_problem]
+        assert self.index.of_types(['html', 'vertical']) == [self.orphan, self.html]
+        assert self.index.of_types(['video']) == []
+
+    def test_of_ids(self):
+        assert self.index.of_ids(['problem', 'orphan']) == [self.orphan, self.problem]
+
+    def test_parents(self):
+        assert self.index.parents[self.problem] == [self.sequential]
+        assert self.index.parents.get(self.course) is None
+
+    def test_reachable(self):
+        assert self.index.reachable == {self.course, self.chapter, self.sequential, self.problem, self.html}
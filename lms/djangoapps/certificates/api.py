@@ -47,6 +47,7 @@ from lms.djangoapps.certificates.utils import (
     should_certificate_be_visible as _should_certificate_be_visible,
     certificate_status as _certificate_status,
     certificate_status_for_student as _certificate_status_for_student,
+    certificate_statuses_for_student as _certificate_statuses_for_student,
 )
 from lms.djangoapps.instructor import access
 from openedx.core.djangoapps.content.course_overviews.api import get_course_overview_or_none
@@ -827,6 +828,11 @@ def certificate_status_for_student(student, course_id):
     return _certificate_status_for_student(student, course_id)
 
 
+def certificate_statuses_for_student(student, course_ids):
+    """This returns the certificate status dictionary of the student in each course, keyed by course id."""
+    return _certificate_statuses_for_student(student, course_ids)
+
+
 def auto_certificate_generation_enabled():
     return _AUTO_CERTIFICATE_GENERATION.is_enabled()
 
@@ -234,6 +234,22 @@ def certificate_status_for_student(student, course_id):
     return certificate_status(generated_certificate)
 
 
+def certificate_statuses_for_student(student, course_ids):
+    """
+    Returns the certificate status dictionary of the student in each of the given courses,
+    keyed by course id. See certificate_status for more information.
+    """
+    course_ids = list(course_ids)
+    generated_certificates = {
+        generated_certificate.course_id: generated_certificate
+        for generated_certificate in GeneratedCertificate.objects.filter(user=student, course_id__in=course_ids)
+    }
+    return {
+        course_id: certificate_status(generated_certificates.get(course_id))
+        for course_id in course_ids
+    }
+
+
 def get_preferred_certificate_name(user):
     """
     If the verified name feature is enabled and the user has their preference set to use their
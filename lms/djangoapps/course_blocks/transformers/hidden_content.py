@@ -33,6 +33,7 @@ class HiddenContentTransformer(BlockStructureTransformer):
     """
     WRITE_VERSION = 3
     READ_VERSION = 3
+    SUPPORTS_INCREMENTAL_COLLECT = True
     MERGED_HIDE_AFTER_DUE = 'merged_hide_after_due'
 
     @classmethod
@@ -9,6 +9,9 @@ Classes to provide the LMS runtime data storage to XBlocks.
 :class:`FieldDataCache`: A object which provides a read-through prefetch cache
     of data to support XBlock fields within a limited set of scopes.
 
+:class:`MultiUserFieldDataCache`: Prefetches the same data as :class:`FieldDataCache`
+    for many users at once and hands out FieldDataCaches per user.
+
 The remaining classes in this module provide read-through prefetch cache implementations
 for specific scopes. The individual classes provide the knowledge of what are the essential
 pieces of information for each scope, and thus how to cache, prefetch, and create new field data
@@ -82,6 +85,17 @@ def _all_block_types(descriptors, aside_types):
     return block_types
 
 
+def _fields_by_scope(descriptors):
+    """
+    Return a map of scopes to the fields of `descriptors` in that scope.
+    """
+    scope_map = defaultdict(set)
+    for descriptor in descriptors:
+        for field in descriptor.fields.values():
+            scope_map[field.scope].add(field)
+    return scope_map
+
+
 class DjangoKeyValueStore(KeyValueStore):
     """
     This KeyValueStore will read and write data in the following scopes to django models
@@ -167,7 +181,13 @@ class DjangoOrmFieldCache(metaclass=ABCMeta):
             xblocks (list of :class:`XBlock`): XBlocks to cache fields for.
             aside_types (list of str): Aside types to cache fields for.
         """
-        for field_object in self._read_objects(fields, xblocks, aside_types):
+        self._add_field_objects(self._read_objects(fields, xblocks, aside_types))
+
+    def _add_field_objects(self, field_objects):
+        """
+        Add already loaded ``field_objects`` to this cache.
+        """
+        for field_object in field_objects:
             self._cache[self._cache_key_for_field_object(field_object)] = field_object
 
     def get(self, kvs_key):
@@ -354,7 +374,13 @@ class UserStateCache:
             self.user.username,
             _all_usage_keys(xblocks, aside_types),
         )
-        for user_state in block_field_state:
+        self._add_user_states(block_field_state)
+
+    def _add_user_states(self, user_states):
+        """
+        Add already loaded XBlockUserState ``user_states`` of this user to this cache.
+        """
+        for user_state in user_states:
             self._cache[user_state.block_key] = user_state.state
 
     def set(self, kvs_key, value):
@@ -780,11 +806,7 @@ class FieldDataCache:
         """
         Returns a map of scopes to fields in that scope that should be cached
         """
-        scope_map = defaultdict(set)
-        for descriptor in descriptors:
-            for field in descriptor.fields.values():
-                scope_map[field.scope].add(field)
-        return scope_map
+        return _fields_by_scope(descriptors)
 
     def get(self, key):
         """
@@ -908,6 +930,95 @@ class FieldDataCache:
         return sum(len(cache) for cache in self.cache.values())
 
 
+class MultiUserFieldDataCache:
+    """
+    Prefetches the field data of the same descriptors for many users at once.
+
+    The user state, preferences and user info of all users are read in chunked
+    queries, and the user state summary once, rather than once per user as a
+    FieldDataCache per user would. :meth:`for_user` then hands out
+    FieldDataCaches filled from that data without querying the database.
+    """
+    def __init__(self, descriptors, course_id, users, asides=None):
+        """
+        Arguments
+        descriptors: A list of XModuleDescriptors.
+        course_id: The id of the current course
+        users: The users for which to cache data
+        asides: The list of aside types to load, or None to prefetch no asides.
+        """
+        assert isinstance(course_id, LearningContextKey)
+        self.descriptors = list(descriptors)
+        self.course_id = course_id
+        self.asides = [] if asides is None else asides
+        self.users = [user for user in users if user.is_authenticated]
+
+        self.scorable_locations = {desc.location for desc in self.descriptors if desc.has_score}
+        self._user_states = defaultdict(list)
+        self._preferences = defaultdict(list)
+        self._user_info = defaultdict(list)
+        self._user_state_summary = UserStateSummaryCache(self.course_id)
+
+        if self.users:
+            self._load(_fields_by_scope(self.descriptors))
+
+    def _load(self, fields_by_scope):
+        """
+        Read the field data of all users for the fields of each scope.
+        """
+        user_ids = [user.id for user in self.users]
+        usernames = {user.username: user.id for user in self.users}
+
+        if fields_by_scope.get(Scope.user_state):
+            user_states = DjangoXBlockUserStateClient().get_many_for_users(
+                self.users,
+                _all_usage_keys(self.descriptors, self.asides),
+            )
+            for user_state in user_states:
+                self._user_states[usernames[user_state.username]].append(user_state)
+
+        if fields_by_scope.get(Scope.preferences):
+            preferences = XModuleStudentPrefsField.objects.chunked_filter(
+                'student_id__in',
+                user_ids,
+                module_type__in=_all_block_types(self.descriptors, self.asides),
+                field_name__in={field.name for field in fields_by_scope[Scope.preferences]},
+            )
+            for field_object in preferences:
+                self._preferences[field_object.student_id].append(field_object)
+
+        if fields_by_scope.get(Scope.user_info):
+            user_info = XModuleStudentInfoField.objects.chunked_filter(
+                'student_id__in',
+                user_ids,
+                field_name__in={field.name for field in fields_by_scope[Scope.user_info]},
+            )
+            for field_object in user_info:
+                self._user_info[field_object.student_id].append(field_object)
+
+        if fields_by_scope.get(Scope.user_state_summary):
+            self._user_state_summary.cache_fields(
+                fields_by_scope[Scope.user_state_summary], self.descriptors, self.asides,
+            )
+
+    def for_user(self, user, read_only=True):
+        """
+        Return a FieldDataCache of ``user`` filled from the prefetched data.
+
+        Users not passed to the constructor get an empty cache.  Unless
+        ``read_only`` is False, writes to the cache are a no-op.
+        """
+        field_data_cache = FieldDataCache([], self.course_id, user, asides=self.asides, read_only=read_only)
+        if user.is_authenticated:
+            field_data_cache.scorable_locations.update(self.scorable_locations)
+            # pylint: disable=protected-access
+            field_data_cache.cache[Scope.user_state]._add_user_states(self._user_states.get(user.id, []))
+            field_data_cache.cache[Scope.preferences]._add_field_objects(self._preferences.get(user.id, []))
+            field_data_cache.cache[Scope.user_info]._add_field_objects(self._user_info.get(user.id, []))
+            field_data_cache.cache[Scope.user_state_summary] = self._user_state_summary
+        return field_data_cache
+
+
 class ScoresClient:
     """
     Basic client interface for retrieving Score information.
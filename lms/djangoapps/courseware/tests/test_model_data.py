@@ -13,7 +13,12 @@ from xblock.exceptions import KeyValueMultiSaveError
 from xblock.fields import BlockScope, Scope, ScopeIds
 
 from common.djangoapps.student.tests.factories import UserFactory
-from lms.djangoapps.courseware.model_data import DjangoKeyValueStore, FieldDataCache, InvalidScopeError
+from lms.djangoapps.courseware.model_data import (
+    DjangoKeyValueStore,
+    FieldDataCache,
+    InvalidScopeError,
+    MultiUserFieldDataCache
+)
 from lms.djangoapps.courseware.models import (
     StudentModule,
     XModuleStudentInfoField,
@@ -444,3 +449,51 @@ class TestStudentInfoStorage(OtherUserFailureTestMixin, StorageTestBase, TestCas
     storage_class = XModuleStudentInfoField
     other_key_factory = partial(DjangoKeyValueStore.Key, Scope.user_info, 2, 'mock_problem')  # user_id=2, not 1
     existing_field_name = "existing_field"
+
+
+class TestMultiUserFieldDataCache(TestCase):
+    """Tests for prefetching field data of several users at once"""
+    # Tell Django to clean out all databases, not just default
+    databases = set(connections)
+
+    def setUp(self):
+        super().setUp()
+        self.user = StudentModuleFactory(state=json.dumps({'a_field': 'a_value'})).student
+        self.other_user = StudentModuleFactory(state=json.dumps({'a_field': 'other_value'})).student
+        self.user_without_state = UserFactory.create()
+        assert self.user.id == 1
+        # check our assumption hard-coded in the key functions above.
+
+        # The state of all users is read in a single query
+        with self.assertNumQueries(1):
+            self.multi_user_cache = MultiUserFieldDataCache(
+                [mock_descriptor([mock_field(Scope.user_state, 'a_field')])],
+                COURSE_KEY,
+                [self.user, self.other_user, self.user_without_state],
+            )
+
+    def test_for_user(self):
+        with self.assertNumQueries(0):
+            kvs = DjangoKeyValueStore(self.multi_user_cache.for_user(self.user))
+            assert 'a_value' == kvs.get(user_state_key('a_field'))
+
+            other_kvs = DjangoKeyValueStore(self.multi_user_cache.for_user(self.other_user))
+            other_key = DjangoKeyValueStore.Key(Scope.user_state, self.other_user.id, LOCATION('usage_id'), 'a_field')
+            assert 'other_value' == other_kvs.get(other_key)
+
+            empty_kvs = DjangoKeyValueStore(self.multi_user_cache.for_user(self.user_without_state))
+            empty_key = DjangoKeyValueStore.Key(
+                Scope.user_state, self.user_without_state.id, LOCATION('usage_id'), 'a_field',
+            )
+            assert not empty_kvs.has(empty_key)
+
+    def test_for_user_is_read_only(self):
+        kvs = DjangoKeyValueStore(self.multi_user_cache.for_user(self.user))
+        with self.assertNumQueries(0):
+            kvs.set(user_state_key('a_field'), 'new_value')
+        assert {'a_field': 'a_value'} == json.loads(StudentModule.objects.get(student=self.user).state)
+
+    def test_for_user_writable(self):
+        kvs = DjangoKeyValueStore(self.multi_user_cache.for_user(self.user, read_only=False))
+        kvs.set(user_state_key('a_field'), 'new_value')
+        assert {'a_field': 'new_value'} == json.loads(StudentModule.objects.get(student=self.user).state)
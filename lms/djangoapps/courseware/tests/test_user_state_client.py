@@ -7,8 +7,10 @@ defined in edx_user_state_client.
 from collections import defaultdict
 
 from django.db import connections
+from django.test import override_settings
 
 from edx_user_state_client.tests import UserStateClientTestBase
+from opaque_keys.edx.locator import CourseLocator
 
 from common.djangoapps.student.tests.factories import UserFactory
 from lms.djangoapps.courseware.user_state_client import DjangoXBlockUserStateClient
@@ -36,3 +38,18 @@ class TestDjangoUserStateClient(UserStateClientTestBase, ModuleStoreTestCase):
         super().setUp()
         self.client = DjangoXBlockUserStateClient()
         self.users = defaultdict(UserFactory.create)
+
+    @override_settings(USER_STATE_BATCH_SIZE=2)
+    def test_iter_all_for_course_batches(self):
+        block_key = CourseLocator('org', 'course', 'run').make_usage_key('problem', 'problem')
+        for user_idx in range(5):
+            self.client.set_many(self._user(user_idx), {block_key: {'seed': user_idx, 'other': 'value'}})
+        self.client.delete(self._user(2), block_key, fields=['seed', 'other'])
+
+        # Two full batches and a partial one, each joining in the usernames.
+        with self.assertNumQueries(3):
+            user_states = list(self.client.iter_all_for_course(block_key.course_key, fields=['seed']))
+
+        assert sorted((user_state.username, user_state.state) for user_state in user_states) == sorted(
+            (self._user(user_idx), {'seed': user_idx}) for user_idx in (0, 1, 3, 4)
+        )
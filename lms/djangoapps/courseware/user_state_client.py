@@ -11,14 +11,13 @@ from time import time
 
 from django.conf import settings
 from django.contrib.auth.models import User  # lint-amnesty, pylint: disable=imported-auth-user
-from django.core.paginator import Paginator
 from django.db import transaction
 from django.db.utils import IntegrityError
 from edx_django_utils import monitoring as monitoring_utils
 from edx_user_state_client.interface import XBlockUserState, XBlockUserStateClient
 from xblock.fields import Scope
 
-from lms.djangoapps.courseware.models import BaseStudentModuleHistory, StudentModule
+from lms.djangoapps.courseware.models import BaseStudentModuleHistory, StudentModule, chunks
 
 try:
     import simplejson as json
@@ -28,6 +27,10 @@ except ImportError:
 
 log = logging.getLogger(__name__)
 
+# Number of users and of blocks per StudentModule query of get_many_for_users,
+# keeping each query below the sqlite limit on the number of parameters.
+MULTI_USER_CHUNK_SIZE = 250
+
 
 class DjangoXBlockUserStateClient(XBlockUserStateClient):
     """
@@ -105,6 +108,37 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
                 usage_key = student_module.module_state_key.map_into_course(student_module.course_id)
                 yield (student_module, usage_key)
 
+    def _get_student_modules_for_users(self, user_ids, block_keys):
+        """
+        Retrieve the :class:`~StudentModule`s for the supplied ``user_ids`` and ``block_keys``.
+
+        Both the users and the blocks are queried in chunks, so the number of
+        queries grows with the number of chunks rather than with the number of users.
+
+        Arguments:
+            user_ids (list of int): The ids of the users to load `StudentModule`s for.
+            block_keys (list of :class:`~UsageKey`): The set of XBlocks to load data for.
+        """
+        course_key_func = attrgetter('course_key')
+        by_course = itertools.groupby(
+            sorted(block_keys, key=course_key_func),
+            course_key_func,
+        )
+
+        for course_key, usage_keys in by_course:
+            for usage_keys_chunk in chunks(usage_keys, MULTI_USER_CHUNK_SIZE):
+                query = StudentModule.objects.chunked_filter(
+                    'student_id__in',
+                    user_ids,
+                    chunk_size=MULTI_USER_CHUNK_SIZE,
+                    module_state_key__in=usage_keys_chunk,
+                    course_id=course_key,
+                )
+
+                for student_module in query:
+                    usage_key = student_module.module_state_key.map_into_course(student_module.course_id)
+                    yield (student_module, usage_key)
+
     def _nr_attribute_name(self, function_name, stat_name, block_type=None):
         """
         Return an attribute name (string) representing the provided descriptors.
@@ -167,7 +201,6 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         if scope != Scope.user_state:
             raise ValueError(f"Only Scope.user_state is supported, not {scope}")
 
-        total_block_count = 0
         evt_time = time()
 
         # count how many times this function gets called
@@ -178,29 +211,10 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
 
         modules = self._get_student_modules(username, block_keys)
         for module, usage_key in modules:
-            if module.state is None:
-                continue
-
-            state = json.loads(module.state)
-            state_length = len(module.state)
-
-            # If the state is the empty dict, then it has been deleted, and so
-            # conformant UserStateClients should treat it as if it doesn't exist.
-            if state == {}:
+            state = self._load_state('get_many', module, usage_key, fields)
+            if state is None:
                 continue
 
-            # collect statistics for custom attribute reporting
-            self._nr_block_stat_increment('get_many', usage_key.block_type, 'blocks_out')
-            self._nr_block_stat_accumulate('get_many', usage_key.block_type, 'size', state_length)
-            total_block_count += 1
-
-            # filter state on fields
-            if fields is not None:
-                state = {
-                    field: state[field]
-                    for field in fields
-                    if field in state
-                }
             yield XBlockUserState(username, usage_key, state, module.modified, scope)
 
         # The rest of this method exists only to report custom attributes.
@@ -208,6 +222,72 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         duration = (finish_time - evt_time) * 1000  # milliseconds
         self._nr_stat_accumulate('get_many', 'duration', duration)
 
+    def get_many_for_users(self, users, block_keys, scope=Scope.user_state, fields=None):
+        """
+        Retrieve the stored XBlock state of several users for the specified XBlock usages.
+
+        This reads the state of all users in a few chunked queries instead of
+        calling :meth:`get_many` once per user.
+
+        Arguments:
+            users ([User]): The users whose state should be retrieved
+            block_keys ([UsageKey]): A list of UsageKeys identifying which xblock states to load.
+            scope (Scope): The scope to load data from
+            fields: A list of field values to retrieve. If None, retrieve all stored fields.
+
+        Yields:
+            XBlockUserState tuples for each user and each specified UsageKey in block_keys
+            that has stored state.
+        """
+        if scope != Scope.user_state:
+            raise ValueError(f"Only Scope.user_state is supported, not {scope}")
+
+        evt_time = time()
+        usernames = {user.id: user.username for user in users}
+
+        self._nr_stat_increment('get_many_for_users', 'calls')
+        self._nr_stat_accumulate('get_many_for_users', 'users_requested', len(usernames))
+        self._nr_stat_accumulate('get_many_for_users', 'blocks_requested', len(block_keys))
+
+        modules = self._get_student_modules_for_users(list(usernames), block_keys)
+        for module, usage_key in modules:
+            state = self._load_state('get_many_for_users', module, usage_key, fields)
+            if state is None:
+                continue
+
+            yield XBlockUserState(usernames[module.student_id], usage_key, state, module.modified, scope)
+
+        finish_time = time()
+        duration = (finish_time - evt_time) * 1000  # milliseconds
+        self._nr_stat_accumulate('get_many_for_users', 'duration', duration)
+
+    def _load_state(self, function_name, module, usage_key, fields):
+        """
+        Return the stored state of ``module`` filtered on ``fields``, or None if it has none.
+        """
+        if module.state is None:
+            return None
+
+        state = json.loads(module.state)
+
+        # If the state is the empty dict, then it has been deleted, and so
+        # conformant UserStateClients should treat it as if it doesn't exist.
+        if state == {}:
+            return None
+
+        # collect statistics for custom attribute reporting
+        self._nr_block_stat_increment(function_name, usage_key.block_type, 'blocks_out')
+        self._nr_block_stat_accumulate(function_name, usage_key.block_type, 'size', len(module.state))
+
+        # filter state on fields
+        if fields is not None:
+            state = {
+                field: state[field]
+                for field in fields
+                if field in state
+            }
+        return state
+
     def set_many(self, username, block_keys_to_state, scope=Scope.user_state):
         """
         Set fields for a particular XBlock.
@@ -394,7 +474,45 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
 
             yield XBlockUserState(username, block_key, state, history_entry.created, scope)
 
-    def iter_all_for_block(self, block_key, scope=Scope.user_state):
+    def _iter_student_modules(self, student_modules, fields=None):
+        """
+        Yield an :class:`~XBlockUserState` for each of ``student_modules`` with stored state.
+
+        Rows are read in batches of ``USER_STATE_BATCH_SIZE`` by increasing id, so
+        every query seeks straight to its batch however deep into the table it reads
+        and a single batch is held in memory at a time. Only the columns needed to
+        build the user states are fetched, with the username joined in.
+
+        Arguments:
+            student_modules: a :class:`~QuerySet` of :class:`~StudentModule`
+            fields: A list of field values to retrieve. If None, retrieve all stored fields.
+        """
+        student_modules = student_modules.exclude(state__isnull=True).values_list(
+            'id', 'student__username', 'module_state_key', 'state', 'modified',
+        )
+        batch_size = settings.USER_STATE_BATCH_SIZE
+        last_id = 0
+        while True:
+            batch = list(student_modules.filter(id__gt=last_id).order_by('id')[:batch_size])
+            for _id, username, module_state_key, state, modified in batch:
+                state = json.loads(state)
+
+                if state == {}:
+                    continue
+
+                if fields is not None:
+                    state = {
+                        field: state[field]
+                        for field in fields
+                        if field in state
+                    }
+                yield XBlockUserState(username, module_state_key, state, modified, Scope.user_state)
+
+            if len(batch) < batch_size:
+                break
+            last_id = batch[-1][0]
+
+    def iter_all_for_block(self, block_key, scope=Scope.user_state, fields=None):
         """
         Return an iterator over the data stored in the block (e.g. a problem block).
 
@@ -404,6 +522,7 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         Arguments:
             block_key: an XBlock's locator (e.g. :class:`~BlockUsageLocator`)
             scope (Scope): must be `Scope.user_state`
+            fields: A list of field values to retrieve. If None, retrieve all stored fields.
 
         Returns:
             an iterator over all data. Each invocation returns the next :class:`~XBlockUserState`
@@ -412,21 +531,10 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         if scope != Scope.user_state:
             raise ValueError("Only Scope.user_state is supported")
 
-        results = StudentModule.objects.order_by('id').filter(module_state_key=block_key)
-        p = Paginator(results, settings.USER_STATE_BATCH_SIZE)
-
-        for page_number in p.page_range:
-            page = p.page(page_number)
-
-            for sm in page.object_list:
-                state = json.loads(sm.state)
+        results = StudentModule.objects.filter(module_state_key=block_key)
+        return self._iter_student_modules(results, fields)
 
-                if state == {}:
-                    continue
-
-                yield XBlockUserState(sm.student.username, sm.module_state_key, state, sm.modified, scope)
-
-    def iter_all_for_course(self, course_key, block_type=None, scope=Scope.user_state):
+    def iter_all_for_course(self, course_key, block_type=None, scope=Scope.user_state, fields=None):
         """
         Return an iterator over all data stored in a course's blocks.
 
@@ -436,6 +544,7 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         Arguments:
             course_key: a course locator
             scope (Scope): must be `Scope.user_state`
+            fields: A list of field values to retrieve. If None, retrieve all stored fields.
 
         Returns:
             an iterator over all data. Each invocation returns the next :class:`~XBlockUserState`
@@ -444,19 +553,8 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         if scope != Scope.user_state:
             raise ValueError("Only Scope.user_state is supported")
 
-        results = StudentModule.objects.order_by('id').filter(course_id=course_key)
+        results = StudentModule.objects.filter(course_id=course_key)
         if block_type:
             results = results.filter(module_type=block_type)
 
-        p = Paginator(results, settings.USER_STATE_BATCH_SIZE)
-
-        for page_number in p.page_range:
-            page = p.page(page_number)
-
-            for sm in page.object_list:
-                state = json.loads(sm.state)
-
-                if state == {}:
-                    continue
-
-                yield XBlockUserState(sm.student.username, sm.module_state_key, state, sm.modified, scope)
+        return self._iter_student_modules(results, fields)
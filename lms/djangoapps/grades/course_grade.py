@@ -13,9 +13,10 @@ from lazy import lazy
 from openedx.core.lib.grade_utils import round_away_from_zero
 from xmodule import block_metadata_utils
 
-from .config import assume_zero_if_absent
+from .config import assume_zero_if_absent, should_persist_grades
+from .models import PersistentSubsectionGrade
 from .scores import compute_percent
-from .subsection_grade import ZeroSubsectionGrade
+from .subsection_grade import SubsectionGradeSummary, ZeroSubsectionGrade
 from .subsection_grade_factory import SubsectionGradeFactory
 
 
@@ -125,6 +126,47 @@ class CourseGradeBase:
             })
         return chapter_grades
 
+    @lazy
+    def chapter_grade_summaries(self):
+        """
+        Returns a list of chapters shaped like customized_chapter_grades,
+        with a SubsectionGradeSummary for each subsection.
+
+        Totals are read from the persisted subsection grades of the user
+        at once, without computing any problem scores. A subsection
+        without a persisted grade was never attempted and is summarized
+        with zero totals.
+        """
+        course_key = self.course_data.course_key
+        persisted_grades = None
+        if should_persist_grades(course_key):
+            persisted_grades = {
+                model.full_usage_key: model
+                for model in PersistentSubsectionGrade.bulk_read_grades(self.user.id, course_key)
+            }
+
+        chapter_grades = []
+        course_structure = self.course_data.structure
+        for chapter_key in course_structure.get_children(self.course_data.location):
+            chapter = course_structure[chapter_key]
+            summaries = []
+            for subsection_key in course_structure.get_children(chapter_key):
+                subsection = course_structure[subsection_key]
+                if persisted_grades is None:
+                    summary = SubsectionGradeSummary.from_grade(subsection, self._get_subsection_grade(subsection))
+                elif subsection_key in persisted_grades:
+                    summary = SubsectionGradeSummary.from_model(subsection, persisted_grades[subsection_key])
+                else:
+                    summary = SubsectionGradeSummary(subsection)
+                summaries.append(summary)
+
+            chapter_grades.append({
+                'display_name': block_metadata_utils.display_name_with_default_escaped(chapter),
+                'url_name': block_metadata_utils.url_name_for_block(chapter),
+                'sections': summaries,
+            })
+        return chapter_grades
+
     @lazy
     def subsection_grades(self):
         """
@@ -204,6 +246,14 @@ class CourseGradeBase:
         grade_summary['grade'] = self.letter_grade
         return grade_summary
 
+    @property
+    def total_summary(self):
+        """
+        Returns the course percent and letter grade only, without running the
+        course's grader like summary does.
+        """
+        return {'percent': self.percent, 'grade': self.letter_grade}
+
     @classmethod
     def get_subsection_type_graders(cls, course):
         """
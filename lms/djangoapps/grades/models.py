@@ -598,6 +598,18 @@ class PersistentCourseGrade(TimeStampedModel):
             cls.objects.filter(user_id__in=[user.id for user in users], course_id=course_id)
         }
 
+    @classmethod
+    def prefetch_for_user(cls, user, course_ids):
+        """
+        Prefetches the grades of the given user in the given courses.
+        """
+        user_grades = dict.fromkeys(course_ids)
+        user_grades.update(
+            (grade.course_id, grade)
+            for grade in cls.objects.filter(user_id=user.id, course_id__in=list(user_grades))
+        )
+        get_cache(cls._CACHE_NAMESPACE)[cls._user_cache_key(user.id)] = user_grades
+
     @classmethod
     def clear_prefetched_data(cls, course_key):
         """
@@ -625,8 +637,16 @@ class PersistentCourseGrade(TimeStampedModel):
                 # assume they have no grade
                 raise cls.DoesNotExist  # lint-amnesty, pylint: disable=raise-missing-from
         except KeyError:
-            # grades were not prefetched for the course, so fetch it
-            return cls.objects.get(user_id=user_id, course_id=course_id)
+            pass
+
+        user_grades = get_cache(cls._CACHE_NAMESPACE).get(cls._user_cache_key(user_id), {})
+        if course_id in user_grades:
+            if user_grades[course_id] is None:
+                raise cls.DoesNotExist
+            return user_grades[course_id]
+
+        # grades were not prefetched for the course nor the user, so fetch it
+        return cls.objects.get(user_id=user_id, course_id=course_id)
 
     @classmethod
     def update_or_create(cls, user_id, course_id, **kwargs):
@@ -662,11 +682,18 @@ class PersistentCourseGrade(TimeStampedModel):
         course_cache = get_cache(cls._CACHE_NAMESPACE).get(cls._cache_key(course_id))
         if course_cache is not None:
             course_cache[user_id] = grade
+        user_cache = get_cache(cls._CACHE_NAMESPACE).get(cls._user_cache_key(user_id))
+        if user_cache is not None and course_id in user_cache:
+            user_cache[course_id] = grade
 
     @classmethod
     def _cache_key(cls, course_id):
         return f"grades_cache.{course_id}"
 
+    @classmethod
+    def _user_cache_key(cls, user_id):
+        return f"grades_cache.user.{user_id}"
+
     @staticmethod
     def _emit_grade_calculated_event(grade):
         events.course_grade_calculated(grade)
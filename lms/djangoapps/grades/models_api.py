@@ -21,6 +21,10 @@ def prefetch_course_grades(course_key, users):
     _PersistentCourseGrade.prefetch(course_key, users)
 
 
+def prefetch_course_grades_for_user(user, course_keys):
+    _PersistentCourseGrade.prefetch_for_user(user, course_keys)
+
+
 def prefetch_course_and_subsection_grades(course_key, users):
     _PersistentCourseGrade.prefetch(course_key, users)
     _PersistentSubsectionGrade.prefetch(course_key, users)
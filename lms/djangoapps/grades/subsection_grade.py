@@ -384,3 +384,50 @@ class CreateSubsectionGrade(NonZeroSubsectionGrade):
             for location, score in
             self.problem_scores.items()
         ]
+
+
+class SubsectionGradeSummary:
+    """
+    Read-only totals of a subsection grade, without problem scores.
+
+    Reports iterating over many learners only need the earned and possible
+    totals of each subsection, so this keeps just those next to the few
+    display attributes of the subsection.
+    """
+    __slots__ = ('location', 'display_name', 'url_name', 'format', 'graded', 'earned', 'possible', 'first_attempted')
+
+    def __init__(self, subsection, earned=0.0, possible=0.0, first_attempted=None):
+        self.location = subsection.location
+        self.display_name = block_metadata_utils.display_name_with_default(subsection)
+        self.url_name = block_metadata_utils.url_name_for_block(subsection)
+        self.format = getattr(subsection, 'format', '')
+        self.graded = getattr(subsection, 'graded', False)
+        self.earned = earned
+        self.possible = possible
+        self.first_attempted = first_attempted
+
+    @property
+    def attempted(self):
+        """
+        Returns whether any problem in this subsection
+        was attempted by the student.
+        """
+        return self.first_attempted is not None
+
+    @classmethod
+    def from_model(cls, subsection, model):
+        """
+        Returns the summary of a persisted subsection grade, overrides applied.
+        """
+        all_total = NonZeroSubsectionGrade._aggregated_score_from_model(  # pylint: disable=protected-access
+            model, is_graded=False,
+        )
+        return cls(subsection, all_total.earned, all_total.possible, all_total.first_attempted)
+
+    @classmethod
+    def from_grade(cls, subsection, subsection_grade):
+        """
+        Returns the summary of a computed subsection grade.
+        """
+        all_total = subsection_grade.all_total
+        return cls(subsection, all_total.earned, all_total.possible, all_total.first_attempted)
@@ -154,3 +154,15 @@ class TestScoreForModule(SharedModuleStoreTestCase):
         earned, possible = self.course_grade.score_for_module(self.m.location)
         assert earned == 0
         assert possible == 0
+
+    def test_chapter_grade_summaries(self):
+        course_grade = CourseGradeFactory().read(self.request.user, self.course)
+        [chapter] = course_grade.chapter_grade_summaries
+        assert chapter['display_name'] == 'a'
+        summaries = {summary.location: summary for summary in chapter['sections']}
+        assert list(summaries) == [self.b.location, self.c.location]
+        for subsection, earned, possible in ((self.b, 6, 14), (self.c, 3, 10)):
+            summary = summaries[subsection.location]
+            assert (summary.earned, summary.possible) == (earned, possible)
+            assert summary.attempted
+        assert not hasattr(summaries[self.b.location], '__dict__')
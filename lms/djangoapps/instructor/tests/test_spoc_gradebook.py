@@ -1,12 +1,15 @@
 """
 Tests of the instructor dashboard spoc gradebook
 """
+from unittest.mock import patch
+
 from django.urls import reverse
 
 from capa.tests.response_xml_factory import StringResponseXMLFactory
 from common.djangoapps.student.tests.factories import AdminFactory, CourseEnrollmentFactory, UserFactory
 from lms.djangoapps.courseware.tests.factories import StudentModuleFactory
-from lms.djangoapps.grades.api import task_compute_all_grades_for_course
+from lms.djangoapps.grades.api import CourseGradeFactory, task_compute_all_grades_for_course
+from lms.djangoapps.instructor.views.gradebook_api import read_grade_book_rows
 from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 
@@ -129,6 +132,10 @@ class TestLetterCutoffPolicy(TestGradebook):
         }
     }
 
+    def test_section_breakdown_columns(self):
+        # The grade book shows a column per entry of the grader's section breakdown.
+        self.assertContains(self.response, '<div class="assignment-label">HW</div>', html=False)
+
     def test_styles(self):
 
         self.assertContains(self.response, "grade_A {color:green;}")
@@ -166,3 +173,39 @@ class TestLetterCutoffPolicy(TestGradebook):
         # User 0 has 0 on the class [1]
         # One use at the top of the page [1]
         assert 3 == self.response.content.count(b'grade_None')
+
+
+class TestUnreadableGrade(TestGradebook):
+    """
+    Tests that learners whose grade cannot be read keep their row, with empty grades.
+    """
+    grading_policy = TestLetterCutoffPolicy.grading_policy
+
+    def setUp(self):
+        read = CourseGradeFactory.read
+
+        def read_grade(factory, user, *args, **kwargs):
+            if user.id == self.users[0].id:
+                raise ValueError("Cannot read grade")
+            return read(factory, user, *args, **kwargs)
+
+        patcher = patch.object(CourseGradeFactory, 'read', autospec=True, side_effect=read_grade)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        super().setUp()
+
+    def test_all_users_listed(self):
+        for user in self.users:
+            assert user.username in str(self.response.content, 'utf-8')
+
+    def test_empty_grades(self):
+        # User 0 has no grade cells left, only the use at the top of the page [1]
+        assert 1 == self.response.content.count(b'grade_None')
+        assert 5 == self.response.content.count(b'grade_A')
+
+    def test_row_per_user(self):
+        rows = read_grade_book_rows(self.course, self.users)
+        assert [row['id'] for row in rows] == [user.id for user in self.users]
+        assert rows[0]['grade_summary'] is None
+        assert rows[0]['courseware_summary'] is None
+        assert all(row['grade_summary'] is not None for row in rows[1:])
@@ -0,0 +1,115 @@
+"""
+Tests for the instructor app helpers.
+"""
+import json
+from unittest.mock import patch
+
+from django.test import override_settings
+from edx_django_utils.cache import TieredCache
+from submissions import api as submissions_api
+
+from common.djangoapps.student.models import anonymous_id_for_user
+from common.djangoapps.student.tests.factories import UserFactory
+from lms.djangoapps.courseware.tests.factories import StudentModuleFactory
+from openedx.core.djangoapps.content.block_structure.api import update_course_in_cache
+from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+from ..utils import (
+    REPORT_LAYOUT_CACHE_KEY,
+    SGAState,
+    check_sga_in_subsection,
+    get_course_report_layout,
+    get_sga_states,
+)
+
+
+class CourseReportLayoutTest(SharedModuleStoreTestCase):
+    """
+    Tests for the cached course report layout.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.course = CourseFactory.create()
+        with cls.store.bulk_operations(cls.course.id, emit_signals=False):
+            chapter = ItemFactory.create(parent=cls.course, category="chapter", display_name="Week 1")
+            cls.homework = ItemFactory.create(
+                parent=chapter, category="sequential", display_name="Homework", metadata={"graded": True},
+            )
+            ItemFactory.create(parent=cls.homework, category="problem")
+            cls.assignment = ItemFactory.create(
+                parent=chapter, category="sequential", display_name="Assignment", metadata={"graded": True},
+            )
+            vertical = ItemFactory.create(parent=cls.assignment, category="vertical")
+            cls.sga_b = ItemFactory.create(parent=vertical, category="edx_sga", display_name="B upload")
+            cls.sga_a = ItemFactory.create(parent=vertical, category="edx_sga", display_name="A upload")
+            cls.lesson = ItemFactory.create(parent=chapter, category="sequential", display_name="Lesson")
+            hidden = ItemFactory.create(parent=cls.course, category="chapter", display_name="hidden")
+            cls.hidden_quiz = ItemFactory.create(
+                parent=hidden, category="sequential", display_name="Quiz", metadata={"graded": True},
+            )
+        update_course_in_cache(cls.course.id)
+
+    def test_layout(self):
+        layout = get_course_report_layout(self.course.id)
+        assert layout.graded_subsections == [self.homework.location, self.assignment.location]
+        assert layout.graded_subsections_without_sga == [self.homework.location]
+        assert layout.sga_blocks == [self.sga_a.location, self.sga_b.location]
+        assert layout.display_name(self.sga_a.location) == "A upload"
+        assert layout.display_name(self.homework.location) == "Homework"
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_layout_cached_for_current_version(self):
+        layout = get_course_report_layout(self.course.id)
+        cache_key = REPORT_LAYOUT_CACHE_KEY.format(course_key=self.course.id, version=layout.version)
+        assert TieredCache.get_cached_response(cache_key).is_found
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_layout_of_outdated_structure_not_cached(self):
+        # The course was published again but its block structure is not updated yet.
+        with patch('lms.djangoapps.instructor.utils._get_course_version', return_value='newer'):
+            layout = get_course_report_layout(self.course.id)
+        assert layout.graded_subsections == [self.homework.location, self.assignment.location]
+        cache_key = REPORT_LAYOUT_CACHE_KEY.format(course_key=self.course.id, version='newer')
+        assert not TieredCache.get_cached_response(cache_key).is_found
+
+    def test_check_sga_in_subsection(self):
+        assert check_sga_in_subsection(self.assignment.location)
+        assert not check_sga_in_subsection(self.homework.location)
+        assert not check_sga_in_subsection(self.hidden_quiz.location)
+
+    def _submit(self, user, block):
+        student_item = {
+            "student_id": anonymous_id_for_user(user, self.course.id),
+            "course_id": str(self.course.id),
+            "item_id": str(block.location),
+            "item_type": "sga",
+        }
+        return submissions_api.create_submission(student_item, {"filename": "answer.pdf"})
+
+    def test_get_sga_states(self):
+        graded, pending, waiting, absent = UserFactory.create_batch(4)
+        submission = self._submit(graded, self.sga_a)
+        submissions_api.set_score(submission["uuid"], 80, 100)
+        self._submit(pending, self.sga_a)
+        StudentModuleFactory.create(
+            student=waiting,
+            course_id=self.course.id,
+            module_state_key=self.sga_b.location,
+            state=json.dumps({"staff_score": 70}),
+        )
+
+        sga_blocks = get_course_report_layout(self.course.id).sga_blocks
+        with self.assertNumQueries(4):
+            states = get_sga_states(
+                self.course.id, [graded.id, pending.id, waiting.id, absent.id], sga_blocks
+            )
+        assert states == {
+            (graded.id, str(self.sga_a.location)): SGAState(True, 80, None),
+            (pending.id, str(self.sga_a.location)): SGAState(True, None, None),
+            (waiting.id, str(self.sga_b.location)): SGAState(False, None, 70),
+        }
+        assert states[(graded.id, str(self.sga_a.location))].graded
+        assert not states[(pending.id, str(self.sga_a.location))].graded
@@ -1,14 +1,30 @@
 """
 Helpers for instructor app.
 """
+import json
 import logging
+from collections import namedtuple
 
+from edx_django_utils.cache import TieredCache
+from submissions.models import ScoreSummary, Submission
+
+from common.djangoapps.student.models import AnonymousUserId
 from lms.djangoapps.courseware.model_data import FieldDataCache
+from lms.djangoapps.courseware.models import StudentModule, chunks
 from lms.djangoapps.courseware.module_render import get_module
+from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
+from openedx.core.lib.cache_utils import request_cached
 from xmodule.modulestore.django import modulestore
 
 log = logging.getLogger(__name__)
 
+SGA_BLOCK_TYPE = "edx_sga"
+SGA_ITEM_TYPE = "sga"
+SGA_STATES_CHUNK_SIZE = 500
+HIDDEN_CHAPTER_NAME = "hidden"
+REPORT_LAYOUT_CACHE_KEY = "instructor.report_layout.{course_key}.{version}"
+REPORT_LAYOUT_CACHE_TIMEOUT = 60 * 60 * 24
+
 
 class DummyRequest:
     """Dummy request"""
@@ -40,23 +56,226 @@ def get_module_for_student(student, usage_key, request=None, course=None):
     return get_module(student, request, usage_key, field_data_cache, course=course)
 
 
-def check_sga_in_subsection(subsection_usage_key, user):
+class CourseReportLayout:
     """
-    Check is there any sga block in given subsection
+    Grading layout of one course version, shared by the gradebook and custom reports.
+
+    It holds the graded subsections of the visible chapters, the subsections
+    containing SGA blocks and the SGA blocks sorted by display name. It only
+    depends on the course content, so it is built once from the collected
+    block structure and cached per published course version.
     """
-    from lms.djangoapps.course_blocks.api import get_course_blocks
-
-    try:
-        subsection_structure = get_course_blocks(user, subsection_usage_key)
-        if any(subsection_structure):
-            for block in subsection_structure:
-                if block.block_type == "edx_sga":
-                    return True
-                    break
-            else:
-                return False
+
+    def __init__(self, course_key, version, graded_subsections, sga_subsections, sga_blocks, display_names):
+        self.course_key = course_key
+        self.version = version
+        self.graded_subsections = graded_subsections
+        self.sga_subsections = sga_subsections
+        self.sga_blocks = sga_blocks
+        self.display_names = display_names
+
+    @classmethod
+    def from_block_structure(cls, course_key, version, block_structure):
+        """
+        Build the layout from a collected block structure.
+        """
+        def display_name(block_key):
+            return block_structure.get_xblock_field(block_key, "display_name") or block_key.block_id
+
+        display_names = {}
+        sga_blocks = [block_key for block_key in block_structure if block_key.block_type == SGA_BLOCK_TYPE]
+        sga_subsections = set()
+        for block_key in sga_blocks:
+            display_names[block_key] = display_name(block_key)
+            sga_subsections.update(_get_subsection_ancestors(block_structure, block_key))
+        sga_blocks.sort(key=lambda block_key: display_names[block_key])
+
+        graded_subsections = []
+        root_key = block_structure.root_block_usage_key
+        for chapter_key in block_structure.get_children(root_key):
+            if block_structure.get_xblock_field(chapter_key, "display_name") == HIDDEN_CHAPTER_NAME:
+                continue
+            for subsection_key in block_structure.get_children(chapter_key):
+                if block_structure.get_xblock_field(subsection_key, "graded", False):
+                    graded_subsections.append(subsection_key)
+                    display_names[subsection_key] = display_name(subsection_key)
+
+        return cls(course_key, version, graded_subsections, sga_subsections, sga_blocks, display_names)
+
+    @property
+    def graded_subsections_without_sga(self):
+        """
+        Graded subsections that do not contain any SGA block, in course order.
+        """
+        return [key for key in self.graded_subsections if key not in self.sga_subsections]
+
+    def contains_sga(self, subsection_key):
+        """
+        Return whether the subsection contains an SGA block.
+        """
+        return subsection_key in self.sga_subsections
+
+    def display_name(self, block_key):
+        """
+        Return the display name of a graded subsection or SGA block.
+        """
+        return self.display_names[block_key]
+
+
+def _get_subsection_ancestors(block_structure, block_key):
+    """
+    Return the sequential blocks among block_key and its ancestors.
+    """
+    subsections = set()
+    visited = set()
+    pending = [block_key]
+    while pending:
+        current_key = pending.pop()
+        if current_key in visited:
+            continue
+        visited.add(current_key)
+        if current_key.block_type == "sequential":
+            subsections.add(current_key)
         else:
-            return False
-    except Exception as err:
-        log.info(str(err))
-        return False
+            pending.extend(block_structure.get_parents(current_key))
+    return subsections
+
+
+@request_cached()
+def _get_course_version(course_key):
+    """
+    Return the version of the published course content.
+    """
+    course = modulestore().get_course(course_key, depth=0)
+    if course is None:
+        return ""
+    return str(getattr(course, "course_version", None) or course.subtree_edited_on)
+
+
+def get_course_report_layout(course_key):
+    """
+    Return the CourseReportLayout of the current published version of the course.
+    """
+    version = _get_course_version(course_key)
+    cache_key = REPORT_LAYOUT_CACHE_KEY.format(course_key=course_key, version=version)
+    cached_response = TieredCache.get_cached_response(cache_key)
+    if cached_response.is_found:
+        return cached_response.value
+
+    block_structure = get_course_in_cache(course_key)
+    layout = CourseReportLayout.from_block_structure(course_key, version, block_structure)
+    root_key = block_structure.root_block_usage_key
+    structure_version = str(
+        block_structure.get_xblock_field(root_key, "course_version")
+        or block_structure.get_xblock_field(root_key, "subtree_edited_on")
+    )
+    if structure_version == version:
+        TieredCache.set_all_tiers(cache_key, layout, REPORT_LAYOUT_CACHE_TIMEOUT)
+    else:
+        # The block structure is not updated for the last publish yet, do
+        # not keep its layout under the key of the new version.
+        log.info("Report layout of %s built from outdated block structure", course_key)
+    return layout
+
+
+def check_sga_in_subsection(subsection_usage_key, user=None):  # pylint: disable=unused-argument
+    """
+    Check is there any sga block in given subsection
+    """
+    layout = get_course_report_layout(subsection_usage_key.course_key)
+    return layout.contains_sga(subsection_usage_key)
+
+
+class SGAState(namedtuple("SGAState", ["uploaded", "score", "staff_score"])):
+    """
+    Submission state of a learner for one SGA block.
+
+    uploaded tells whether the learner has an active submission, score is the
+    latest published score (None until graded) and staff_score the grade
+    entered by staff that is still waiting for approval.
+    """
+
+    __slots__ = ()
+
+    @property
+    def graded(self):
+        return self.score is not None
+
+
+NOT_SUBMITTED_SGA_STATE = SGAState(False, None, None)
+
+
+def get_sga_states(course_key, user_ids, block_keys=None):
+    """
+    Return {(user_id, block_id): SGAState} for the SGA blocks of the course.
+
+    The states are read in bulk from the submissions tables and StudentModule
+    instead of instantiating an SGA XBlock per learner. Pairs without any
+    submission, score or staff grade are left out; use
+    NOT_SUBMITTED_SGA_STATE as the default.
+    """
+    if block_keys is None:
+        block_keys = get_course_report_layout(course_key).sga_blocks
+    if not block_keys or not user_ids:
+        return {}
+
+    states = {}
+    for user_ids_chunk in chunks(list(user_ids), SGA_STATES_CHUNK_SIZE):
+        states.update(_get_submission_states(course_key, user_ids_chunk))
+
+    staff_scores = StudentModule.objects.chunked_filter(
+        "student_id__in",
+        list(user_ids),
+        course_id=course_key,
+        module_state_key__in=block_keys,
+        chunk_size=SGA_STATES_CHUNK_SIZE,
+    )
+    for student_module in staff_scores:
+        staff_score = json.loads(student_module.state or "{}").get("staff_score")
+        if staff_score is None:
+            continue
+        key = (student_module.student_id, str(student_module.module_state_key))
+        states[key] = states.get(key, NOT_SUBMITTED_SGA_STATE)._replace(staff_score=staff_score)
+    return states
+
+
+def _get_submission_states(course_key, user_ids):
+    """
+    Return SGA states of the given users built from the submissions tables.
+    """
+    anonymous_ids = dict(
+        AnonymousUserId.objects.filter(
+            course_id=course_key, user_id__in=user_ids
+        ).values_list("anonymous_user_id", "user_id")
+    )
+    if not anonymous_ids:
+        return {}
+
+    item_filters = {
+        "student_item__course_id": str(course_key),
+        "student_item__item_type": SGA_ITEM_TYPE,
+        "student_item__student_id__in": list(anonymous_ids),
+    }
+    states = {}
+    submitted_items = (
+        Submission.objects.filter(**item_filters)
+        .exclude(status=Submission.DELETED)
+        .values_list("student_item__student_id", "student_item__item_id")
+        .distinct()
+    )
+    for student_id, item_id in submitted_items:
+        states[(anonymous_ids[student_id], item_id)] = NOT_SUBMITTED_SGA_STATE._replace(uploaded=True)
+
+    scores = ScoreSummary.objects.filter(**item_filters).values_list(
+        "student_item__student_id",
+        "student_item__item_id",
+        "latest__points_earned",
+        "latest__points_possible",
+    )
+    for student_id, item_id, points_earned, points_possible in scores:
+        # Reset scores are stored with zero points possible and are hidden.
+        if not points_possible:
+            continue
+        key = (anonymous_ids[student_id], item_id)
+        states[key] = states.get(key, NOT_SUBMITTED_SGA_STATE)._replace(score=points_earned)
+    return states
@@ -7,6 +7,7 @@ Many of these GETs may become PUTs in the future.
 """
 
 import csv
+import itertools
 import json
 import logging
 import string
@@ -134,7 +135,7 @@ from .tools import (
 )
 
 from .. import permissions
-from ..utils import check_sga_in_subsection
+from ..utils import NOT_SUBMITTED_SGA_STATE, get_course_report_layout, get_sga_states
 
 log = logging.getLogger(__name__)
 
@@ -3423,6 +3424,35 @@ def _get_certificate_for_user(course_key, student):
 
 
 
+def _get_sga_submission_messages(course_key, layout, enrollments, not_submitted_msg, format_score):
+    """
+    Return (sga_block_dict, {user_id: {block_id: submission message}}).
+
+    SGA states of all enrolled learners are loaded in bulk instead of
+    instantiating the SGA block for every learner.
+    """
+    sga_block_dict = OrderedDict(
+        (str(block_key), layout.display_name(block_key)) for block_key in layout.sga_blocks
+    )
+    sga_states = get_sga_states(
+        course_key, [enrollment.user_id for enrollment in enrollments], layout.sga_blocks
+    )
+    student_attempts = {}
+    for enrollment in enrollments:
+        student_attempt = dict()
+        for block_id in sga_block_dict:
+            sga_state = sga_states.get((enrollment.user_id, block_id), NOT_SUBMITTED_SGA_STATE)
+            if not sga_state.uploaded:
+                sumbission_msg = not_submitted_msg
+            elif sga_state.score:
+                sumbission_msg = format_score(sga_state.score)
+            else:
+                sumbission_msg = "NG"
+            student_attempt[block_id] = sumbission_msg
+        student_attempts[enrollment.user_id] = student_attempt
+    return sga_block_dict, student_attempts
+
+
 @transaction.non_atomic_requests
 @require_POST
 @ensure_csrf_cookie
@@ -3433,10 +3463,8 @@ def get_sga_report_data(request, course_id):
     """
     Return SGA Report Data
     """
-    from lms.djangoapps.instructor.utils import get_module_for_student
     course_key = CourseKey.from_string(course_id)
-    sga_blocks = modulestore().get_items(course_key, qualifiers={"category": "edx_sga"})
-    sga_blocks.sort(key=lambda x: x.display_name)
+    layout = get_course_report_layout(course_key)
     admin_users = set(
         CourseAccessRole.objects.filter(course_id=course_key).values_list("user")
     )
@@ -3445,23 +3473,15 @@ def get_sga_report_data(request, course_id):
     ).exclude(
         Q(user__is_staff=True) | Q(user__is_superuser=True) | Q(user_id__in=admin_users)
     )
-    enrollments = list(enrollments)
+    enrollments = list(enrollments.select_related("user"))
     enrollments.sort(key=lambda x: x.user.username)
-    sga_block_dict = OrderedDict()
-    students_enrollments = list()
-    for enrollment in enrollments:
-        student_attempt = dict()
-        for block in sga_blocks:
-            sga_block_dict.update({str(block.location): block.display_name})
-            module = get_module_for_student(enrollment.user, block.location)
-            if not module.student_state().get("uploaded", None):
-                sumbission_msg = "NA"
-            elif module.score:
-                sumbission_msg = module.score
-            else:
-                sumbission_msg = "NG"
-            student_attempt.update({str(block.location): sumbission_msg})
-        students_enrollments.append({enrollment.user.username: student_attempt})
+    sga_block_dict, student_attempts = _get_sga_submission_messages(
+        course_key, layout, enrollments, "NA", lambda score: score
+    )
+    students_enrollments = [
+        {enrollment.user.username: student_attempts[enrollment.user_id]}
+        for enrollment in enrollments
+    ]
 
     template = render_to_string(
         "instructor/instructor_dashboard_2/sga_report_data.html",
@@ -3484,12 +3504,9 @@ def get_sga_report(request, course_id):
     Arguments:
         course_id
     """
-    from lms.djangoapps.instructor.utils import get_module_for_student
-
     course_key = CourseKey.from_string(course_id)
 
-    sga_blocks = modulestore().get_items(course_key, qualifiers={"category": "edx_sga"})
-    sga_blocks.sort(key=lambda x: x.display_name)
+    layout = get_course_report_layout(course_key)
     admin_users = set(
         CourseAccessRole.objects.filter(course_id=course_key).values_list("user")
     )
@@ -3498,23 +3515,15 @@ def get_sga_report(request, course_id):
     ).exclude(
         Q(user__is_staff=True) | Q(user__is_superuser=True) | Q(user_id__in=admin_users)
     )
-    enrollments = list(enrollments)
+    enrollments = list(enrollments.select_related("user"))
     enrollments.sort(key=lambda x: x.user.username)
-    sga_block_dict = OrderedDict()
-    students_enrollments = list()
-    for enrollment in enrollments:
-        student_attempt = dict()
-        for block in sga_blocks:
-            sga_block_dict.update({str(block.location): block.display_name})
-            module = get_module_for_student(enrollment.user, block.location)
-            if not module.student_state().get("uploaded", None):
-                sumbission_msg = "NA"
-            elif module.score:
-                sumbission_msg = module.score
-            else:
-                sumbission_msg = "NG"
-            student_attempt.update({str(block.location): sumbission_msg})
-        students_enrollments.append({enrollment.user.username: student_attempt})
+    sga_block_dict, student_attempts = _get_sga_submission_messages(
+        course_key, layout, enrollments, "NA", lambda score: score
+    )
+    students_enrollments = [
+        {enrollment.user.username: student_attempts[enrollment.user_id]}
+        for enrollment in enrollments
+    ]
 
     header_data = [
         "",
@@ -3547,17 +3556,20 @@ def get_gradebook_report(request, course_id):
     Arguments:
         course_id
     """
-    from lms.djangoapps.instructor.views.gradebook_api import get_grade_book_page
-    from lms.djangoapps.instructor.utils import get_module_for_student
-
+    from lms.djangoapps.instructor.views.gradebook_api import iter_grade_book_rows
     course_key = CourseKey.from_string(course_id)
 
     course = get_course_with_access(request.user, "staff", course_key, depth=None)
-    student_info, page = get_grade_book_page(
-        request, course, course_key, skip_admins=True
-    )
-    sga_blocks = modulestore().get_items(course_key, qualifiers={"category": "edx_sga"})
-    sga_blocks.sort(key=lambda x: x.display_name)
+    # Grade book records are read in bulk one page at a time.
+    students = iter_grade_book_rows(course, course_key, skip_admins=True)
+    # Learners whose grade cannot be read have no summaries, the columns are
+    # taken from the first learner that has some.
+    first_students = []
+    for student in students:
+        first_students.append(student)
+        if student["courseware_summary"] is not None:
+            break
+    layout = get_course_report_layout(course_key)
     admin_users = set(
         CourseAccessRole.objects.filter(course_id=course_key).values_list("user")
     )
@@ -3566,56 +3578,51 @@ def get_gradebook_report(request, course_id):
     ).exclude(
         Q(user__is_staff=True) | Q(user__is_superuser=True) | Q(user_id__in=admin_users)
     )
-    sga_block_dict = OrderedDict()
-    students_enrollments = OrderedDict()
-    for enrollment in enrollments:
-        student_attempt = dict()
-        for block in sga_blocks:
-            sga_block_dict.update({str(block.location): block.display_name})
-            module = get_module_for_student(enrollment.user, block.location)
-            if not module.student_state().get("uploaded", None):
-                sumbission_msg = "NS"
-            elif module.score:
-                sumbission_msg = "{0:.0f}%".format(module.score)
-            else:
-                sumbission_msg = "NG"
-            student_attempt.update({str(block.location): sumbission_msg})
-        students_enrollments[enrollment.user.username] = student_attempt
+    enrollments = list(enrollments.select_related("user"))
+    sga_block_dict, student_attempts = _get_sga_submission_messages(
+        course_key, layout, enrollments, "NS", "{0:.0f}%".format
+    )
+    students_enrollments = OrderedDict(
+        (enrollment.user.username, student_attempts[enrollment.user_id])
+        for enrollment in enrollments
+    )
 
     header_data = ["", "Total"]
-    templateSummary = student_info[0]["courseware_summary"]
-    for chapter in templateSummary:
+    templateSummary = first_students[-1]["courseware_summary"] if first_students else None
+    for chapter in templateSummary or []:
         if not chapter["display_name"] == "hidden":
             for section in chapter["sections"]:
-                if section.graded and not check_sga_in_subsection(
-                    section.location, request.user
-                ):
+                if section.graded and not layout.contains_sga(section.location):
                     header_data.append(section.display_name)
+    section_count = len(header_data) - 2
 
     for key, display_name in sga_block_dict.items():
         header_data.append(display_name)
     header_data.append("Status")
 
     row_data = []
-    for student in student_info:
+    students = itertools.chain(first_students, students)
+    for student in students:
         not_attempted = not_graded = False
-        total_score = "{0:.0f}%".format(100 * student["grade_summary"]["percent"])
-        student_info = [student["username"], total_score]
-        for chapter in student["courseware_summary"]:
+        if student["grade_summary"] is None:
+            # Grade could not be read, the total and subsection cells stay empty.
+            student_info = [student["username"], ""] + [""] * section_count
+        else:
+            total_score = "{0:.0f}%".format(100 * student["grade_summary"]["percent"])
+            student_info = [student["username"], total_score]
+        for chapter in student["courseware_summary"] or []:
             if not chapter["display_name"] == "hidden":
                 for section in chapter["sections"]:
-                    if section.graded and not check_sga_in_subsection(
-                        section.location, request.user
-                    ):
-                        earned = section.all_total.earned
-                        total = section.all_total.possible
+                    if section.graded and not layout.contains_sga(section.location):
+                        earned = section.earned
+                        total = section.possible
                         score = (
                             "{0:.0%}".format(float(earned) / total)
                             if earned > 0 and total > 0
                             else 0
                         )
                         student_info.append(score)
-                        if not section._should_persist_per_attempted():
+                        if not section.attempted:
                             not_attempted = True
 
         for key, display_name in sga_block_dict.items():
@@ -3648,47 +3655,37 @@ def get_grade_book_data(request, course_id):
     Return Grade Book Data
     """
     from lms.djangoapps.instructor.views.gradebook_api import get_grade_book_page
-    from lms.djangoapps.instructor.utils import get_module_for_student
-
     course_key = CourseKey.from_string(course_id)
     course = get_course_with_access(request.user, "staff", course_key, depth=None)
     student_info, page = get_grade_book_page(
-        request, course, course_key, skip_admins=True
+        request, course, course_key, skip_admins=True, compact=True
     )
 
-    sga_blocks = modulestore().get_items(course_key, qualifiers={"category": "edx_sga"})
-    sga_blocks.sort(key=lambda x: x.display_name)
-    admin_users = set(
-        CourseAccessRole.objects.filter(course_id=course_key).values_list("user")
-    )
+    layout = get_course_report_layout(course_key)
+    # Only the learners of the current page are shown.
     enrollments = CourseEnrollment.objects.filter(
-        course_id=course_key, is_active=True
-    ).exclude(
-        Q(user__is_staff=True) | Q(user__is_superuser=True) | Q(user_id__in=admin_users)
+        course_id=course_key,
+        is_active=True,
+        user_id__in=[student["id"] for student in student_info],
+    )
+    enrollments = list(enrollments.select_related("user"))
+    sga_block_dict, student_attempts = _get_sga_submission_messages(
+        course_key, layout, enrollments, "NS", "{0:.0f}%".format
+    )
+    students_enrollments = OrderedDict(
+        (enrollment.user.username, student_attempts[enrollment.user_id])
+        for enrollment in enrollments
     )
-    sga_block_dict = OrderedDict()
-    students_enrollments = OrderedDict()
-    for enrollment in enrollments:
-        student_attempt = dict()
-        for block in sga_blocks:
-            sga_block_dict.update({str(block.location): block.display_name})
-            module = get_module_for_student(enrollment.user, block.location)
-            if not module.student_state().get("uploaded", None):
-                sumbission_msg = "NS"
-            elif module.score:
-                sumbission_msg = "{0:.0f}%".format(module.score)
-            else:
-                sumbission_msg = "NG"
-            student_attempt.update({str(block.location): sumbission_msg})
-        students_enrollments[enrollment.user.username] = student_attempt
     template = render_to_string(
         "instructor/instructor_dashboard_2/grade_book_data.html",
         {
+            "page": page,
             "students": student_info,
             "course": course,
             "course_id": course_key,
             "enrollments": students_enrollments,
             "sga_block_dict": sga_block_dict,
+            "layout": layout,
             "ordered_grades": sorted(
                 course.grade_cutoffs.items(), key=lambda i: i[1], reverse=True
             ),
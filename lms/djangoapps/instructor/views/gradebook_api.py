@@ -4,6 +4,7 @@ which is currently use by ccx and instructor apps.
 """
 
 
+import logging
 import math
 import itertools
 
@@ -17,14 +18,23 @@ from common.djangoapps.student.models import CourseAccessRole
 
 from common.djangoapps.edxmako.shortcuts import render_to_response
 from lms.djangoapps.courseware.courses import get_course_with_access
-from lms.djangoapps.grades.api import CourseGradeFactory
+from lms.djangoapps.grades.api import (
+    CourseGradeFactory,
+    clear_prefetched_course_and_subsection_grades,
+    prefetch_course_and_subsection_grades,
+)
 from lms.djangoapps.instructor.views.api import require_course_permission
+from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
 from xmodule.modulestore.django import modulestore
 
 from .. import permissions
 
 # Grade book: max students per page
 MAX_STUDENTS_PER_PAGE_GRADE_BOOK = 20
+# Grade book exports: max students read in bulk at once
+MAX_STUDENTS_PER_BULK_READ = 100
+
+log = logging.getLogger(__name__)
 
 
 def calculate_page_info(offset, total_students):
@@ -69,13 +79,10 @@ def calculate_page_info(offset, total_students):
     }
 
 
-def get_grade_book_page(request, course, course_key, skip_admins=False):
+def get_grade_book_students(course_key, skip_admins=False):
     """
-    Get student records per page along with page information i.e current page, total pages and
-    offset information.
+    Return the queryset of active learners of the course ordered by username.
     """
-    # Unsanitized offset
-    current_offset = request.GET.get('offset', 0)
     enrolled_students = User.objects.filter(
         courseenrollment__course_id=course_key,
         courseenrollment__is_active=1
@@ -89,28 +96,90 @@ def get_grade_book_page(request, course, course_key, skip_admins=False):
             Q(is_superuser=True) |
             Q(id__in=admin_users)
         )
-    total_students = enrolled_students.count()
-    page = calculate_page_info(current_offset, total_students)
-    offset = page["offset"]
-    total_pages = page["total_pages"]
+    return enrolled_students
 
-    if not skip_admins and total_pages > 1:
-        # Apply limit on queryset only if total number of students are greater then MAX_STUDENTS_PER_PAGE_GRADE_BOOK.
-        enrolled_students = enrolled_students[offset: offset + MAX_STUDENTS_PER_PAGE_GRADE_BOOK]
 
-    with modulestore().bulk_operations(course.location.course_key):
-        student_info = list()
-        for student in enrolled_students:
-            course_grade = CourseGradeFactory().read(student, course)
+def read_grade_book_rows(course, students, collected_block_structure=None, compact=False):
+    """
+    Return grade book records of the given students.
+
+    Grades of all students are read in bulk: persisted grades are prefetched
+    once and every student shares the same collected course structure.
+
+    When compact is set, records only hold the course totals and subsection
+    summaries read from persisted grades, without running the course grader,
+    instead of the full grade summary and subsection grades.
+
+    Records of students whose grade cannot be read hold None summaries, so
+    that every given student has a record.
+    """
+    course_key = course.id
+    students = list(students)
+    if collected_block_structure is None:
+        collected_block_structure = get_course_in_cache(course_key)
+    student_info = list()
+    prefetch_course_and_subsection_grades(course_key, students)
+    try:
+        for student, course_grade, error in CourseGradeFactory().iter(
+            students, course=course, collected_block_structure=collected_block_structure
+        ):
+            if error:
+                log.warning("Grade book: cannot read grade of user %s in %s: %s", student.id, course_key, error)
+                grade_summary = courseware_summary = None
+            elif compact:
+                grade_summary = course_grade.total_summary
+                courseware_summary = course_grade.chapter_grade_summaries
+            else:
+                grade_summary = course_grade.summary
+                courseware_summary = course_grade.customized_chapter_grades
             student_info.append(
                 {
                     'username': student.username,
                     'id': student.id,
                     'email': student.email,
-                    'grade_summary': course_grade.summary,
-                    'courseware_summary': course_grade.customized_chapter_grades
+                    'grade_summary': grade_summary,
+                    'courseware_summary': courseware_summary
                 }
             )
+    finally:
+        clear_prefetched_course_and_subsection_grades(course_key)
+    return student_info
+
+
+def iter_grade_book_rows(course, course_key, skip_admins=False):
+    """
+    Yield compact grade book records of all learners of the course, one page at a time.
+    """
+    enrolled_students = get_grade_book_students(course_key, skip_admins)
+    with modulestore().bulk_operations(course.location.course_key):
+        collected_block_structure = get_course_in_cache(course.id)
+        last_username = None
+        while True:
+            page_students = enrolled_students
+            if last_username is not None:
+                page_students = page_students.filter(username__gt=last_username)
+            page_students = list(page_students[:MAX_STUDENTS_PER_BULK_READ])
+            if not page_students:
+                return
+            yield from read_grade_book_rows(course, page_students, collected_block_structure, compact=True)
+            last_username = page_students[-1].username
+
+
+def get_grade_book_page(request, course, course_key, skip_admins=False, compact=False):
+    """
+    Get student records per page along with page information i.e current page, total pages and
+    offset information. See read_grade_book_rows for compact.
+    """
+    # Unsanitized offset
+    current_offset = request.GET.get('offset', request.POST.get('offset', 0))
+    enrolled_students = get_grade_book_students(course_key, skip_admins)
+    total_students = enrolled_students.count()
+    page = calculate_page_info(current_offset, total_students)
+    offset = page["offset"]
+    enrolled_students = enrolled_students[offset: offset + MAX_STUDENTS_PER_PAGE_GRADE_BOOK]
+
+    with modulestore().bulk_operations(course.location.course_key):
+        student_info = read_grade_book_rows(course, enrolled_students, compact=compact)
 
     return student_info, page
 
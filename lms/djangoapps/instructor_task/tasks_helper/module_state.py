@@ -5,25 +5,29 @@ Instructor Tasks related to module state.
 
 import json
 import logging
+from collections import defaultdict
+from itertools import islice
 from time import time
 
+from django.core.cache import cache
 from django.utils.translation import gettext_noop
 from opaque_keys.edx.keys import UsageKey
 from xblock.runtime import KvsFieldData
 from xblock.scorable import Score
 
 from capa.responsetypes import LoncapaProblemError, ResponseError, StudentInputError
-from common.djangoapps.student.models import get_user_by_username_or_email
+from common.djangoapps.student.models import anonymous_id_for_user, get_user_by_username_or_email
 from common.djangoapps.track.event_transaction_utils import create_new_event_transaction_id, set_event_transaction_type
 from common.djangoapps.track.views import task_track
 from common.djangoapps.util.db import outer_atomic
 from lms.djangoapps.courseware.courses import get_problems_in_section
-from lms.djangoapps.courseware.model_data import DjangoKeyValueStore, FieldDataCache
+from lms.djangoapps.courseware.model_data import DjangoKeyValueStore, FieldDataCache, MultiUserFieldDataCache
 from lms.djangoapps.courseware.models import StudentModule
 from lms.djangoapps.courseware.module_render import get_module_for_descriptor_internal
 from lms.djangoapps.grades.api import events as grades_events
 from openedx.core.lib.courses import get_course_by_id
 from xmodule.modulestore.django import modulestore
+from xmodule.util.sandboxing import can_execute_unsafe_code
 
 from ..exceptions import UpdateProblemModuleStateError
 from .runner import TaskProgress
@@ -31,6 +35,11 @@ from .utils import UNKNOWN_TASK_ID, UPDATE_STATUS_FAILED, UPDATE_STATUS_SKIPPED,
 
 TASK_LOG = logging.getLogger('edx.celery.task')
 
+# Number of student modules whose students' field data is read at once for the
+# tasks that instantiate modules. Kept small as the data is read before the
+# modules of the chunk are updated.
+FIELD_DATA_PREFETCH_SIZE = 20
+
 
 def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, task_input, action_name):
     """
@@ -66,6 +75,7 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     entrance_exam_url = task_input.get('entrance_exam_url')
     student_identifier = task_input.get('student')
     override_score_task = action_name == gettext_noop('overridden')
+    rescore_task = action_name == gettext_noop('rescored')
     problems = {}
 
     # if problem_url is present make a usage key from it
@@ -89,12 +99,21 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     task_progress = TaskProgress(action_name, len(modules_to_update), start_time)
     task_progress.update_task_state()
 
-    for module_to_update in modules_to_update:
+    if rescore_task:
+        _preload_problem_scripts(course_id, problems, modules_to_update)
+
+    if rescore_task or override_score_task:
+        modules_and_caches = _iter_with_field_data_caches(course_id, problems, modules_to_update)
+    else:
+        modules_and_caches = ((module_to_update, None) for module_to_update in modules_to_update)
+
+    for module_to_update, field_data_cache in modules_and_caches:
         task_progress.attempted += 1
         module_descriptor = problems[str(module_to_update.module_state_key)]
+        update_kwargs = {} if field_data_cache is None else {'field_data_cache': field_data_cache}
         # There is no try here:  if there's an error, we let it throw, and the task will
         # be marked as FAILED, with a stack trace.
-        update_status = update_fcn(module_descriptor, module_to_update, task_input)
+        update_status = update_fcn(module_descriptor, module_to_update, task_input, **update_kwargs)
         if update_status == UPDATE_STATUS_SUCCEEDED:
             # If the update_fcn returns true, then it performed some kind of work.
             # Logging of failures is left to the update_fcn itself.
@@ -110,10 +129,12 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
 
 
 @outer_atomic
-def rescore_problem_module_state(xmodule_instance_args, module_descriptor, student_module, task_input):
+def rescore_problem_module_state(xmodule_instance_args, module_descriptor, student_module, task_input,
+                                 field_data_cache=None):
     '''
     Takes an XModule descriptor and a corresponding StudentModule object, and
-    performs rescoring on the student's problem submission.
+    performs rescoring on the student's problem submission.  The module is
+    instantiated with `field_data_cache` when given.
 
     Throws exceptions if the rescoring is fatal and should be aborted if in a loop.
     In particular, raises UpdateProblemModuleStateError if module fails to instantiate,
@@ -138,7 +159,8 @@ def rescore_problem_module_state(xmodule_instance_args, module_descriptor, stude
             module_descriptor,
             xmodule_instance_args,
             grade_bucket_type='rescore',
-            course=course
+            course=course,
+            field_data_cache=field_data_cache,
         )
 
         if instance is None:
@@ -208,10 +230,12 @@ def rescore_problem_module_state(xmodule_instance_args, module_descriptor, stude
 
 
 @outer_atomic
-def override_score_module_state(xmodule_instance_args, module_descriptor, student_module, task_input):
+def override_score_module_state(xmodule_instance_args, module_descriptor, student_module, task_input,
+                                field_data_cache=None):
     '''
     Takes an XModule descriptor and a corresponding StudentModule object, and
-    performs an override on the student's problem score.
+    performs an override on the student's problem score.  The module is
+    instantiated with `field_data_cache` when given.
 
     Throws exceptions if the override is fatal and should be aborted if in a loop.
     In particular, raises UpdateProblemModuleStateError if module fails to instantiate,
@@ -234,7 +258,8 @@ def override_score_module_state(xmodule_instance_args, module_descriptor, studen
             student,
             module_descriptor,
             xmodule_instance_args,
-            course=course
+            course=course,
+            field_data_cache=field_data_cache,
         )
 
         if instance is None:
@@ -330,16 +355,19 @@ def delete_problem_module_state(xmodule_instance_args, _module_descriptor, stude
 
 
 def _get_module_instance_for_task(course_id, student, module_descriptor, xmodule_instance_args=None,
-                                  grade_bucket_type=None, course=None):
+                                  grade_bucket_type=None, course=None, field_data_cache=None):
     """
     Fetches a StudentModule instance for a given `course_id`, `student` object, and `module_descriptor`.
 
     `xmodule_instance_args` is used to provide information for creating a track function and an XQueue callback.
     These are passed, along with `grade_bucket_type`, to get_module_for_descriptor_internal, which sidesteps
     the need for a Request object when instantiating an xmodule instance.
+
+    The student's field data is read from `field_data_cache` if given, and from the database otherwise.
     """
     # reconstitute the problem's corresponding XModule:
-    field_data_cache = FieldDataCache.cache_for_descriptor_descendents(course_id, student, module_descriptor)
+    if field_data_cache is None:
+        field_data_cache = FieldDataCache.cache_for_descriptor_descendents(course_id, student, module_descriptor)
     student_data = KvsFieldData(DjangoKeyValueStore(field_data_cache))
 
     # get request-related tracking information from args passthrough, and supplement with task-specific
@@ -375,6 +403,52 @@ def _get_module_instance_for_task(course_id, student, module_descriptor, xmodule
     )
 
 
+def _iter_with_field_data_caches(course_id, problems, student_modules):
+    """
+    Yields each of the student modules with a writable field data cache of its student.
+
+    The field data of the students is read for FIELD_DATA_PREFETCH_SIZE student
+    modules at a time rather than once per student module.
+    """
+    descriptors = list(problems.values())
+    student_modules = iter(student_modules)
+    chunk = list(islice(student_modules, FIELD_DATA_PREFETCH_SIZE))
+    while chunk:
+        students = {student_module.student_id: student_module.student for student_module in chunk}
+        multi_user_cache = MultiUserFieldDataCache(descriptors, course_id, students.values())
+        field_data_caches = {}
+        for student_module in chunk:
+            if student_module.student_id not in field_data_caches:
+                field_data_caches[student_module.student_id] = multi_user_cache.for_user(
+                    students[student_module.student_id], read_only=False,
+                )
+            yield student_module, field_data_caches[student_module.student_id]
+        chunk = list(islice(student_modules, FIELD_DATA_PREFETCH_SIZE))
+
+
+def _preload_problem_scripts(course_id, problems, student_modules):
+    """
+    Runs the script code of the problems to rescore for the seeds and learners of the
+    student modules in batches, so that rescoring each learner finds the problem
+    context in the cache instead of starting a sandbox.
+    """
+    variants = defaultdict(set)
+    for student_module in student_modules:
+        seed = json.loads(student_module.state or '{}').get('seed')
+        if seed is None:
+            continue
+        # Problems get the per-student anonymous id, see get_module_for_descriptor_internal.
+        anonymous_student_id = anonymous_id_for_user(student_module.student, None)
+        variants[str(student_module.module_state_key)].add((seed, anonymous_student_id))
+
+    for usage_key, problem_variants in variants.items():
+        problem = problems[usage_key]
+        if hasattr(problem, 'preload_script_results'):
+            problem.preload_script_results(
+                sorted(problem_variants), cache, unsafely=can_execute_unsafe_code(course_id),
+            )
+
+
 def _get_track_function_for_task(student, xmodule_instance_args=None, source_page='x_module_task'):
     """
     Make a tracking function that logs what happened.
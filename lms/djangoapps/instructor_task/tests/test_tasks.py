@@ -16,6 +16,7 @@ from django.utils.translation import gettext_noop
 from opaque_keys.edx.keys import i4xEncoder
 
 from common.djangoapps.course_modes.models import CourseMode
+from lms.djangoapps.courseware.model_data import MultiUserFieldDataCache
 from lms.djangoapps.courseware.models import StudentModule
 from lms.djangoapps.courseware.tests.factories import StudentModuleFactory
 from lms.djangoapps.instructor_task.exceptions import UpdateProblemModuleStateError
@@ -490,6 +491,33 @@ class TestRescoreInstructorTask(TestInstructorTasks):
             action_name='rescored'
         )
 
+    def test_rescoring_prefetches_field_data(self):
+        """
+        Tests the field data of the students is read at once rather than per student.
+        """
+        mock_instance = MagicMock()
+        mock_instance.has_submitted_answer.return_value = True
+        num_students = 10
+        self._create_students_with_state(num_students)
+        task_entry = self._create_input_entry()
+        module_state = 'lms.djangoapps.instructor_task.tasks_helper.module_state'
+        with patch(f'{module_state}.get_module_for_descriptor_internal', return_value=mock_instance), \
+                patch(f'{module_state}.MultiUserFieldDataCache', wraps=MultiUserFieldDataCache) as mock_cache, \
+                patch(f'{module_state}.FieldDataCache') as mock_field_data_cache:
+            self._run_task_with_mock_celery(rescore_problem, task_entry.id, task_entry.task_id)
+
+        assert mock_cache.call_count == 1
+        assert not mock_field_data_cache.cache_for_descriptor_descendents.called
+        self.assert_task_output(
+            output=self.get_task_output(task_entry.id),
+            total=num_students,
+            attempted=num_students,
+            succeeded=num_students,
+            skipped=0,
+            failed=0,
+            action_name='rescored'
+        )
+
 
 class TestResetAttemptsInstructorTask(TestInstructorTasks):
     """Tests instructor task that resets problem attempts."""
@@ -1085,6 +1085,25 @@ CACHES = {
     },
 }
 
+# .. setting_name: COURSE_STRUCTURE_LOCAL_CACHE
+# .. setting_default: {'MAX_ENTRIES': 32, 'MAX_BYTES': 64 MiB}
+# .. setting_description: Limits of the in-process tier in front of the 'course_structure_cache',
+#   keeping uncompressed split course structures by version. A MAX_BYTES of 0 disables the tier.
+COURSE_STRUCTURE_LOCAL_CACHE = {
+    'MAX_ENTRIES': 32,
+    'MAX_BYTES': 64 * 1024 * 1024,
+}
+
+# .. setting_name: COURSE_ASSETS_DISK_CACHE
+# .. setting_default: {'DIRECTORY': '/tmp/edx-course-assets', 'MAX_BYTES': 2 GiB}
+# .. setting_description: Local directory where the contentserver keeps the data of course assets too
+#   large for the 'course_assets' cache, keyed by content digest, and the most it may hold.
+#   A MAX_BYTES of 0 disables the tier.
+COURSE_ASSETS_DISK_CACHE = {
+    'DIRECTORY': '/tmp/edx-course-assets',
+    'MAX_BYTES': 2 * 1024 * 1024 * 1024,
+}
+
 ############################ OAUTH2 Provider ###################################
 OAUTH_EXPIRE_CONFIDENTIAL_CLIENT_DAYS = 365
 OAUTH_EXPIRE_PUBLIC_CLIENT_DAYS = 30
@@ -2791,6 +2810,18 @@ BLOCK_STRUCTURES_SETTINGS = dict(
     #   https://github.com/edx/edx-platform/pull/17760,
     #   https://openedx.atlassian.net/browse/DEPR-146
     PRUNING_ACTIVE=False,
+
+    # .. setting_name: BLOCK_STRUCTURES_SETTINGS['LOCAL_CACHE_MAX_ENTRIES']
+    # .. setting_default: 32
+    # .. setting_description: Maximum number of collected block structures kept in the in-process
+    #   tier in front of the block structure cache. 0 disables the tier.
+    LOCAL_CACHE_MAX_ENTRIES=32,
+
+    # .. setting_name: BLOCK_STRUCTURES_SETTINGS['LOCAL_CACHE_MAX_BYTES']
+    # .. setting_default: 64 MiB
+    # .. setting_description: Maximum size, in bytes, of the uncompressed block structures kept in
+    #   the in-process tier of each process. 0 disables the tier.
+    LOCAL_CACHE_MAX_BYTES=64 * 1024 * 1024,
 )
 
 ################################ Bulk Email ###################################
@@ -3194,8 +3225,23 @@ INSTALLED_APPS = [
 
     'common.djangoapps.course_manage.apps.CourseManageConfig',
     'common.djangoapps.leaderboard.apps.LeaderboardConfig',
+    'common.djangoapps.custom_reports.apps.CustomReportConfig',
 ]
 
+############################ Leaderboard ###############################
+
+# .. setting_name: LEADERBOARD_WRITE_WINDOW
+# .. setting_default: 10
+# .. setting_description: Length in seconds of the windows in which course grade changes are buffered
+#   in the cache before their LeaderBoard rows are written in bulk. 0 writes every change directly.
+LEADERBOARD_WRITE_WINDOW = 10
+
+# .. setting_name: BATCH_SCORES_ROUTING_KEY
+# .. setting_default: 'edx.lms.core.high'
+# .. setting_description: Queue of the task recomputing batch totals after a course weight or batch
+#   change. It must be consumed by LMS workers, where the custom report caches are invalidated.
+BATCH_SCORES_ROUTING_KEY = 'edx.lms.core.high'
+
 ######################### CSRF #########################################
 
 # Forwards-compatibility with Django 1.7
@@ -339,6 +339,11 @@ FILE_UPLOAD_HANDLERS = [
 
 BLOCK_STRUCTURES_SETTINGS['PRUNING_ACTIVE'] = True
 
+# Tests count cache and modulestore reads, keep the in-process tiers out of the way.
+BLOCK_STRUCTURES_SETTINGS['LOCAL_CACHE_MAX_BYTES'] = 0
+COURSE_STRUCTURE_LOCAL_CACHE = {'MAX_ENTRIES': 0, 'MAX_BYTES': 0}
+COURSE_ASSETS_DISK_CACHE = {'DIRECTORY': None, 'MAX_BYTES': 0}
+
 ########################### Server Ports ###################################
 
 # These ports are carefully chosen so that if the browser needs to
@@ -1018,4 +1018,5 @@ if getattr(settings, 'PROVIDER_STATES_URL', None):
 
 urlpatterns += [
     path('', include('common.djangoapps.custom_reports.urls')),
+    path('', include('common.djangoapps.leaderboard.urls')),
 ]
\ No newline at end of file
@@ -24,6 +24,10 @@ logger = getLogger(__name__)  # pylint: disable=invalid-name
 # A dictionary key value for storing a transformer's version number.
 TRANSFORMER_VERSION_KEY = '_version'
 
+# Names of the root xBlock fields that identify the version of the
+# modulestore data a block structure is collected from.
+VERSION_FIELD_NAMES = ('course_version', 'subtree_edited_on')
+
 
 class _BlockRelations:
     """
@@ -230,6 +234,25 @@ class BlockStructure:
         # Replace this structure's relations with the newly pruned one.
         self._block_relations = pruned_block_relations
 
+    def _set_children(self, parent_key, children):
+        """
+        Replaces the children of the given block in this block structure,
+        adding the block and any new children to the structure.
+
+        Note: Former children that become unreachable are left in the
+        structure until the _prune_unreachable method is called.
+
+        Arguments:
+            parent_key (UsageKey) - Usage key of the parent block.
+            children ([UsageKey]) - Usage keys of the new children.
+        """
+        self._add_block(self._block_relations, parent_key)
+        for child_key in self._block_relations[parent_key].children:
+            self._block_relations[child_key].parents.remove(parent_key)
+        self._block_relations[parent_key].children = []
+        for child_key in children:
+            self._add_relation(parent_key, child_key)
+
     def _add_relation(self, parent_key, child_key):
         """
         Adds a parent to child relationship in this block structure.
@@ -750,6 +773,40 @@ class BlockStructureBlockData(BlockStructure):
             raise TransformerException('Version attributes are not set on transformer {0}.', transformer.name())  # lint-amnesty, pylint: disable=raising-format-tuple
         self.set_transformer_data(transformer, TRANSFORMER_VERSION_KEY, transformer.WRITE_VERSION)
 
+    def _merge_collected(self, block_structure):
+        """
+        Merges the data collected for a part of the blocks of this block
+        structure into it.
+
+        The data of the blocks in the given block structure replaces their
+        data in this one, while the given non-block-specific transformer
+        data is merged over this structure's, key by key. Data of blocks no
+        longer in this structure is dropped.
+
+        Arguments:
+            block_structure (BlockStructureBlockData) - A block structure
+                with data newly collected for some of the blocks of this
+                block structure.
+        """
+        for usage_key in block_structure:
+            self._block_data_map[usage_key] = block_structure._block_data_map.get(usage_key) or BlockData(usage_key)
+
+        for transformer_name, transformer_data in block_structure.transformer_data.items():
+            self.transformer_data.get_or_create(transformer_name).fields.update(transformer_data.fields)
+
+        for usage_key in set(self._block_data_map) - set(self._block_relations):
+            del self._block_data_map[usage_key]
+
+    def _set_version_fields(self, root_xblock):
+        """
+        Sets the version fields of the root block to the values of the
+        given root xBlock.
+        """
+        block_data = self._get_or_create_block(self.root_block_usage_key)
+        for field_name in VERSION_FIELD_NAMES:
+            if hasattr(root_xblock, field_name):
+                setattr(block_data, field_name, getattr(root_xblock, field_name))
+
     def _get_or_create_block(self, usage_key):
         """
         Returns the BlockData associated with the given usage_key.
@@ -840,6 +897,15 @@ class BlockStructureModulestoreData(BlockStructureBlockData):
             for field_name in self._requested_xblock_fields:
                 self._set_xblock_field(block_data, xblock, field_name)
 
+    def _collect_version_fields(self):
+        """
+        Collects the version fields of the root xBlock, identifying the
+        modulestore data this block structure is collected from.
+        """
+        root_xblock = self._xblock_map.get(self.root_block_usage_key)
+        if root_xblock is not None:
+            self._set_version_fields(root_xblock)
+
     def _set_xblock_field(self, block_data, xblock, field_name):
         """
         Updates the given block's xBlock fields data with the xBlock
@@ -66,6 +66,20 @@ RAISE_ERROR_WHEN_NOT_FOUND = WaffleSwitch(
     "block_structure.raise_error_when_not_found", __name__
 )
 
+# .. toggle_name: block_structure.incremental_collect
+# .. toggle_implementation: WaffleSwitch
+# .. toggle_default: False
+# .. toggle_description: When enabled, updating the block structure of a course after a publish
+#   only re-collects the blocks that changed since the stored block structure was collected, along
+#   with their descendants and ancestors, and merges them into the stored data. A full collect is
+#   still run when any registered transformer does not support incremental collects, when the
+#   course is not in a versioned (split) modulestore, or when most of the course changed.
+# .. toggle_use_cases: opt_in
+# .. toggle_creation_date: 2026-10-17
+INCREMENTAL_COLLECT = WaffleSwitch(
+    "block_structure.incremental_collect", __name__
+)
+
 
 def enable_storage_backing_for_cache_in_request():
     """
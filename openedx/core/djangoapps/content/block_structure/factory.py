@@ -32,31 +32,76 @@ class BlockStructureFactory:
                 root_block_usage_key is not found in the modulestore.
         """
         block_structure = BlockStructureModulestoreData(root_block_usage_key)
-        blocks_visited = set()
-
-        def build_block_structure(xblock):
-            """
-            Recursively update the block structure with the given xBlock
-            and its descendants.
-            """
-            # Check if the xblock was already visited (can happen in
-            # DAGs).
-            if xblock.location in blocks_visited:
-                return
-
-            # Add the xBlock.
-            blocks_visited.add(xblock.location)
-            block_structure._add_xblock(xblock.location, xblock)  # pylint: disable=protected-access
-
-            # Add relations with its children and recurse.
-            for child in xblock.get_children():
-                block_structure._add_relation(xblock.location, child.location)  # pylint: disable=protected-access
-                build_block_structure(child)
-
         root_xblock = modulestore.get_item(root_block_usage_key, depth=None, lazy=False)
-        build_block_structure(root_xblock)
+        cls._add_subtree(block_structure, root_xblock, set())
         return block_structure
 
+    @classmethod
+    def create_partial_from_modulestore(cls, block_structure, subtree_keys, modulestore):
+        """
+        Creates and returns a block structure from the modulestore with
+        the subtrees starting at the given subtree_keys and all of their
+        ancestors only.
+
+        Arguments:
+            block_structure (BlockStructure) - A block structure with
+                the current relations of the ancestors of the subtrees.
+
+            subtree_keys ([UsageKey]) - Usage keys of the roots of the
+                subtrees, none of which may be in another one's subtree.
+
+            modulestore (ModuleStoreRead) - The modulestore that
+                contains the data for the xBlocks.
+
+        Returns:
+            BlockStructureModulestoreData - The created block structure,
+                starting at the root of the given block_structure.
+        """
+        partial_structure = BlockStructureModulestoreData(block_structure.root_block_usage_key)
+
+        ancestor_keys = set()
+        pending_keys = list(subtree_keys)
+        while pending_keys:
+            for parent_key in block_structure.get_parents(pending_keys.pop()):
+                if parent_key not in ancestor_keys:
+                    ancestor_keys.add(parent_key)
+                    pending_keys.append(parent_key)
+
+        included_keys = ancestor_keys.union(subtree_keys)
+        for block_key in block_structure.topological_traversal(
+                filter_func=lambda block_key: block_key in ancestor_keys,
+        ):
+            partial_structure._add_xblock(block_key, modulestore.get_item(block_key))  # pylint: disable=protected-access
+            for child_key in block_structure.get_children(block_key):
+                if child_key in included_keys:
+                    partial_structure._add_relation(block_key, child_key)  # pylint: disable=protected-access
+
+        blocks_visited = set(ancestor_keys)
+        for subtree_key in subtree_keys:
+            subtree_xblock = modulestore.get_item(subtree_key, depth=None, lazy=False)
+            cls._add_subtree(partial_structure, subtree_xblock, blocks_visited)
+        return partial_structure
+
+    @classmethod
+    def _add_subtree(cls, block_structure, xblock, blocks_visited):
+        """
+        Recursively updates the block structure with the given xBlock
+        and its descendants, skipping blocks_visited.
+        """
+        # Check if the xblock was already visited (can happen in
+        # DAGs).
+        if xblock.location in blocks_visited:
+            return
+
+        # Add the xBlock.
+        blocks_visited.add(xblock.location)
+        block_structure._add_xblock(xblock.location, xblock)  # pylint: disable=protected-access
+
+        # Add relations with its children and recurse.
+        for child in xblock.get_children():
+            block_structure._add_relation(xblock.location, child.location)  # pylint: disable=protected-access
+            cls._add_subtree(block_structure, child, blocks_visited)
+
     @classmethod
     def create_from_store(cls, root_block_usage_key, block_structure_store):
         """
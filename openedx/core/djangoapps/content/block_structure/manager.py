@@ -5,6 +5,7 @@ BlockStructures.
 
 
 from contextlib import contextmanager
+from logging import getLogger
 
 from . import config
 from .exceptions import BlockStructureNotFound, TransformerDataIncompatible, UsageKeyNotInBlockStructure
@@ -12,6 +13,12 @@ from .factory import BlockStructureFactory
 from .store import BlockStructureStore
 from .transformers import BlockStructureTransformers
 
+logger = getLogger(__name__)  # pylint: disable=C0103
+
+# Above this share of changed blocks, a full collect is run instead of an
+# incremental one.
+MAX_INCREMENTAL_COLLECT_CHANGED_RATIO = 0.5
+
 
 class BlockStructureManager:
     """
@@ -121,14 +128,87 @@ class BlockStructureManager:
         the modulestore.
         """
         with self._bulk_operations():
-            block_structure = BlockStructureFactory.create_from_modulestore(
-                self.root_block_usage_key,
-                self.modulestore,
-            )
-            BlockStructureTransformers.collect(block_structure)
+            block_structure = None
+            if config.INCREMENTAL_COLLECT.is_enabled():
+                block_structure = self._collect_incrementally()
+            if block_structure is None:
+                block_structure = BlockStructureFactory.create_from_modulestore(
+                    self.root_block_usage_key,
+                    self.modulestore,
+                )
+                BlockStructureTransformers.collect(block_structure)
             self.store.add(block_structure)
             return block_structure
 
+    def _collect_incrementally(self):
+        """
+        Returns the block structure in the store, updated with data newly
+        collected for the blocks that changed in the modulestore since it
+        was collected, along with their descendants and ancestors.
+
+        Returns None when a full collect is needed instead: the stored
+        block structure is missing, a registered transformer does not
+        support an incremental collect, the modulestore cannot tell which
+        blocks changed, or too many of them did.
+        """
+        try:
+            block_structure = self.store.get(self.root_block_usage_key)
+        except BlockStructureNotFound:
+            return None
+        if not BlockStructureTransformers.supports_incremental_collect(block_structure):
+            return None
+
+        collected_version = block_structure.get_xblock_field(self.root_block_usage_key, 'course_version')
+        if collected_version is None:
+            return None
+        try:
+            changed_keys = self.modulestore.get_blocks_changed_since(
+                self.root_block_usage_key.course_key, collected_version,
+            )
+        except NotImplementedError:
+            return None
+        if changed_keys is None or len(changed_keys) > len(block_structure) * MAX_INCREMENTAL_COLLECT_CHANGED_RATIO:
+            return None
+
+        # Update the relations of the stored structure to the current ones.
+        for usage_key in changed_keys:
+            block_structure._set_children(usage_key, self.modulestore.get_item(usage_key).children)  # pylint: disable=protected-access
+        block_structure._prune_unreachable()  # pylint: disable=protected-access
+
+        changed_keys = {usage_key for usage_key in changed_keys if usage_key in block_structure}
+        descendant_keys = set()
+        pending_keys = list(changed_keys)
+        while pending_keys:
+            for child_key in block_structure.get_children(pending_keys.pop()):
+                if child_key not in descendant_keys:
+                    descendant_keys.add(child_key)
+                    pending_keys.append(child_key)
+
+        subtree_keys = changed_keys.difference(descendant_keys)
+        if not subtree_keys:
+            # Only blocks outside the course tree changed, so nothing needs
+            # collecting but the version of the root block.
+            block_structure._set_version_fields(self.modulestore.get_item(self.root_block_usage_key))  # pylint: disable=protected-access
+            return block_structure
+
+        # A block shared with unchanged parts of the course (in a DAG) would
+        # be collected without all of its parents.
+        included_keys = subtree_keys | descendant_keys
+        for usage_key in descendant_keys:
+            if not included_keys.issuperset(block_structure.get_parents(usage_key)):
+                return None
+
+        partial_structure = BlockStructureFactory.create_partial_from_modulestore(
+            block_structure, subtree_keys, self.modulestore,
+        )
+        BlockStructureTransformers.collect(partial_structure)
+        block_structure._merge_collected(partial_structure)  # pylint: disable=protected-access
+        logger.info(
+            "BlockStructure: Incrementally collected %d of %d blocks; %s.",
+            len(partial_structure), len(block_structure), self.root_block_usage_key,
+        )
+        return block_structure
+
     def clear(self):
         """
         Removes data for the block structure associated with the given
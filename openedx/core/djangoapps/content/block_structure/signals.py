@@ -8,11 +8,12 @@ from django.conf import settings
 from django.dispatch.dispatcher import receiver
 from opaque_keys.edx.locator import LibraryLocator
 
-from xmodule.modulestore.django import SignalHandler
+from xmodule.modulestore.django import SignalHandler, modulestore
 
 from . import config
 from .api import clear_course_from_cache
 from .models import BlockStructureNotFound
+from .store import clear_local_cache
 from .tasks import update_course_in_cache_v2
 
 log = logging.getLogger(__name__)
@@ -28,6 +29,9 @@ def update_block_structure_on_course_publish(sender, course_key, **kwargs):  # p
     if isinstance(course_key, LibraryLocator):
         return
 
+    # Block structures kept in this process are outdated now.
+    clear_local_cache(modulestore().make_course_usage_key(course_key))
+
     if config.INVALIDATE_CACHE_ON_PUBLISH.is_enabled():
         try:
             clear_course_from_cache(course_key)
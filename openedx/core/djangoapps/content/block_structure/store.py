@@ -4,10 +4,14 @@ Module for the Storage of BlockStructure objects.
 # pylint: disable=protected-access
 
 
+import pickle
+import zlib
 from logging import getLogger
+from uuid import uuid4
 
+from django.conf import settings
 
-from openedx.core.lib.cache_utils import zpickle, zunpickle
+from openedx.core.lib.cache_utils import LocalLRUCache, process_cached, zpickle
 
 from . import config
 from .block_structure import BlockStructureBlockData
@@ -19,6 +23,29 @@ from .transformer_registry import TransformerRegistry
 logger = getLogger(__name__)  # pylint: disable=C0103
 
 
+@process_cached
+def get_local_cache():
+    """
+    Returns the in-process tier in front of the block structure cache.
+
+    It holds the uncompressed serialized data of recently read block
+    structures, so hot courses are neither fetched nor decompressed again.
+    """
+    return LocalLRUCache(
+        'block_structure_local_cache',
+        max_entries=settings.BLOCK_STRUCTURES_SETTINGS.get('LOCAL_CACHE_MAX_ENTRIES', 0),
+        max_bytes=settings.BLOCK_STRUCTURES_SETTINGS.get('LOCAL_CACHE_MAX_BYTES', 0),
+    )
+
+
+def clear_local_cache(root_block_usage_key):
+    """
+    Removes the block structures of the given root from the local tier.
+    """
+    root_usage_key = str(root_block_usage_key)
+    get_local_cache().delete_matching(lambda cache_key: root_usage_key in cache_key)
+
+
 class StubModel:
     """
     Stub model to use when storage backing is disabled.
@@ -69,6 +96,8 @@ class BlockStructureStore:
 
         bs_model = self._update_or_create_model(block_structure, serialized_data)
         self._add_to_cache(serialized_data, bs_model)
+        self._change_local_version(bs_model)
+        clear_local_cache(block_structure.root_block_usage_key)
 
     def get(self, root_block_usage_key):
         """
@@ -92,14 +121,28 @@ class BlockStructureStore:
             found.
         """
         bs_model = self._get_model(root_block_usage_key)
+        local_cache = get_local_cache()
+        # Read before the shared data, so that data of an older version is
+        # never kept under the key of a newer one.
+        local_cache_key = self._get_local_cache_key(bs_model) if local_cache.enabled else None
+
+        pickled_data = local_cache.get(local_cache_key) if local_cache_key else None
+        if pickled_data is None:
+            try:
+                serialized_data = self._get_from_cache(bs_model)
+            except BlockStructureNotFound:
+                serialized_data = self._get_from_store(bs_model)
+                self._add_to_cache(serialized_data, bs_model)
+            pickled_data = self._decompress(serialized_data, root_block_usage_key)
+            if local_cache_key:
+                local_cache.set(local_cache_key, pickled_data, len(pickled_data))
 
         try:
-            serialized_data = self._get_from_cache(bs_model)
+            return self._deserialize(pickled_data, root_block_usage_key)
         except BlockStructureNotFound:
-            serialized_data = self._get_from_store(bs_model)
-            self._add_to_cache(serialized_data, bs_model)
-
-        return self._deserialize(serialized_data, root_block_usage_key)
+            if local_cache_key:
+                local_cache.delete(local_cache_key)
+            raise
 
     def delete(self, root_block_usage_key):
         """
@@ -112,6 +155,8 @@ class BlockStructureStore:
         """
         bs_model = self._get_model(root_block_usage_key)
         self._cache.delete(self._encode_root_cache_key(bs_model))
+        self._change_local_version(bs_model)
+        clear_local_cache(root_block_usage_key)
         bs_model.delete()
         logger.info("BlockStructure: Deleted from cache and store; %s.", bs_model)
 
@@ -202,13 +247,25 @@ class BlockStructureStore:
         )
         return zpickle(data_to_cache)
 
-    def _deserialize(self, serialized_data, root_block_usage_key):
+    def _decompress(self, serialized_data, root_block_usage_key):
+        """
+        Decompresses the given serialized data into its pickled form.
+        """
+        try:
+            return zlib.decompress(serialized_data)
+        except zlib.error:
+            # Somehow failed to decompress the data, assume it's corrupt.
+            bs_model = self._get_model(root_block_usage_key)
+            logger.exception("BlockStructure: Failed to load data from cache for %s", bs_model)
+            raise BlockStructureNotFound(bs_model.data_usage_key)  # lint-amnesty, pylint: disable=raise-missing-from
+
+    def _deserialize(self, pickled_data, root_block_usage_key):
         """
-        Deserializes the given data and returns the parsed block_structure.
+        Deserializes the given pickled data and returns the parsed block_structure.
         """
 
         try:
-            block_relations, transformer_data, block_data_map = zunpickle(serialized_data)
+            block_relations, transformer_data, block_data_map = pickle.loads(pickled_data, encoding='latin1')
         except Exception:
             # Somehow failed to de-serialized the data, assume it's corrupt.
             bs_model = self._get_model(root_block_usage_key)
@@ -222,6 +279,48 @@ class BlockStructureStore:
             block_data_map,
         )
 
+    def _get_local_cache_key(self, bs_model):
+        """
+        Returns the key of the block structure in the local tier.
+
+        With storage backing, cache keys include the version of the structure.
+        Otherwise the key includes the local version token of the structure
+        in the shared cache, which changes whenever any process adds or
+        deletes the structure, so a publish made in another process is
+        noticed on the next read.
+        """
+        cache_key = self._encode_root_cache_key(bs_model)
+        if config.STORAGE_BACKING_FOR_CACHE.is_enabled():
+            return cache_key
+        local_version = self._cache.get(self._encode_local_version_cache_key(bs_model))
+        if local_version is None:
+            local_version = self._change_local_version(bs_model)
+        return f'{cache_key}.{local_version}'
+
+    def _change_local_version(self, bs_model):
+        """
+        Changes the local version token of the block structure, so that no
+        process serves the data it holds in its local tier anymore. Returns
+        the new token.
+        """
+        if config.STORAGE_BACKING_FOR_CACHE.is_enabled():
+            return None
+        local_version = uuid4().hex
+        self._cache.set(
+            self._encode_local_version_cache_key(bs_model),
+            local_version,
+            timeout=config.cache_timeout_in_seconds(),
+        )
+        return local_version
+
+    @classmethod
+    def _encode_local_version_cache_key(cls, bs_model):
+        """
+        Returns the cache key of the local version token of the
+        given StubModel.
+        """
+        return f'{cls._encode_root_cache_key(bs_model)}.local_version'
+
     @staticmethod
     def _encode_root_cache_key(bs_model):
         """
@@ -79,6 +79,7 @@ class MockModulestore:
     def __init__(self):
         self.get_items_call_count = 0
         self.blocks = None
+        self.changed_blocks = None
 
     def set_blocks(self, blocks):
         """
@@ -103,6 +104,16 @@ class MockModulestore:
             raise ItemNotFoundError
         return item
 
+    def get_blocks_changed_since(self, course_key, version_guid):  # pylint: disable=unused-argument
+        """
+        Returns the keys in changed_blocks.
+
+        Raises NotImplementedError if changed_blocks is not set.
+        """
+        if self.changed_blocks is None:
+            raise NotImplementedError
+        return self.changed_blocks
+
     @contextmanager
     def bulk_operations(self, ignore):  # pylint: disable=unused-argument
         """
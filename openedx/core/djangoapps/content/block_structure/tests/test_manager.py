@@ -8,7 +8,7 @@ from django.test import TestCase
 from edx_toggles.toggles.testutils import override_waffle_switch
 
 from ..block_structure import BlockStructureBlockData
-from ..config import RAISE_ERROR_WHEN_NOT_FOUND, STORAGE_BACKING_FOR_CACHE
+from ..config import INCREMENTAL_COLLECT, RAISE_ERROR_WHEN_NOT_FOUND, STORAGE_BACKING_FOR_CACHE
 from ..exceptions import BlockStructureNotFound, UsageKeyNotInBlockStructure
 from ..manager import BlockStructureManager
 from ..transformers import BlockStructureTransformers
@@ -94,6 +94,20 @@ class TestTransformer1(MockTransformer):
         return data_key + 't1.val1.' + str(block_key)
 
 
+class IncrementalTestTransformer(TestTransformer1):
+    """
+    Test Transformer class supporting incremental collects, which records
+    the blocks it collected data for.
+    """
+    SUPPORTS_INCREMENTAL_COLLECT = True
+    collected_blocks = []
+
+    @classmethod
+    def collect(cls, block_structure):
+        super().collect(block_structure)
+        cls.collected_blocks = list(block_structure.topological_traversal())
+
+
 @ddt.ddt
 class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
     """
@@ -128,7 +142,8 @@ class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, Test
             assert self.modulestore.get_items_call_count > 0
         else:
             assert self.modulestore.get_items_call_count == 0
-        expected_count = 1 if expect_cache_updated else 0
+        # The structure and the version of its local tier entries.
+        expected_count = 2 if expect_cache_updated else 0
         assert self.cache.set_call_count == expected_count
 
     def test_get_transformed(self):
@@ -226,3 +241,79 @@ class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, Test
         self.bs_manager.clear()
         self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
         assert TestTransformer1.collect_call_count == 2
+
+    def _publish_changes(self, children_map, changed_blocks):
+        """
+        Replaces the modulestore of the manager with one holding the given
+        children_map, reporting the given blocks as changed.
+        """
+        self.children_map = children_map
+        self.modulestore = MockModulestoreFactory.create(children_map, self.block_key_factory)
+        self.modulestore.blocks[self.block_key_factory(0)].field_map['course_version'] = 'v2'
+        self.modulestore.changed_blocks = [self.block_key_factory(block) for block in changed_blocks]
+        self.bs_manager.modulestore = self.modulestore
+
+    @ddt.data(
+        (IncrementalTestTransformer, [0, 2, 5]),
+        (TestTransformer1, [0, 1, 2, 3, 4, 5]),
+    )
+    @ddt.unpack
+    def test_update_collected_incrementally(self, transformer, expected_collected_blocks):
+        self.registered_transformers = [transformer()]
+        self.modulestore.blocks[self.block_key_factory(0)].field_map['course_version'] = 'v1'
+        with override_waffle_switch(INCREMENTAL_COLLECT, active=True):
+            with mock_registered_transformers(self.registered_transformers):
+                self.bs_manager.update_collected_if_needed()
+
+                # block 5 is added to block 2, so blocks 2 and 5 changed.
+                self._publish_changes([[1, 2], [3, 4], [5], [], [], []], changed_blocks=[2, 5])
+                self.bs_manager.update_collected_if_needed()
+                block_structure = self.bs_manager.get_collected()
+
+        if transformer is IncrementalTestTransformer:
+            assert set(IncrementalTestTransformer.collected_blocks) == {
+                self.block_key_factory(block) for block in expected_collected_blocks
+            }
+        self.assert_block_structure(block_structure, self.children_map)
+        transformer.assert_collected(block_structure)
+        assert block_structure.get_xblock_field(self.block_key_factory(0), 'course_version') == 'v2'
+
+    def test_update_collected_incrementally_removed_block(self):
+        self.registered_transformers = [IncrementalTestTransformer()]
+        self.modulestore.blocks[self.block_key_factory(0)].field_map['course_version'] = 'v1'
+        with override_waffle_switch(INCREMENTAL_COLLECT, active=True):
+            with mock_registered_transformers(self.registered_transformers):
+                self.bs_manager.update_collected_if_needed()
+
+                # block 4 is removed from block 1.
+                self._publish_changes([[1, 2], [3], [], []], changed_blocks=[1])
+                self.bs_manager.update_collected_if_needed()
+                block_structure = self.bs_manager.get_collected()
+
+        assert set(IncrementalTestTransformer.collected_blocks) == {
+            self.block_key_factory(block) for block in [0, 1, 3]
+        }
+        self.assert_block_structure(block_structure, self.children_map)
+        assert self.block_key_factory(4) not in block_structure
+        with pytest.raises(KeyError):
+            block_structure[self.block_key_factory(4)]  # pylint: disable=pointless-statement
+
+    def test_update_collected_incrementally_unchanged_blocks(self):
+        self.registered_transformers = [IncrementalTestTransformer()]
+        self.modulestore.blocks[self.block_key_factory(0)].field_map['course_version'] = 'v1'
+        with override_waffle_switch(INCREMENTAL_COLLECT, active=True):
+            with override_waffle_switch(STORAGE_BACKING_FOR_CACHE, active=True):
+                with mock_registered_transformers(self.registered_transformers):
+                    self.bs_manager.update_collected_if_needed()
+
+                    # The course is republished without any block changes.
+                    IncrementalTestTransformer.collected_blocks = []
+                    self._publish_changes(self.children_map, changed_blocks=[])
+                    self.bs_manager.update_collected_if_needed()
+                    block_structure = self.bs_manager.get_collected()
+
+                    assert self.bs_manager.store.is_up_to_date(self.block_key_factory(0), self.modulestore)
+
+        assert IncrementalTestTransformer.collected_blocks == []
+        self.assert_block_structure(block_structure, self.children_map)
+        assert block_structure.get_xblock_field(self.block_key_factory(0), 'course_version') == 'v2'
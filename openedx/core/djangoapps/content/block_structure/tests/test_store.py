@@ -1,12 +1,14 @@
 """
 Tests for block_structure/cache.py
 """
+from unittest.mock import patch
 
 import pytest
 import ddt
 from edx_toggles.toggles.testutils import override_waffle_switch
 
 from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
+from openedx.core.lib.cache_utils import LocalLRUCache
 
 from ..config import STORAGE_BACKING_FOR_CACHE
 from ..config.models import BlockStructureConfiguration
@@ -91,3 +93,35 @@ class TestBlockStructureStore(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheI
         assert self.mock_cache.timeout_from_last_call == 0
         self.store.add(self.block_structure)
         assert self.mock_cache.timeout_from_last_call == timeout
+
+    def test_local_tier_notices_publish_in_other_process(self):
+        local_cache = LocalLRUCache('test', max_entries=10, max_bytes=10 ** 7)
+        root_block_usage_key = self.block_structure.root_block_usage_key
+        with patch('openedx.core.djangoapps.content.block_structure.store.get_local_cache', return_value=local_cache):
+            self.store.add(self.block_structure)
+            self.store.get(root_block_usage_key)
+            self.assert_block_structure(self.store.get(root_block_usage_key), self.children_map)
+            assert local_cache.hits == 1
+
+            # Another process leaves the local tier of this one untouched.
+            with patch('openedx.core.djangoapps.content.block_structure.store.clear_local_cache'):
+                self.store.add(self.create_block_structure(self.LINEAR_CHILDREN_MAP))
+            self.assert_block_structure(self.store.get(root_block_usage_key), self.LINEAR_CHILDREN_MAP)
+            assert local_cache.hits == 1
+
+            with patch('openedx.core.djangoapps.content.block_structure.store.clear_local_cache'):
+                self.store.delete(root_block_usage_key)
+            with pytest.raises(BlockStructureNotFound):
+                self.store.get(root_block_usage_key)
+
+    def test_local_tier_without_version(self):
+        local_cache = LocalLRUCache('test', max_entries=10, max_bytes=10 ** 7)
+        root_block_usage_key = self.block_structure.root_block_usage_key
+        with patch('openedx.core.djangoapps.content.block_structure.store.get_local_cache', return_value=local_cache):
+            self.store.add(self.block_structure)
+            # The version expired from the shared cache before the structure.
+            for key in [key for key in self.mock_cache.map if key.endswith('.local_version')]:
+                self.mock_cache.delete(key)
+            self.store.get(root_block_usage_key)
+            self.assert_block_structure(self.store.get(root_block_usage_key), self.children_map)
+            assert local_cache.hits == 1
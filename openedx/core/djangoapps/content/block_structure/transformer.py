@@ -58,6 +58,24 @@ class BlockStructureTransformer:
     WRITE_VERSION = 0
     READ_VERSION = 0
 
+    # Whether the transformer's collect may be run on a partial block
+    # structure, made of the blocks that changed in the modulestore since
+    # the last collect, their descendants and their ancestors, with its
+    # results merged into the previously collected data. See
+    # BlockStructureManager.
+    #
+    # This holds when the data collected for a block only depends on the
+    # block itself, its ancestors and the root block, as with data that is
+    # percolated down the hierarchy. Transformer data that is not specific
+    # to a block and is set by a partial collect is merged over the
+    # previously collected one, key by key.
+    #
+    # Transformers that compute a block's data from its descendants or
+    # from unrelated blocks must leave this False; a full collect is then
+    # run whenever the course changes.
+    #
+    SUPPORTS_INCREMENTAL_COLLECT = False
+
     @classmethod
     def name(cls):
         """
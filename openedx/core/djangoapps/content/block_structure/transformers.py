@@ -79,6 +79,23 @@ class BlockStructureTransformers:
 
         # Collect all fields that were requested by the transformers.
         block_structure._collect_requested_xblock_fields()  # pylint: disable=protected-access
+        block_structure._collect_version_fields()  # pylint: disable=protected-access
+
+    @classmethod
+    def supports_incremental_collect(cls, block_structure):
+        """
+        Returns whether the collected data in the block structure can be
+        updated by collecting data for part of its blocks only.
+
+        That is the case when all registered Transformers support an
+        incremental collect and the data was collected by their current
+        versions.
+        """
+        return all(
+            transformer.SUPPORTS_INCREMENTAL_COLLECT and
+            block_structure._get_transformer_data_version(transformer) == transformer.WRITE_VERSION  # pylint: disable=protected-access
+            for transformer in TransformerRegistry.get_registered_transformers()
+        )
 
     @classmethod
     def verify_versions(cls, block_structure):
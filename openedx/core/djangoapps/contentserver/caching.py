@@ -1,11 +1,20 @@
 """
 Helper functions for caching course assets.
 """
+import logging
+import os
+import re
+import tempfile
+
+from django.conf import settings
 from django.core.cache import caches
 from django.core.cache.backends.base import InvalidCacheBackendError
 from opaque_keys import InvalidKeyError
 
-from xmodule.contentstore.content import STATIC_CONTENT_VERSION
+from common.djangoapps.static_replace import invalidate_static_url_table
+from xmodule.contentstore.content import STATIC_CONTENT_VERSION, StaticContent
+
+log = logging.getLogger(__name__)
 
 # See if there's a "course_assets" cache configured, and if not, fallback to the default cache.
 CONTENT_CACHE = caches['default']
@@ -15,6 +24,9 @@ except InvalidCacheBackendError:
     pass
 
 
+CONTENT_DIGEST_PATTERN = re.compile(r'^[0-9a-f]{32,128}$')
+
+
 def set_cached_content(content):
     """
     Stores the given piece of content in the cache, using its location as the key.
@@ -29,6 +41,22 @@ def get_cached_content(location):
     return CONTENT_CACHE.get(str(location).encode("utf-8"), version=STATIC_CONTENT_VERSION)
 
 
+def set_cached_metadata(content):
+    """
+    Stores the attributes of the given piece of content in the cache, without its data.
+
+    Used for assets too large to be kept in the cache, whose data is served from the
+    AssetDiskCache instead.
+    """
+    metadata = StaticContent(
+        content.location, content.name, content.content_type, None,
+        last_modified_at=content.last_modified_at, thumbnail_location=content.thumbnail_location,
+        import_path=content.import_path, length=content.length, locked=content.locked,
+        content_digest=content.content_digest,
+    )
+    set_cached_content(metadata)
+
+
 def del_cached_content(location):
     """
     Delete content for the given location, as well versions of the content without a run.
@@ -48,3 +76,110 @@ def del_cached_content(location):
         pass
 
     CONTENT_CACHE.delete_many(locations, version=STATIC_CONTENT_VERSION)
+    invalidate_static_url_table(location.course_key)
+
+
+class AssetDiskCache:
+    """
+    Bounded cache of course asset data in a local directory, keyed by content digest.
+
+    Files are written under a temporary name and renamed into place, so processes
+    sharing the directory never read partial files. Reading a file bumps its
+    modification time, and the files read least recently are removed once the
+    directory holds more than max_bytes.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def from_settings(cls):
+        """
+        Return the cache configured by the COURSE_ASSETS_DISK_CACHE setting.
+        """
+        config = getattr(settings, 'COURSE_ASSETS_DISK_CACHE', {})
+        return cls(config.get('DIRECTORY'), config.get('MAX_BYTES', 0))
+
+    @property
+    def enabled(self):
+        return bool(self.directory and self.max_bytes)
+
+    def accepts(self, content):
+        """
+        Return whether the data of the given content can be kept in this cache.
+        """
+        digest = getattr(content, 'content_digest', None)
+        return (
+            self.enabled and
+            digest is not None and CONTENT_DIGEST_PATTERN.match(digest) is not None and
+            content.length is not None and content.length <= self.max_bytes
+        )
+
+    def path(self, digest):
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def open(self, digest):
+        """
+        Return the file holding the data of the given digest opened for reading, None if not cached.
+        """
+        path = self.path(digest)
+        try:
+            asset_file = open(path, 'rb')  # pylint: disable=consider-using-with
+            os.utime(path)
+        except OSError:
+            return None
+        return asset_file
+
+    def put(self, digest, chunks):
+        """
+        Write the data of the given digest from an iterable of bytes, and return it opened for reading.
+
+        Returns None if the file could not be written.
+        """
+        path = self.path(digest)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+            try:
+                with os.fdopen(handle, 'wb') as temp_file:
+                    for chunk in chunks:
+                        temp_file.write(chunk)
+                os.replace(temp_path, path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError:
+            log.exception("Unable to write asset %s to the disk cache", digest)
+            return None
+        asset_file = self.open(digest)
+        self.evict()
+        return asset_file
+
+    def evict(self):
+        """
+        Remove the least recently read files until the cache fits in max_bytes.
+        """
+        entries = []
+        total = 0
+        for dirpath, _dirnames, filenames in os.walk(self.directory):
+            for filename in filenames:
+                if filename.startswith('.tmp-'):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        for _mtime, size, path in sorted(entries):
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
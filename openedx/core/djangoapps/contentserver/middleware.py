@@ -7,26 +7,29 @@ import datetime
 import logging
 
 from django.http import (
+    FileResponse,
     HttpResponse,
     HttpResponseBadRequest,
     HttpResponseForbidden,
     HttpResponseNotFound,
     HttpResponseNotModified,
-    HttpResponsePermanentRedirect
+    HttpResponsePermanentRedirect,
+    StreamingHttpResponse
 )
 from django.utils.deprecation import MiddlewareMixin
+from django.utils.http import parse_etags
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.locator import AssetLocator
 
 from openedx.core.djangoapps.header_control import force_header_for_response
 from common.djangoapps.student.models import CourseEnrollment
 from xmodule.assetstore.assetmgr import AssetManager
-from xmodule.contentstore.content import XASSET_LOCATION_TAG, StaticContent
+from xmodule.contentstore.content import XASSET_LOCATION_TAG, StaticContent, StaticContentStream
 from xmodule.exceptions import NotFoundError
 from xmodule.modulestore import InvalidLocationError
 from xmodule.modulestore.exceptions import ItemNotFoundError
 
-from .caching import get_cached_content, set_cached_content
+from .caching import AssetDiskCache, get_cached_content, set_cached_content, set_cached_metadata
 from .models import CdnUserAgentsConfig, CourseAssetCacheTtlConfig
 
 log = logging.getLogger(__name__)
@@ -41,6 +44,14 @@ except ImportError:
 
 HTTP_DATE_FORMAT = "%a, %d %b %Y %H:%M:%S GMT"
 
+# Assets smaller than this are kept in the content cache. It's the default item size
+# limit of memcached, and we don't want to do too much buffering in memory when we're
+# serving an actual request.
+MAX_CACHED_CONTENT_LENGTH = 1048576
+
+# Size of the chunks streamed to the client for assets not kept in memory.
+ASSET_CHUNK_SIZE = 64 * 1024
+
 
 class StaticContentServer(MiddlewareMixin):
     """
@@ -123,6 +134,14 @@ class StaticContentServer(MiddlewareMixin):
                 if_modified_since = request.META['HTTP_IF_MODIFIED_SINCE']
                 if if_modified_since == last_modified_at_str:
                     return HttpResponseNotModified()
+            if actual_digest is not None and 'HTTP_IF_NONE_MATCH' in request.META:
+                if etag_matches(request.META['HTTP_IF_NONE_MATCH'], get_etag(actual_digest)):
+                    response = HttpResponseNotModified()
+                    response['ETag'] = get_etag(actual_digest)
+                    return response
+
+            # Large assets are read from the local disk cache when it has them.
+            content, asset_file = self.get_asset_file(content, loc)
 
             # *** File streaming within a byte range ***
             # If a Range is provided, parse Range attribute of the request
@@ -132,10 +151,6 @@ class StaticContentServer(MiddlewareMixin):
             # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.35
             response = None
             if request.META.get('HTTP_RANGE'):
-                # If we have a StaticContent, get a StaticContentStream.  Can't manipulate the bytes otherwise.
-                if isinstance(content, StaticContent):
-                    content = AssetManager.find(loc, as_stream=True)
-
                 header_value = request.META['HTTP_RANGE']
                 try:
                     unit, ranges = parse_range_header(header_value, content.length)
@@ -161,7 +176,7 @@ class StaticContentServer(MiddlewareMixin):
 
                         if 0 <= first <= last < content.length:
                             # If the byte range is satisfiable
-                            response = HttpResponse(content.stream_data_in_range(first, last))
+                            response = self.get_range_response(content, asset_file, first, last)
                             response['Content-Range'] = 'bytes {first}-{last}/{length}'.format(
                                 first=first, last=last, length=content.length
                             )
@@ -179,7 +194,7 @@ class StaticContentServer(MiddlewareMixin):
 
             # If Range header is absent or syntactically invalid return a full content response.
             if response is None:
-                response = HttpResponse(content.stream_data())
+                response = self.get_full_response(content, asset_file)
                 response['Content-Length'] = content.length
 
             if newrelic:
@@ -225,6 +240,9 @@ class StaticContentServer(MiddlewareMixin):
             response['Cache-Control'] = "private, no-cache, no-store"
 
         response['Last-Modified'] = content.last_modified_at.strftime(HTTP_DATE_FORMAT)
+        content_digest = getattr(content, "content_digest", None)
+        if content_digest is not None:
+            response['ETag'] = get_etag(content_digest)
 
         # Force the Vary header to only vary responses on Origin, so that XHR and browser requests get cached
         # separately and don't screw over one another. i.e. a browser request that doesn't send Origin, and
@@ -293,15 +311,113 @@ class StaticContentServer(MiddlewareMixin):
             except (ItemNotFoundError, NotFoundError):  # lint-amnesty, pylint: disable=try-except-raise
                 raise
 
-            # Now that we fetched it, let's go ahead and try to cache it. We cap this at 1MB
-            # because it's the default for memcached and also we don't want to do too much
-            # buffering in memory when we're serving an actual request.
-            if content.length is not None and content.length < 1048576:
+            # Now that we fetched it, let's go ahead and try to cache it.
+            if content.length is not None and content.length < MAX_CACHED_CONTENT_LENGTH:
                 content = content.copy_to_in_mem()
                 set_cached_content(content)
+            elif AssetDiskCache.from_settings().accepts(content):
+                # The data is served from the local disk cache, only cache the attributes.
+                set_cached_metadata(content)
 
         return content
 
+    def get_asset_file(self, content, location):
+        """
+        Returns (content, asset_file) for the content loaded by load_asset_from_location.
+
+        asset_file is an open copy of the asset data from the AssetDiskCache, filled on
+        first use, or None for assets not kept on disk. When it is None, content holds the
+        asset data in memory or as a stream, rather than only the asset attributes.
+        """
+        if content.data is not None:
+            return content, None
+
+        disk_cache = AssetDiskCache.from_settings()
+        if disk_cache.accepts(content):
+            asset_file = disk_cache.open(content.content_digest)
+            if asset_file is not None:
+                return content, asset_file
+            stream = content
+            if not isinstance(stream, StaticContentStream):
+                stream = AssetManager.find(location, as_stream=True)
+            try:
+                asset_file = disk_cache.put(content.content_digest, stream.stream_data(ASSET_CHUNK_SIZE))
+            finally:
+                stream.close()
+            if asset_file is not None:
+                return content, asset_file
+            # The stream was consumed writing the file, read the asset again.
+            return AssetManager.find(location, as_stream=True), None
+
+        if not isinstance(content, StaticContentStream):
+            content = AssetManager.find(location, as_stream=True)
+        return content, None
+
+    def get_full_response(self, content, asset_file):
+        """
+        Returns a response with all the asset data.
+        """
+        if asset_file is not None:
+            response = FileResponse(asset_file)
+            # FileResponse names the file after the digest, let clients use the asset url instead.
+            del response['Content-Disposition']
+            return response
+        if isinstance(content, StaticContentStream):
+            return StreamingHttpResponse(stream_and_close(content, content.stream_data(ASSET_CHUNK_SIZE)))
+        return HttpResponse(content.data)
+
+    def get_range_response(self, content, asset_file, first, last):
+        """
+        Returns a response with the asset data between first and last (included).
+        """
+        if asset_file is not None:
+            return StreamingHttpResponse(read_file_range(asset_file, first, last))
+        if isinstance(content, StaticContentStream):
+            return StreamingHttpResponse(
+                stream_and_close(content, content.stream_data_in_range(first, last, ASSET_CHUNK_SIZE))
+            )
+        return HttpResponse(content.data[first:last + 1])
+
+
+def get_etag(content_digest):
+    """
+    Returns the strong ETag of an asset with the given content digest.
+    """
+    return f'"{content_digest}"'
+
+
+def etag_matches(header_value, etag):
+    """
+    Returns whether an If-None-Match header value matches the given ETag, using weak comparison.
+    """
+    etags = parse_etags(header_value)
+    return '*' in etags or etag in etags or 'W/' + etag in etags
+
+
+def stream_and_close(content, chunks):
+    """
+    Yields the given chunks of a StaticContentStream, closing it once done.
+    """
+    try:
+        yield from chunks
+    finally:
+        content.close()
+
+
+def read_file_range(asset_file, first, last):
+    """
+    Yields the data of an open file between first and last (included), closing it once done.
+    """
+    with asset_file:
+        asset_file.seek(first)
+        remaining = last - first + 1
+        while remaining > 0:
+            chunk = asset_file.read(min(ASSET_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
 
 def parse_range_header(header_value, content_length):
     """
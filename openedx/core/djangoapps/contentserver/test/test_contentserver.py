@@ -7,6 +7,8 @@ import copy
 
 import datetime
 import logging
+import os
+import tempfile
 import unittest
 from unittest.mock import patch
 from uuid import uuid4
@@ -29,6 +31,7 @@ from xmodule.modulestore.exceptions import ItemNotFoundError
 from common.djangoapps.student.models import CourseEnrollment
 from common.djangoapps.student.tests.factories import UserFactory, AdminFactory
 
+from ..caching import AssetDiskCache
 from ..middleware import parse_range_header, HTTP_DATE_FORMAT, StaticContentServer
 
 log = logging.getLogger(__name__)
@@ -287,6 +290,54 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
             first=(self.length_unlocked), last=(self.length_unlocked)))
         assert resp.status_code == 416
 
+    def test_etag_header(self):
+        """
+        Tests that assets carry their content digest as ETag, and that a matching
+        If-None-Match is answered with a 304.
+        """
+        resp = self.client.get(self.url_unlocked)
+        assert resp.status_code == 200
+        content = AssetManager.find(self.unlocked_asset, as_stream=True)
+        assert resp['ETag'] == f'"{content.content_digest}"'
+
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH=resp['ETag'])
+        assert resp.status_code == 304
+
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH=f'"{FAKE_MD5_HASH}"')
+        assert resp.status_code == 200
+
+    @patch('openedx.core.djangoapps.contentserver.middleware.MAX_CACHED_CONTENT_LENGTH', 0)
+    def test_disk_cache(self):
+        """
+        Tests that assets not kept in the content cache are streamed from the local disk cache.
+        """
+        content = self.contentstore.find(self.unlocked_asset)
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(COURSE_ASSETS_DISK_CACHE={'DIRECTORY': directory, 'MAX_BYTES': 1024 * 1024}):
+                resp = self.client.get(self.url_unlocked)
+                assert resp.status_code == 200
+                assert b''.join(resp.streaming_content) == content.data
+                assert resp['Content-Length'] == str(self.length_unlocked)
+                assert os.path.exists(AssetDiskCache(directory, 1).path(content.content_digest))
+
+                resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=1-3')
+                assert resp.status_code == 206
+                assert b''.join(resp.streaming_content) == content.data[1:4]
+
+    def test_disk_cache_eviction(self):
+        """
+        Tests that the least recently read files are evicted once the disk cache is full.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            disk_cache = AssetDiskCache(directory, 10)
+            disk_cache.put('a' * 32, [b'12345']).close()
+            os.utime(disk_cache.path('a' * 32), (0, 0))
+            disk_cache.put('b' * 32, [b'12345']).close()
+            disk_cache.put('c' * 32, [b'12345']).close()
+            assert disk_cache.open('a' * 32) is None
+            with disk_cache.open('b' * 32) as asset_file:
+                assert asset_file.read() == b'12345'
+
     def test_vary_header_sent(self):
         """
         Tests that we're properly setting the Vary header to ensure browser requests don't get
@@ -6,6 +6,8 @@ Utilities related to caching.
 import collections
 import functools
 import itertools
+import threading
+import time
 import zlib
 import pickle
 
@@ -14,6 +16,7 @@ from django.db.models.signals import post_save, post_delete
 from django.utils.encoding import force_str
 
 from edx_django_utils.cache import RequestCache, TieredCache
+from edx_django_utils.monitoring import increment
 
 
 def request_cached(namespace=None, arg_map_function=None, request_cache_getter=None):
@@ -150,6 +153,112 @@ class process_cached:  # pylint: disable=invalid-name
         return functools.partial(self.__call__, obj)
 
 
+class LocalLRUCache:
+    """
+    Bounded least recently used cache for the life of a process.
+
+    Meant as a tier in front of a remote cache for values that do not change
+    for a given key, e.g. serialized data keyed by a content version. The
+    cache holds at most max_entries values and max_bytes of values, as
+    measured by the size given when setting them; values older than max_age
+    seconds, when given, are dropped on read. A max_bytes of 0 disables the
+    cache.
+
+    Hits, misses and evictions are counted on the instance and reported as
+    custom monitoring attributes prefixed by the cache name.
+    """
+
+    def __init__(self, name, max_entries, max_bytes, max_age=None):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = self.misses = self.evictions = 0
+        self._entries = collections.OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    @property
+    def size(self):
+        """
+        Total size of the cached values.
+        """
+        return self._size
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _count(self, event):
+        setattr(self, event, getattr(self, event) + 1)
+        increment(f'{self.name}.{event}')
+
+    def _pop(self, key):
+        _value, size, _stored_at = self._entries.pop(key)
+        self._size -= size
+
+    def get(self, key, max_age=None):
+        """
+        Return the value cached for the key, None when absent or expired.
+
+        max_age, when given, overrides the max_age of the cache.
+        """
+        if not self.enabled:
+            return None
+        max_age = self.max_age if max_age is None else max_age
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and max_age is not None and time.time() - entry[2] > max_age:
+                self._pop(key)
+                entry = None
+            if entry is None:
+                self._count('misses')
+                return None
+            self._entries.move_to_end(key)
+            self._count('hits')
+            return entry[0]
+
+    def set(self, key, value, size):
+        """
+        Cache the value for the key, evicting the least recently used values
+        to stay within the limits. Values larger than max_bytes are not cached.
+        """
+        if not self.enabled or size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            self._entries[key] = (value, size, time.time())
+            self._size += size
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+                self._count('evictions')
+
+    def delete(self, key):
+        """
+        Remove the value cached for the key, if any.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+
+    def delete_matching(self, predicate):
+        """
+        Remove the values of all keys for which predicate(key) is true.
+        """
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
 class CacheInvalidationManager:
     """
     This class provides a decorator for simple functions, which can handle invalidation.
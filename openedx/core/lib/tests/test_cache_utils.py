@@ -3,12 +3,12 @@ Tests for cache_utils.py
 """
 
 from unittest import TestCase
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 import ddt
 from edx_django_utils.cache import RequestCache
 
-from openedx.core.lib.cache_utils import request_cached
+from openedx.core.lib.cache_utils import LocalLRUCache, request_cached
 
 
 @ddt.ddt
@@ -295,3 +295,62 @@ class TestRequestCachedDecorator(TestCase):
         result = wrapped(3)
         assert result == 2
         assert to_be_wrapped.call_count == 2
+
+
+@patch('openedx.core.lib.cache_utils.increment', Mock())
+class TestLocalLRUCache(TestCase):
+    """
+    Test the LocalLRUCache.
+    """
+
+    def test_miss_and_then_hit(self):
+        cache = LocalLRUCache('test', max_entries=2, max_bytes=10)
+        assert cache.get('a') is None
+        cache.set('a', 'value', 5)
+        assert cache.get('a') == 'value'
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_evicts_least_recently_used_entries(self):
+        cache = LocalLRUCache('test', max_entries=2, max_bytes=100)
+        cache.set('a', 1, 1)
+        cache.set('b', 2, 1)
+        cache.get('a')
+        cache.set('c', 3, 1)
+        assert cache.get('b') is None
+        assert cache.get('a') == 1
+        assert cache.get('c') == 3
+        assert cache.evictions == 1
+
+    def test_evicts_to_stay_within_max_bytes(self):
+        cache = LocalLRUCache('test', max_entries=10, max_bytes=10)
+        cache.set('a', 1, 6)
+        cache.set('b', 2, 6)
+        assert cache.get('a') is None
+        assert cache.size == 6
+        cache.set('c', 3, 11)
+        assert cache.get('c') is None
+        assert len(cache) == 1
+
+    def test_max_age(self):
+        cache = LocalLRUCache('test', max_entries=10, max_bytes=10, max_age=60)
+        with patch('openedx.core.lib.cache_utils.time.time', return_value=1000):
+            cache.set('a', 1, 1)
+        with patch('openedx.core.lib.cache_utils.time.time', return_value=1030):
+            assert cache.get('a') == 1
+            assert cache.get('a', max_age=10) is None
+        assert len(cache) == 0
+
+    def test_delete_matching(self):
+        cache = LocalLRUCache('test', max_entries=10, max_bytes=10)
+        cache.set('course-a.1', 1, 1)
+        cache.set('course-a.2', 2, 1)
+        cache.set('course-b.1', 3, 1)
+        cache.delete_matching(lambda key: 'course-a' in key)
+        assert len(cache) == 1
+        assert cache.get('course-b.1') == 3
+
+    def test_disabled(self):
+        cache = LocalLRUCache('test', max_entries=10, max_bytes=0)
+        cache.set('a', 1, 0)
+        assert cache.get('a') is None
+        assert not cache.enabled
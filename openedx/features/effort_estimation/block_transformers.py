@@ -34,6 +34,9 @@ class EffortEstimationTransformer(BlockStructureTransformer):
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    # A partial collect may disable estimates for the course, but only a
+    # full collect enables them again.
+    SUPPORTS_INCREMENTAL_COLLECT = True
 
     # Public xblock field names
     EFFORT_ACTIVITIES = 'effort_activities'